@@ -1,14 +1,31 @@
 import streamlit as st
+import logging
 import os
-import tempfile
+import time
+from functools import partial
+import pandas as pd
 from pathlib import Path
 
 # Imports locaux
 from config import *
-from utils.detection import load_models, train_team_classifier
-from utils.visualization import generate_tracking_video, generate_radar_video, generate_voronoi_video
+from utils.detection import get_team_classifier
+from utils.registry import get_models
+from utils.jobs import QUEUED, RUNNING, FAILED, CANCELLED, FINISHED, get_job_queue
+from utils.stages import PipelineCancelled
+from utils.profiling import StageProfiler
+from utils.visualization import TrackingSink, RadarSink, VoronoiSink
+from utils.pipeline import AnalysisExporter, run_analysis
+from utils.chunking import run_chunked_analysis
+from utils.checkpoint import checkpointed_team_classifier, run_checkpointed
+from utils.preview import run_preview
+from utils.cache import AnalysisCache, model_fingerprint
+from utils.encoding import VideoEncoder
+from utils.serving import get_result_server, spool_upload
+from utils.results import ResultStore
 from sports.configs.soccer import SoccerPitchConfiguration
 
+logger = logging.getLogger(__name__)
+
 # ============================================
 # CONFIGURATION DE LA PAGE
 # ============================================
@@ -345,6 +362,18 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# ============================================
+# PRÉCHARGEMENT DES MODÈLES
+# ============================================
+# Chargés et préchauffés une seule fois par processus, puis partagés entre
+# les sessions et les reruns ; en cas d'échec, l'analyse réessaiera de les charger
+try:
+    with st.spinner("Préchauffage des modèles..."):
+        get_models(YOLO11_MODEL_PATH, FIELD_KEYPOINT_MODEL, ROBOFLOW_API_KEY, DETECTION_BACKEND)
+except Exception as error:
+    logger.exception("Préchargement des modèles en échec")
+    st.warning(f"Préchargement des modèles impossible : {error}")
+
 # ============================================
 # SIDEBAR - CONFIGURATION
 # ============================================
@@ -353,15 +382,24 @@ with st.sidebar:
     
     # Upload vidéo
     st.markdown("#### Téléchargement Vidéo")
+    # Nouvelle clé après chaque lancement : Streamlit libère la vidéo gardée en mémoire
+    st.session_state.setdefault('upload_key', 0)
     uploaded_video = st.file_uploader(
         "Sélectionner une vidéo de match",
         type=['mp4', 'avi', 'mov'],
-        help="Formats supportés : MP4, AVI, MOV"
+        help="Formats supportés : MP4, AVI, MOV",
+        key=f"upload_{st.session_state.upload_key}"
     )
     
     st.markdown('<div class="pitch-divider"></div>', unsafe_allow_html=True)
     
     # Paramètres
+    # Match / maillots
+    match_id = st.text_input(
+        "Identifiant du match ou des maillots",
+        help="Réutilise la classification des équipes déjà apprise pour ce match (optionnel)"
+    )
+    
     st.markdown("#### Paramètres de Détection")
     confidence_threshold = st.slider(
         "Seuil de confiance",
@@ -371,6 +409,19 @@ with st.sidebar:
         step=0.05,
         help="Score minimum pour qu'une détection soit acceptée"
     )
+    batch_size = st.select_slider(
+        "Taille de batch (inférence)",
+        options=[1, 2, 4, 8, 16, 32],
+        value=DEFAULT_BATCH_SIZE,
+        help="Nombre de frames traitées ensemble par YOLO"
+    )
+    workers = st.number_input(
+        "Processus parallèles",
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=DEFAULT_WORKERS,
+        help="Découpe la vidéo en morceaux traités en parallèle (utile pour les matchs complets)"
+    )
     
     st.markdown('<div class="pitch-divider"></div>', unsafe_allow_html=True)
     
@@ -379,6 +430,24 @@ with st.sidebar:
     generate_tracking = st.checkbox("Détection & Tracking", value=True)
     generate_radar = st.checkbox("Vue Radar", value=True)
     generate_voronoi = st.checkbox("Diagramme de Voronoï", value=True)
+    export_data = st.checkbox("Données de suivi (.npz)", value=False, help="Permet de regénérer les vues sans relancer les modèles")
+    profile_stages = st.checkbox("Profilage des étapes", value=False, help="Mesure la latence de chaque étape (un seul processus)")
+    video_quality = st.select_slider(
+        "Qualité des vidéos",
+        options=["Compacte", "Standard", "Haute"],
+        value="Standard",
+        help="Qualité d'encodage H.264 (ffmpeg) : plus haute = fichiers plus gros"
+    )
+    video_height = st.selectbox(
+        "Hauteur des vidéos",
+        options=[None, 1080, 720, 480],
+        format_func=lambda height: "Résolution d'analyse" if height is None else f"{height}p"
+    )
+    preview_mode = st.checkbox(
+        "Aperçu rapide",
+        value=False,
+        help=f"Détection sur une frame sur {PREVIEW_DETECTION_STRIDE}, résolution réduite ; l'écart avec l'analyse complète est mesuré"
+    )
     
     st.markdown('<div class="pitch-divider"></div>', unsafe_allow_html=True)
     
@@ -392,6 +461,349 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
+# ============================================
+# ANALYSES EN ARRIÈRE-PLAN
+# ============================================
+# File unique par processus : les analyses s'enchaînent, survivent à la
+# fermeture de la page et restent consultables via ?job=<id>
+job_queue = get_job_queue(JOBS_DIR, workers=JOB_WORKERS)
+# Résultats réutilisés pour une même vidéo et les mêmes réglages
+result_store = ResultStore(RESULTS_STORE_DIR, RESULTS_STORE_MAX_BYTES)
+# Vidéos et fichiers produits servis en streaming (None : repli sur Streamlit)
+# Seulement avec une adresse publique explicite : `localhost` désignerait la machine de chaque spectateur
+result_server = get_result_server(OUTPUT_DIR, RESULTS_HOST, RESULTS_PORT, RESULTS_PUBLIC_URL) if RESULTS_PUBLIC_URL else None
+
+def download_link(label, path, mime, key):
+    """Téléchargement d'un fichier produit, sans le charger en mémoire si le serveur de résultats tourne."""
+    if result_server is not None:
+        st.link_button(label, result_server.url_for(path, download=True))
+        return
+    with open(path, 'rb') as file:
+        st.download_button(label=label, data=file, file_name=os.path.basename(path), mime=mime, key=key)
+
+def result_key(settings, detection_model, keypoint_model):
+    """Clé des fichiers produits : contenu de la vidéo, poids des modèles et réglages qui les influencent."""
+    params = {name: value for name, value in settings.items() if name not in ('video_digest', 'batch_size', 'workers')}
+    return result_store.key(
+        settings['video_digest'],
+        detection_model=model_fingerprint(detection_model),
+        keypoint_model=model_fingerprint(keypoint_model),
+        chunked=settings['workers'] > 1 and not settings['preview'],
+        team_refresh_interval=TEAM_REFRESH_INTERVAL,
+        keyframe_interval=(KEYFRAME_MIN_INTERVAL, KEYFRAME_MAX_INTERVAL),
+        voronoi_cell_size=VORONOI_CELL_SIZE,
+        preview_options=(PREVIEW_DETECTION_STRIDE, PREVIEW_FRAME_SCALE, PREVIEW_INFERENCE_SIZE),
+        encoder=(VIDEO_ENCODER, VIDEO_CODEC, VIDEO_PRESET, VIDEO_CRF, VIDEO_HEIGHT),
+        **params
+    )
+
+def analyse_job(job, video_path, settings):
+    """Analyse complète d'une vidéo uploadée, exécutée par la file de jobs."""
+    def check_cancelled():
+        if job.cancel_event.is_set():
+            raise PipelineCancelled("Traitement annulé")
+    
+    job_dir = None
+    try:
+        # 1. Chargement des modèles
+        job.set_phase("Initialisation des modèles")
+        models = get_models(
+            YOLO11_MODEL_PATH,
+            FIELD_KEYPOINT_MODEL,
+            ROBOFLOW_API_KEY,
+            DETECTION_BACKEND
+        )
+        detection_model, keypoint_model = models.detection_model, models.keypoint_model
+        check_cancelled()
+        
+        # Même vidéo, mêmes modèles et mêmes réglages : fichiers déjà produits, aucune analyse
+        key = result_key(settings, detection_model, keypoint_model)
+        stored = result_store.lookup(key)
+        if stored is not None:
+            stored['stored'] = True
+            return stored
+        
+        # Analyse complète sur un seul processus : points de reprise, propres à la clé des résultats
+        checkpoint_dir = None
+        if CHECKPOINT_SEGMENT_FRAMES and not settings['preview'] and settings['workers'] <= 1:
+            checkpoint_dir = os.path.join(CHECKPOINT_DIR, key)
+        
+        # 2. Entraînement du classificateur d'équipes (repris tel quel si l'analyse avait été interrompue)
+        job.set_phase("Classification des équipes")
+        team_classifier = checkpointed_team_classifier(checkpoint_dir) if checkpoint_dir else None
+        team_warnings = []
+        if team_classifier is None:
+            team_classifier, team_warnings = get_team_classifier(
+                video_path,
+                detection_model,
+                match_id=settings['match_id'],
+                store_dir=TEAM_CLASSIFIER_DIR,
+                player_id=PLAYER_ID,
+                stride=30,
+                batch_size=settings['batch_size'],
+                max_frames=TEAM_CLASSIFIER_MAX_FRAMES,
+                max_crops=TEAM_CLASSIFIER_MAX_CROPS
+            )
+        check_cancelled()
+        
+        config = SoccerPitchConfiguration()
+        job_dir = result_store.staging(job.id)
+        
+        output_paths = {}
+        sinks = []
+        stats = None
+        
+        # 3. Génération des vidéos (une seule passe d'analyse pour toutes les vues)
+        encoder = VideoEncoder(
+            VIDEO_ENCODER, VIDEO_CODEC, VIDEO_PRESET,
+            crf={"Compacte": VIDEO_CRF + 5, "Standard": VIDEO_CRF, "Haute": VIDEO_CRF - 5}[settings['video_quality']],
+            height=settings['video_height'] or VIDEO_HEIGHT
+        )
+        stem = Path(job.name).stem
+        if settings['generate_tracking']:
+            output_path = os.path.join(job_dir, f"tracking_{stem}.mp4")
+            sinks.append(TrackingSink(output_path, encoder=encoder))
+            output_paths['Tracking'] = output_path
+        
+        if settings['generate_radar']:
+            output_path = os.path.join(job_dir, f"radar_{stem}.mp4")
+            sinks.append(RadarSink(output_path, config, encoder=encoder))
+            output_paths['Vue Radar'] = output_path
+        
+        control_path = None
+        if settings['generate_voronoi']:
+            output_path = os.path.join(job_dir, f"voronoi_{stem}.mp4")
+            voronoi_sink = VoronoiSink(output_path, config, cell_size=VORONOI_CELL_SIZE, encoder=encoder)
+            sinks.append(voronoi_sink)
+            output_paths['Voronoï'] = output_path
+            control_path = voronoi_sink.control_path
+        
+        profile_path = None
+        data_path = None
+        if settings['export_data']:
+            data_path = os.path.join(job_dir, f"analysis_{Path(job.name).stem}.npz")
+            sinks.append(AnalysisExporter(data_path))
+        
+        if sinks:
+            job.set_phase("Génération des sorties : " + ', '.join(output_paths))
+            pipeline_options = dict(
+                config=config,
+                confidence=settings['confidence'],
+                batch_size=settings['batch_size'],
+                team_refresh_interval=TEAM_REFRESH_INTERVAL,
+                keyframe_min_interval=KEYFRAME_MIN_INTERVAL,
+                keyframe_max_interval=KEYFRAME_MAX_INTERVAL,
+                queue_size=PIPELINE_QUEUE_SIZE,
+                cache=AnalysisCache(CACHE_DIR, CACHE_MAX_BYTES)
+            )
+            prepared = time.time()
+            profiler = StageProfiler() if settings['profile'] and not settings['preview'] and settings['workers'] <= 1 else None
+            if settings['preview']:
+                stats = run_preview(
+                    video_path,
+                    sinks,
+                    detection_model,
+                    team_classifier,
+                    keypoint_model=keypoint_model,
+                    detection_stride=PREVIEW_DETECTION_STRIDE,
+                    frame_scale=PREVIEW_FRAME_SCALE,
+                    inference_size=PREVIEW_INFERENCE_SIZE,
+                    accuracy_frames=PREVIEW_ACCURACY_FRAMES,
+                    cancel_event=job.cancel_event,
+                    progress_callback=job.update_progress,
+                    **pipeline_options
+                )
+            elif settings['workers'] > 1:
+                stats = run_chunked_analysis(
+                    video_path,
+                    sinks,
+                    (YOLO11_MODEL_PATH, FIELD_KEYPOINT_MODEL, ROBOFLOW_API_KEY, DETECTION_BACKEND),
+                    team_classifier,
+                    workers=settings['workers'],
+                    overlap=CHUNK_OVERLAP,
+                    cancel_event=job.cancel_event,
+                    **pipeline_options
+                )
+            elif checkpoint_dir is not None:
+                stats = run_checkpointed(
+                    video_path,
+                    sinks,
+                    detection_model,
+                    team_classifier,
+                    keypoint_model=keypoint_model,
+                    checkpoint_dir=checkpoint_dir,
+                    segment_frames=CHECKPOINT_SEGMENT_FRAMES,
+                    cancel_event=job.cancel_event,
+                    progress_callback=job.update_progress,
+                    profiler=profiler,
+                    **pipeline_options
+                )
+            else:
+                stats = run_analysis(
+                    video_path,
+                    sinks,
+                    detection_model,
+                    team_classifier,
+                    keypoint_model=keypoint_model,
+                    cancel_event=job.cancel_event,
+                    progress_callback=job.update_progress,
+                    profiler=profiler,
+                    **pipeline_options
+                )
+            if profiler is not None:
+                profile_path = profiler.save(os.path.join(job_dir, "profile.json"))
+            stats['preparation_seconds'] = prepared - job.started_at
+        
+        return result_store.commit(key, job_dir, {
+            'output_paths': output_paths,
+            'data_path': data_path,
+            'control_path': control_path,
+            'profile_path': profile_path,
+            'stats': stats,
+            'warnings': team_warnings,
+            'models': {'load_seconds': models.load_seconds, 'warmup_seconds': models.warmup_seconds}
+        })
+    
+    finally:
+        # Nettoyage (la préparation n'existe plus si les résultats ont été publiés)
+        if os.path.exists(video_path):
+            os.remove(video_path)
+        if job_dir is not None:
+            result_store.discard(job_dir)
+
+@st.fragment(run_every=1.0)
+def show_job_progress(job_id):
+    """Progression d'un job en cours, rafraîchie chaque seconde."""
+    job = job_queue.get(job_id)
+    if job is None:
+        # Job oublié par la file (évincé ou serveur redémarré) : plus rien à suivre
+        if job_id in st.session_state.job_ids:
+            st.session_state.job_ids.remove(job_id)
+        st.rerun()
+    if job.status in FINISHED:
+        st.rerun()
+    
+    if job.status == QUEUED:
+        st.markdown(f'<span class="status-badge status-processing">EN ATTENTE</span> {job_queue.position(job)} analyse(s) avant celle-ci', unsafe_allow_html=True)
+    else:
+        st.markdown(f'<span class="status-badge status-processing">TRAITEMENT</span> {job.phase}...', unsafe_allow_html=True)
+        st.progress(job.fraction)
+        if job.frames_total:
+            eta = f" — reste ~{job.eta:.0f} s" if job.eta is not None else ""
+            st.caption(f"{job.frames_done}/{job.frames_total} frames — {job.fps:.1f} FPS{eta}")
+    
+    if st.button("Annuler", key=f"cancel_{job.id}"):
+        job_queue.cancel(job.id)
+        st.rerun()
+
+def show_results(job):
+    """Résultats d'un job terminé."""
+    result = job.result
+    output_paths = {name: path for name, path in result['output_paths'].items() if os.path.exists(path)}
+    data_path = result['data_path']
+    stats = result['stats']
+    if len(output_paths) < len(result['output_paths']):
+        st.warning("Certains fichiers ont été supprimés du magasin de résultats (quota disque) : relancez l'analyse pour les régénérer")
+    if result.get('stored'):
+        st.info("Vidéo déjà analysée avec ces réglages : résultats servis sans nouvelle analyse")
+    
+    st.markdown('<span class="status-badge status-success">TERMINÉ</span> Analyse complétée avec succès', unsafe_allow_html=True)
+    for warning in result['warnings']:
+        st.warning(warning)
+    
+    # Affichage des résultats
+    st.success("Toutes les vidéos ont été générées avec succès")
+    if stats and stats.get('cached'):
+        st.caption(f"Analyse relue depuis le cache : {stats['frames']} frames redessinées en {stats['seconds']:.1f} s")
+    elif stats:
+        st.caption(f"{stats['frames']} frames en {stats['seconds']:.1f} s — {stats['fps']:.2f} FPS (batch de {stats['batch_size']})")
+        if 'time_to_first_frame' in stats:
+            models = result['models']
+            st.caption(
+                f"Première frame après {stats['preparation_seconds'] + stats['time_to_first_frame']:.1f} s "
+                f"(dont {stats['preparation_seconds']:.1f} s de préparation ; modèles chargés en {models['load_seconds']:.1f} s "
+                f"et préchauffés en {models['warmup_seconds']:.1f} s au démarrage)"
+            )
+        if 'team_cache' in stats:
+            team_stats = stats['team_cache']
+            st.caption(f"Mémoire d'équipes : {team_stats['hits']} crops réutilisés, {team_stats['misses']} classifiés ({team_stats['hit_rate']:.0%} évités)")
+        if 'homography' in stats:
+            homography_stats = stats['homography']
+            st.caption(f"Points clés : {homography_stats['keypoint_inferences']} inférences ({homography_stats.get('failed_keyframes', 0)} en échec), {homography_stats['skipped']} évitées ({homography_stats['skip_rate']:.0%})")
+        if 'preview_accuracy' in stats:
+            accuracy = stats['preview_accuracy']
+            caption = (
+                f"Aperçu rapide (x{accuracy.get('speedup', 0.0):.1f} par rapport à l'analyse complète) — écart mesuré sur "
+                f"{accuracy['frames']} frames : rappel {accuracy['recall']:.0%}, précision {accuracy['precision']:.0%}, "
+                f"équipes identiques {accuracy['team_agreement']:.0%}, ballon retrouvé {accuracy['ball_recall']:.0%}"
+            )
+            if 'pitch_error_m' in accuracy:
+                caption += f", écart de position {accuracy['pitch_error_m']:.1f} m"
+            st.caption(caption)
+        
+        # Profilage par étape
+        if 'profile' in stats:
+            profile = stats['profile']
+            st.markdown("### Profilage des Étapes")
+            table = pd.DataFrame(profile['stages']).T[['count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'total_ms']]
+            table['part'] = table['total_ms'] / (1000 * profile['wall_seconds'])
+            st.dataframe(table.style.format({'count': '{:.0f}', 'part': '{:.0%}'}, precision=1))
+            if profile['frame']:
+                frame = profile['frame']
+                st.caption(f"Intervalle entre frames : p50 {frame['p50_ms']:.1f} ms, p95 {frame['p95_ms']:.1f} ms, p99 {frame['p99_ms']:.1f} ms")
+            memory = profile['memory']
+            st.caption("Pic mémoire : " + ", ".join(f"{name.replace('_mb', '')} {value:.0f} Mo" for name, value in memory.items()))
+            if result.get('profile_path') and os.path.exists(result['profile_path']):
+                download_link("Rapport de profilage (.json)", result['profile_path'], "application/json", f"download_{job.id}_profile")
+    
+    st.markdown("### Télécharger les Résultats")
+    
+    if output_paths:
+        cols = st.columns(len(output_paths))
+        
+        for i, (name, path) in enumerate(output_paths.items()):
+            with cols[i]:
+                download_link(name, path, "video/mp4", f"download_{job.id}_{name}")
+    
+    if data_path and os.path.exists(data_path):
+        download_link("Données de suivi (.npz)", data_path, "application/octet-stream", f"download_{job.id}_data")
+    
+    # Prévisualisation
+    if output_paths:
+        st.markdown('<div class="pitch-divider"></div>', unsafe_allow_html=True)
+        st.markdown("### Prévisualisation des Vidéos")
+        
+        tabs = st.tabs(list(output_paths.keys()))
+        
+        for i, (name, path) in enumerate(output_paths.items()):
+            with tabs[i]:
+                # Le navigateur lit la vidéo par plages depuis le serveur de résultats
+                st.video(result_server.url_for(path) if result_server is not None else path)
+    
+    # Contrôle du terrain (Voronoï)
+    control_path = result['control_path']
+    if control_path is not None and os.path.exists(control_path):
+        st.markdown("### Contrôle du Terrain")
+        control = pd.read_csv(control_path, index_col='frame')
+        st.line_chart(control.rename(columns={'team_1': 'Équipe 1', 'team_2': 'Équipe 2'}))
+
+def show_job(job):
+    if job.status in (QUEUED, RUNNING):
+        show_job_progress(job.id)
+    elif job.status == CANCELLED:
+        st.warning("Analyse annulée")
+    elif job.status == FAILED:
+        st.error(f"Erreur lors de l'analyse : {job.error}")
+    else:
+        show_results(job)
+
+# Jobs suivis par cette session (et job demandé dans l'URL)
+if 'job_ids' not in st.session_state:
+    st.session_state.job_ids = []
+requested_job = st.query_params.get('job')
+if requested_job and requested_job not in st.session_state.job_ids and job_queue.get(requested_job):
+    st.session_state.job_ids.append(requested_job)
+
 # ============================================
 # ZONE PRINCIPALE
 # ============================================
@@ -462,133 +874,47 @@ else:
     </div>
     """, unsafe_allow_html=True)
     
-    # Bouton de génération
+    # Bouton de génération : l'analyse rejoint la file d'attente
     if st.button("LANCER L'ANALYSE", type="primary"):
+        # Copier la vidéo sur disque par blocs (supprimée par le job une fois traitée)
+        video_path, video_digest = spool_upload(uploaded_video, UPLOAD_DIR, suffix=Path(uploaded_video.name).suffix)
         
-        # Sauvegarder la vidéo temporairement
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
-            tmp_file.write(uploaded_video.read())
-            video_path = tmp_file.name
-        
-        # Barre de progression globale
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        try:
-            # 1. Chargement des modèles
-            status_text.markdown('<span class="status-badge status-processing">CHARGEMENT</span> Initialisation des modèles...', unsafe_allow_html=True)
-            progress_bar.progress(10)
-            
-            detection_model, keypoint_model = load_models(
-                YOLO11_MODEL_PATH,
-                FIELD_DETECTION_MODEL_ID,
-                ROBOFLOW_API_KEY
-            )
-            
-            # 2. Entraînement du classificateur d'équipes
-            status_text.markdown('<span class="status-badge status-processing">ENTRAÎNEMENT</span> Classification des équipes...', unsafe_allow_html=True)
-            progress_bar.progress(20)
-            
-            team_classifier = train_team_classifier(
-                video_path,
-                detection_model,
-                player_id=PLAYER_ID,
-                stride=30
-            )
-            
-            config = SoccerPitchConfiguration()
-            
-            output_paths = {}
-            current_progress = 30
-            
-            # 3. Génération des vidéos
-            if generate_tracking:
-                status_text.markdown('<span class="status-badge status-processing">TRAITEMENT</span> Génération : Détection & Tracking...', unsafe_allow_html=True)
-                output_path = os.path.join(OUTPUT_DIR, f"tracking_{uploaded_video.name}")
-                generate_tracking_video(
-                    video_path,
-                    output_path,
-                    detection_model,
-                    team_classifier,
-                    confidence=confidence_threshold
-                )
-                output_paths['Tracking'] = output_path
-                current_progress += 20
-                progress_bar.progress(current_progress)
-            
-            if generate_radar:
-                status_text.markdown('<span class="status-badge status-processing">TRAITEMENT</span> Génération : Vue Radar...', unsafe_allow_html=True)
-                output_path = os.path.join(OUTPUT_DIR, f"radar_{uploaded_video.name}")
-                generate_radar_video(
-                    video_path,
-                    output_path,
-                    detection_model,
-                    keypoint_model,
-                    team_classifier,
-                    config,
-                    confidence=confidence_threshold
-                )
-                output_paths['Vue Radar'] = output_path
-                current_progress += 20
-                progress_bar.progress(current_progress)
-            
-            if generate_voronoi:
-                status_text.markdown('<span class="status-badge status-processing">TRAITEMENT</span> Génération : Diagramme de Voronoï...', unsafe_allow_html=True)
-                output_path = os.path.join(OUTPUT_DIR, f"voronoi_{uploaded_video.name}")
-                generate_voronoi_video(
-                    video_path,
-                    output_path,
-                    detection_model,
-                    keypoint_model,
-                    team_classifier,
-                    config,
-                    confidence=confidence_threshold
-                )
-                output_paths['Voronoï'] = output_path
-                current_progress += 20
-                progress_bar.progress(current_progress)
-            
-            # 4. Terminé
-            progress_bar.progress(100)
-            status_text.markdown('<span class="status-badge status-success">TERMINÉ</span> Analyse complétée avec succès', unsafe_allow_html=True)
-            
-            st.markdown('<div class="pitch-divider"></div>', unsafe_allow_html=True)
-            
-            # Affichage des résultats
-            st.success("Toutes les vidéos ont été générées avec succès")
-            
-            st.markdown("### Télécharger les Résultats")
-            
-            cols = st.columns(len(output_paths))
-            
-            for i, (name, path) in enumerate(output_paths.items()):
-                with cols[i]:
-                    with open(path, 'rb') as file:
-                        st.download_button(
-                            label=f"{name}",
-                            data=file,
-                            file_name=f"{name.lower().replace(' ', '_')}_{uploaded_video.name}",
-                            mime="video/mp4"
-                        )
-            
-            # Prévisualisation
-            st.markdown('<div class="pitch-divider"></div>', unsafe_allow_html=True)
-            st.markdown("### Prévisualisation des Vidéos")
-            
-            tabs = st.tabs(list(output_paths.keys()))
-            
-            for i, (name, path) in enumerate(output_paths.items()):
-                with tabs[i]:
-                    st.video(path)
-        
-        except Exception as e:
-            st.error(f"Erreur lors de l'analyse : {str(e)}")
-            st.exception(e)
-        
-        finally:
-            # Nettoyage
-            if os.path.exists(video_path):
-                os.remove(video_path)
+        settings = dict(
+            match_id=match_id,
+            confidence=confidence_threshold,
+            batch_size=batch_size,
+            workers=workers,
+            generate_tracking=generate_tracking,
+            generate_radar=generate_radar,
+            generate_voronoi=generate_voronoi,
+            export_data=export_data,
+            profile=profile_stages,
+            preview=preview_mode,
+            video_quality=video_quality,
+            video_height=video_height,
+            video_digest=video_digest
+        )
+        job = job_queue.submit(uploaded_video.name, partial(analyse_job, video_path=video_path, settings=settings))
+        st.session_state.job_ids.append(job.id)
+        st.query_params['job'] = job.id
+        st.session_state.upload_key += 1
+        st.rerun()
+
+# Suivi des analyses de la session
+for job_id in reversed(st.session_state.job_ids):
+    job = job_queue.get(job_id)
+    if job is None:
+        continue
+    st.markdown('<div class="pitch-divider"></div>', unsafe_allow_html=True)
+    st.markdown(f"### Analyse : {job.name}")
+    st.caption(f"Job {job.id} — lien direct : ?job={job.id}")
+    show_job(job)
+
+recent_jobs = [job for job in job_queue.jobs() if job.id not in st.session_state.job_ids]
+if recent_jobs:
+    with st.expander("Analyses récentes"):
+        for job in recent_jobs[:20]:
+            st.markdown(f"[{job.name}](?job={job.id}) — {job.status}")
 
 # ============================================
 # FOOTER
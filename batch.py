@@ -0,0 +1,81 @@
+"""
+Analyse en lot de vidéos de match, sans interface.
+
+    python batch.py videos/ --outputs tracking radar --confidence 0.3 --workers 2
+    python batch.py "matchs/*.mp4" --output-dir outputs/batch
+
+Chaque vidéo produit un dossier `<output-dir>/<nom>/` avec ses vidéos et un
+`summary.json` (durées, nombre de frames). Relancer la même commande reprend
+le lot : les vidéos déjà terminées sont ignorées, et une vidéo interrompue
+reprend à son dernier point de reprise (`--checkpoint-frames`).
+"""
+import argparse
+import logging
+import os
+import sys
+from config import *
+from utils.batch import OUTPUTS, find_videos, run_batch
+from utils.cache import AnalysisCache
+from utils.encoding import ENCODER_BACKENDS, VideoEncoder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('inputs', nargs='+', help="Vidéos, dossiers ou motifs glob")
+    parser.add_argument('--outputs', nargs='+', choices=OUTPUTS, default=list(OUTPUTS))
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument('--output-dir', default=os.path.join(OUTPUT_DIR, 'batch'))
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Vidéos traitées en parallèle")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--no-resume', action='store_true', help="Retraite aussi les vidéos déjà terminées")
+    parser.add_argument('--checkpoint-frames', type=int, default=CHECKPOINT_SEGMENT_FRAMES,
+                        help="Frames entre deux points de reprise (0 = sans point de reprise)")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore le cache des analyses")
+    parser.add_argument('--encoder', choices=ENCODER_BACKENDS, default=VIDEO_ENCODER)
+    parser.add_argument('--codec', default=VIDEO_CODEC, help="Codec ffmpeg (libx264, libx265...)")
+    parser.add_argument('--preset', default=VIDEO_PRESET, help="Preset ffmpeg (ultrafast ... veryslow)")
+    parser.add_argument('--crf', type=int, default=VIDEO_CRF)
+    parser.add_argument('--height', type=int, default=VIDEO_HEIGHT, help="Hauteur maximale des vidéos produites")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        parser.error("Aucune vidéo trouvée")
+
+    summaries = run_batch(
+        videos,
+        args.output_dir,
+        args.outputs,
+        args.confidence,
+        (YOLO11_MODEL_PATH, FIELD_KEYPOINT_MODEL, ROBOFLOW_API_KEY, DETECTION_BACKEND),
+        workers=args.workers,
+        resume=not args.no_resume,
+        team_options=dict(
+            store_dir=TEAM_CLASSIFIER_DIR,
+            batch_size=args.batch_size,
+            max_frames=TEAM_CLASSIFIER_MAX_FRAMES,
+            max_crops=TEAM_CLASSIFIER_MAX_CROPS
+        ),
+        voronoi_cell_size=VORONOI_CELL_SIZE,
+        encoder=VideoEncoder(args.encoder, args.codec, args.preset, args.crf, args.height),
+        checkpoint_frames=args.checkpoint_frames or None,
+        batch_size=args.batch_size,
+        team_refresh_interval=TEAM_REFRESH_INTERVAL,
+        keyframe_min_interval=KEYFRAME_MIN_INTERVAL,
+        keyframe_max_interval=KEYFRAME_MAX_INTERVAL,
+        queue_size=PIPELINE_QUEUE_SIZE,
+        cache=None if args.no_cache else AnalysisCache(CACHE_DIR, CACHE_MAX_BYTES)
+    )
+
+    failed = [summary for summary in summaries if summary['status'] != 'done']
+    print(f"{len(videos)} vidéo(s), {len(summaries) - len(failed)} traitée(s), "
+          f"{len(failed)} en échec, {len(videos) - len(summaries)} déjà terminée(s)")
+    for summary in failed:
+        print(f"  {summary['video']} : {summary['error']}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Benchmark de bout en bout du pipeline d'analyse sur des vidéos synthétiques.
+
+    python -m benchmarks.pipeline --save-baseline
+    python -m benchmarks.pipeline --resolutions 1280x720 --frames 200 --outputs radar
+
+Chaque cas (modèles, résolution, durée, sorties) tourne dans un processus
+neuf, sur CPU et sans réseau : débit de bout en bout, latence par étape
+(`StageProfiler`) et pic mémoire du processus. Les modèles factices de
+`benchmarks.synthetic` sont toujours mesurés ; avec `--models real`, YOLO
+est chargé depuis `--yolo-weights` s'il est présent, ainsi que le modèle de
+points clés local `--keypoint-weights` (les équipes restent factices,
+SigLIP demandant le réseau).
+
+`--save-baseline` enregistre les résultats comme référence ; sinon ils sont
+comparés à la référence existante et le code de sortie vaut 1 en cas de
+régression au-delà de `--tolerance`.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+from config import KEYFRAME_MAX_INTERVAL, KEYFRAME_MIN_INTERVAL, TEAM_REFRESH_INTERVAL
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+OUTPUT_SETS = {
+    'tracking': ['tracking'],
+    'radar': ['radar'],
+    'voronoi': ['voronoi'],
+    'all': ['tracking', 'radar', 'voronoi']
+}
+
+
+def _resolution(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def synthetic_video(directory, width, height, n_frames, seed=0):
+    """Chemin de la vidéo synthétique, générée au premier appel."""
+    from benchmarks.synthetic import SyntheticMatch
+
+    path = os.path.join(directory, f"synthetic_{width}x{height}_{n_frames}_{seed}.mp4")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        SyntheticMatch(width, height, n_frames, seed=seed).write(path)
+    return path
+
+
+def _run_case(case, video_path, weights, options):
+    from benchmarks.synthetic import SyntheticMatch, StubDetectionModel, StubKeypointModel, StubTeamClassifier
+    from utils.batch import build_sinks
+    from utils.pipeline import AnalysisPipeline
+    from utils.profiling import StageProfiler
+
+    width, height = case['resolution']
+    match = SyntheticMatch(width, height, case['frames'], seed=case['seed'])
+    detection_model, keypoint_model = StubDetectionModel(match), StubKeypointModel(match)
+    if case['models'] == 'real':
+        from ultralytics import YOLO
+        from utils.keypoints import LocalKeypointModel
+        detection_model = YOLO(weights['yolo'])
+        if os.path.exists(weights['keypoints']):
+            keypoint_model = LocalKeypointModel(weights['keypoints'])
+
+    profiler = StageProfiler()
+    pipeline = AnalysisPipeline(
+        detection_model,
+        StubTeamClassifier(),
+        keypoint_model=keypoint_model,
+        profiler=profiler,
+        **options
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        sinks, _ = build_sinks(output_dir, OUTPUT_SETS[case['outputs']])
+        stats = pipeline.run(video_path, sinks, desc=case['name'])
+
+    profile = stats['profile']
+    return {
+        'frames': stats['frames'],
+        'seconds': stats['seconds'],
+        'fps': stats['fps'],
+        'time_to_first_frame': stats.get('time_to_first_frame'),
+        # Processus neuf par cas : son pic couvre le chargement des modèles et l'analyse
+        'peak_rss_mb': profile['memory']['process_peak_rss_mb'],
+        'frame': profile['frame'],
+        'stages': {
+            stage: {key: summary[key] for key in ('count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')}
+            for stage, summary in profile['stages'].items()
+        }
+    }
+
+
+def run_case(case, video_path, weights, options):
+    """Exécute un cas dans un processus neuf (pic mémoire propre au cas)."""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_run_case, case, video_path, weights, options).result()
+
+
+def compare(results, baseline, tolerance, min_delta_ms=1.0) -> list:
+    """Régressions de débit, de mémoire et de latence p95 par étape."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['fps'] < reference['fps'] * (1 - tolerance):
+            regressions.append(f"{name} : {result['fps']:.1f} FPS contre {reference['fps']:.1f}")
+        if result['peak_rss_mb'] > reference['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(
+                f"{name} : pic mémoire {result['peak_rss_mb']:.0f} Mo contre {reference['peak_rss_mb']:.0f}"
+            )
+        for stage, summary in result['stages'].items():
+            previous = reference['stages'].get(stage)
+            if previous is None:
+                continue
+            p95, previous_p95 = summary['p95_ms'], previous['p95_ms']
+            if p95 > previous_p95 * (1 + tolerance) and p95 - previous_p95 > min_delta_ms:
+                regressions.append(f"{name} / {stage} : p95 {p95:.1f} ms contre {previous_p95:.1f}")
+    return regressions
+
+
+def machine() -> dict:
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resolutions', nargs='+', type=_resolution, default=[(640, 360), (1280, 720), (1920, 1080)])
+    parser.add_argument('--frames', nargs='+', type=int, default=[50, 200])
+    parser.add_argument('--outputs', nargs='+', choices=OUTPUT_SETS, default=list(OUTPUT_SETS))
+    parser.add_argument('--models', nargs='+', choices=('stub', 'real'), default=['stub', 'real'])
+    parser.add_argument('--yolo-weights', default='models/yolov11_best.pt')
+    parser.add_argument('--keypoint-weights', default='models/field_keypoints.pt')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--queue-size', type=int, default=16)
+    parser.add_argument('--detection-stride', type=int, default=1, help="Mode aperçu : YOLO sur une frame sur N")
+    parser.add_argument('--frame-scale', type=float, default=1.0, help="Mode aperçu : réduction des frames analysées")
+    parser.add_argument(
+        '--team-refresh-interval', type=int, default=TEAM_REFRESH_INTERVAL,
+        help="Frames entre deux re-vérifications d'équipe (0 : chaque frame)"
+    )
+    parser.add_argument(
+        '--keyframe-max-interval', type=int, default=KEYFRAME_MAX_INTERVAL,
+        help="Frames maximum entre deux inférences de points clés (0 : chaque frame)"
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--video-dir', default=os.path.join(tempfile.gettempdir(), 'football-ai-benchmarks'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Écart relatif toléré avant régression")
+    parser.add_argument('--report', help="Écrit les résultats complets dans ce fichier JSON")
+    args = parser.parse_args()
+
+    # Mesures reproductibles : CPU uniquement, hérité par les processus des cas
+    os.environ['CUDA_VISIBLE_DEVICES'] = ''
+
+    models = [name for name in args.models if name == 'stub' or os.path.isfile(args.yolo_weights)]
+    if 'real' in args.models and 'real' not in models:
+        print(f"Poids {args.yolo_weights} absents : modèles réels ignorés")
+
+    weights = {'yolo': args.yolo_weights, 'keypoints': args.keypoint_weights}
+    options = {
+        'batch_size': args.batch_size,
+        'queue_size': args.queue_size,
+        'detection_stride': args.detection_stride,
+        'frame_scale': args.frame_scale,
+        'team_refresh_interval': args.team_refresh_interval or None,
+        'keyframe_min_interval': KEYFRAME_MIN_INTERVAL,
+        'keyframe_max_interval': args.keyframe_max_interval or None
+    }
+    results = {}
+    for model_name in models:
+        for width, height in args.resolutions:
+            for n_frames in args.frames:
+                video_path = synthetic_video(args.video_dir, width, height, n_frames, args.seed)
+                for outputs in args.outputs:
+                    name = f"{model_name}/{width}x{height}/{n_frames}/{outputs}"
+                    case = {
+                        'name': name,
+                        'models': model_name,
+                        'resolution': (width, height),
+                        'frames': n_frames,
+                        'outputs': outputs,
+                        'seed': args.seed
+                    }
+                    result = results[name] = run_case(case, video_path, weights, options)
+                    slowest = ', '.join(
+                        f"{stage} {summary['p95_ms']:.1f}"
+                        for stage, summary in list(result['stages'].items())[:3]
+                    )
+                    print(
+                        f"{name:32s} {result['fps']:7.1f} FPS | "
+                        f"{result['peak_rss_mb']:6.0f} Mo | p95 (ms) : {slowest}"
+                    )
+
+    report = {'machine': machine(), 'options': options, 'results': results}
+    if args.report:
+        with open(args.report, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Référence enregistrée : {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Aucune référence : relancer avec --save-baseline pour en créer une")
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline.get('machine') != report['machine']:
+        print("Attention : la référence a été mesurée sur une autre machine")
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for regression in regressions:
+        print(f"RÉGRESSION {regression}")
+    if not regressions:
+        print("Aucune régression par rapport à la référence")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
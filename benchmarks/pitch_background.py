@@ -0,0 +1,53 @@
+"""
+Compare le temps de rendu par frame des vues radar et Voronoï :
+terrain redessiné à chaque frame (`draw_pitch`) contre terrain pré-rendu.
+
+    python -m benchmarks.pitch_background --frames 200
+"""
+import argparse
+import time
+import numpy as np
+import supervision as sv
+from sports.annotators.soccer import draw_pitch, draw_points_on_pitch
+from sports.configs.soccer import SoccerPitchConfiguration
+from utils.visualization import pitch_background
+
+CONFIG = SoccerPitchConfiguration()
+
+STYLES = {
+    'radar': {},
+    'voronoi': {'background_color': sv.Color.WHITE, 'line_color': sv.Color.BLACK}
+}
+
+
+def _random_positions(rng, n=22):
+    return rng.uniform([0, 0], [CONFIG.length, CONFIG.width], size=(n, 2))
+
+
+def _time_per_frame(make_pitch, positions):
+    start = time.perf_counter()
+    for xy in positions:
+        pitch = make_pitch()
+        draw_points_on_pitch(config=CONFIG, xy=xy, face_color=sv.Color.RED, pitch=pitch)
+    return (time.perf_counter() - start) / len(positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    positions = [_random_positions(rng) for _ in range(args.frames)]
+
+    for name, style in STYLES.items():
+        redraw = _time_per_frame(lambda: draw_pitch(CONFIG, **style), positions)
+        cached = _time_per_frame(lambda: pitch_background(CONFIG, **style).copy(), positions)
+        print(
+            f"{name:8s} draw_pitch : {redraw * 1000:7.2f} ms/frame | "
+            f"pré-rendu : {cached * 1000:7.2f} ms/frame | x{redraw / cached:.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
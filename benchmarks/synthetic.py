@@ -0,0 +1,246 @@
+"""
+Match synthétique et modèles factices déterministes pour les benchmarks.
+
+La vidéo montre le terrain de `draw_pitch` vu en perspective par une caméra
+qui balaie la largeur du terrain, avec 22 joueurs, 2 gardiens, un arbitre
+et le ballon. L'indice de chaque frame est codé dans un bandeau de blocs
+noirs et blancs en haut à gauche : les modèles factices le relisent et
+renvoient la vérité terrain de la frame, au même format que les vrais
+modèles, sans GPU ni réseau.
+"""
+import cv2
+import numpy as np
+from sports.annotators.soccer import draw_pitch
+from sports.configs.soccer import SoccerPitchConfiguration
+
+CONFIG = SoccerPitchConfiguration()
+
+BALL_ID, GOALKEEPER_ID, PLAYER_ID, REFEREE_ID = 0, 1, 2, 3
+CLASS_NAMES = {BALL_ID: 'ball', GOALKEEPER_ID: 'goalkeeper', PLAYER_ID: 'player', REFEREE_ID: 'referee'}
+
+# Couleurs BGR des maillots ; gardiens en teinte plus sombre de leur équipe
+TEAM_COLORS = ((255, 191, 0), (147, 20, 255))
+GOALKEEPER_COLORS = ((160, 100, 0), (90, 10, 160))
+REFEREE_COLOR = (0, 215, 255)
+
+BARCODE_BITS = 16
+BARCODE_BLOCK = 8
+
+
+def encode_index(frame, index):
+    """Écrit `index` dans le bandeau de blocs en haut à gauche de `frame`."""
+    for bit in range(BARCODE_BITS):
+        value = 255 if (index >> bit) & 1 else 0
+        x = bit * BARCODE_BLOCK
+        frame[:BARCODE_BLOCK, x:x + BARCODE_BLOCK] = value
+
+
+def decode_index(frame, scale=1.0) -> int:
+    """
+    Relit l'indice écrit par `encode_index` (robuste à la compression), sur
+    une frame éventuellement réduite d'un facteur `scale`.
+    """
+    size = BARCODE_BLOCK * scale
+    index = 0
+    for bit in range(BARCODE_BITS):
+        x = bit * size
+        block = frame[1:max(2, int(size) - 1), int(x) + 1:max(int(x) + 2, int(x + size) - 1)]
+        if block.mean() > 127:
+            index |= 1 << bit
+    return index
+
+
+class SyntheticMatch:
+    """
+    Scène déterministe (pour une même `seed`) de `n_frames` frames en
+    `width` x `height` : homographie terrain -> image et boîtes de chaque
+    objet, frame par frame.
+    """
+
+    def __init__(self, width=1280, height=720, n_frames=250, fps=25, seed=0, config=CONFIG):
+        self.width = width
+        self.height = height
+        self.n_frames = n_frames
+        self.fps = fps
+        self.config = config
+        rng = np.random.default_rng(seed)
+
+        length, pitch_width = config.length, config.width
+        # Positions de base et mouvements sinusoïdaux (cm)
+        players = rng.uniform([500, 300], [length - 500, pitch_width - 300], size=(20, 2))
+        goalkeepers = np.array([[300.0, pitch_width / 2], [length - 300.0, pitch_width / 2]])
+        referee = rng.uniform([2000, 1000], [length - 2000, pitch_width - 1000], size=(1, 2))
+        self.base = np.concatenate([players, goalkeepers, referee])
+        self.amplitude = rng.uniform(100, 600, size=self.base.shape)
+        self.period = rng.uniform(2, 8, size=self.base.shape) * fps
+        self.phase = rng.uniform(0, 2 * np.pi, size=self.base.shape)
+        self.class_id = np.array([PLAYER_ID] * 20 + [GOALKEEPER_ID] * 2 + [REFEREE_ID])
+        self.team = np.array([0] * 10 + [1] * 10 + [0, 1, -1])
+
+        self.pitch = draw_pitch(config)
+        self.pitch_scale = np.array([
+            [0.1, 0, 50],
+            [0, 0.1, 50],
+            [0, 0, 1]
+        ])
+
+    def homography(self, index) -> np.ndarray:
+        """Matrice terrain (cm) -> image (px) de la frame `index`."""
+        length, pitch_width = self.config.length, self.config.width
+        center = length / 2 + 0.3 * length * np.sin(2 * np.pi * index / (10 * self.fps))
+        source = np.float32([
+            [center - 3500, 0], [center + 3500, 0],
+            [center + 2200, pitch_width], [center - 2200, pitch_width]
+        ])
+        w, h = self.width, self.height
+        target = np.float32([[0, 0.3 * h], [w, 0.3 * h], [w, h], [0, h]])
+        return cv2.getPerspectiveTransform(source, target)
+
+    def positions(self, index) -> np.ndarray:
+        """Positions terrain (cm) des joueurs, gardiens et arbitre."""
+        offset = self.amplitude * np.sin(2 * np.pi * index / self.period + self.phase)
+        xy = self.base + offset
+        return np.clip(xy, [0, 0], [self.config.length, self.config.width])
+
+    def ball_position(self, index) -> np.ndarray:
+        t = index / self.fps
+        return np.array([
+            self.config.length / 2 + 0.35 * self.config.length * np.sin(t / 3),
+            self.config.width / 2 + 0.35 * self.config.width * np.sin(t / 2)
+        ])
+
+    @staticmethod
+    def _project(matrix, xy):
+        points = cv2.perspectiveTransform(np.asarray(xy, dtype=np.float32).reshape(-1, 1, 2), matrix)
+        return points.reshape(-1, 2)
+
+    def ground_truth(self, index) -> dict:
+        """Boîtes visibles (`xyxy`, `class_id`, `team`) de la frame `index`."""
+        matrix = self.homography(index)
+        feet = self._project(matrix, self.positions(index))
+        ball = self._project(matrix, self.ball_position(index)[None])[0]
+
+        heights = self.height * (0.05 + 0.07 * (feet[:, 1] - 0.3 * self.height) / (0.7 * self.height))
+        widths = 0.4 * heights
+        xyxy = np.stack([feet[:, 0] - widths / 2, feet[:, 1] - heights, feet[:, 0] + widths / 2, feet[:, 1]], axis=1)
+        ball_radius = max(3.0, self.height / 150)
+        ball_xyxy = np.array([[ball[0] - ball_radius, ball[1] - ball_radius, ball[0] + ball_radius, ball[1] + ball_radius]])
+
+        xyxy = np.concatenate([ball_xyxy, xyxy])
+        class_id = np.concatenate([[BALL_ID], self.class_id])
+        team = np.concatenate([[-1], self.team])
+        visible = (
+            (xyxy[:, 0] >= 0) & (xyxy[:, 2] < self.width)
+            & (xyxy[:, 1] >= BARCODE_BLOCK) & (xyxy[:, 3] < self.height)
+        )
+        return {'xyxy': xyxy[visible], 'class_id': class_id[visible], 'team': team[visible], 'matrix': matrix}
+
+    def render(self, index) -> np.ndarray:
+        matrix = self.homography(index)
+        frame = cv2.warpPerspective(
+            self.pitch, matrix @ np.linalg.inv(self.pitch_scale), (self.width, self.height),
+            borderValue=(40, 40, 40)
+        )
+        truth = self.ground_truth(index)
+        for (x1, y1, x2, y2), class_id, team in zip(truth['xyxy'].astype(int), truth['class_id'], truth['team']):
+            if class_id == BALL_ID:
+                cv2.circle(frame, ((x1 + x2) // 2, (y1 + y2) // 2), max(1, (x2 - x1) // 2), (255, 255, 255), -1)
+                continue
+            if class_id == REFEREE_ID:
+                color = REFEREE_COLOR
+            elif class_id == GOALKEEPER_ID:
+                color = GOALKEEPER_COLORS[team]
+            else:
+                color = TEAM_COLORS[team]
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, -1)
+        encode_index(frame, index)
+        return frame
+
+    def write(self, path):
+        """Écrit la vidéo (mp4v) et renvoie `path`."""
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), self.fps, (self.width, self.height))
+        try:
+            for index in range(self.n_frames):
+                writer.write(self.render(index))
+        finally:
+            writer.release()
+        return path
+
+
+def _scale(match, frame) -> np.ndarray:
+    """Facteurs (largeur, hauteur) entre la frame reçue et la scène (mode aperçu)."""
+    height, width = frame.shape[:2]
+    return np.array([width / match.width, height / match.height], dtype=np.float32)
+
+
+class StubDetectionModel:
+    """
+    Remplace YOLO : relit l'indice de la frame et renvoie la vérité terrain
+    sous forme de `ultralytics.engine.results.Results`, comme `YOLO.predict`.
+    """
+    ckpt_path = None
+
+    def __init__(self, match: SyntheticMatch, confidence=0.9):
+        self.match = match
+        self.confidence = confidence
+
+    def predict(self, frames, conf=0.25, **kwargs):
+        import torch
+        from ultralytics.engine.results import Results
+
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        results = []
+        for frame in frames:
+            scale = _scale(self.match, frame)
+            truth = self.match.ground_truth(decode_index(frame, scale[0]))
+            boxes = np.concatenate([
+                truth['xyxy'] * np.tile(scale, 2),
+                np.full((len(truth['xyxy']), 1), self.confidence),
+                truth['class_id'][:, None]
+            ], axis=1)
+            boxes = boxes[boxes[:, 4] >= conf]
+            results.append(Results(frame, path='', names=CLASS_NAMES, boxes=torch.as_tensor(boxes, dtype=torch.float32)))
+        return results
+
+
+class StubKeypointModel:
+    """
+    Remplace le modèle Roboflow de points clés : projette les 32 sommets du
+    terrain avec l'homographie de la frame, au format de `infer`.
+    """
+    model_id = 'stub-keypoints'
+
+    def __init__(self, match: SyntheticMatch):
+        self.match = match
+        self.vertices = np.array(match.config.vertices, dtype=np.float32)
+
+    def infer(self, frame, confidence=0.5, **kwargs):
+        scale = _scale(self.match, frame)
+        matrix = self.match.homography(decode_index(frame, scale[0]))
+        points = SyntheticMatch._project(matrix, self.vertices) * scale
+        height, width = frame.shape[:2]
+        inside = (points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)
+        keypoints = [
+            {'x': float(x), 'y': float(y), 'confidence': 1.0 if visible else 0.0, 'class_id': i, 'class': str(i)}
+            for i, ((x, y), visible) in enumerate(zip(points, inside))
+        ]
+        return [{'predictions': [{
+            'x': width / 2, 'y': height / 2, 'width': width, 'height': height,
+            'confidence': 1.0, 'class_id': 0, 'class': 'pitch', 'keypoints': keypoints
+        }]}]
+
+
+class StubTeamClassifier:
+    """Remplace `TeamClassifier` : équipe du maillot dont la couleur est la plus proche."""
+
+    def fit(self, crops):
+        pass
+
+    def predict(self, crops) -> np.ndarray:
+        if len(crops) == 0:
+            return np.array([], dtype=int)
+        colors = np.array(TEAM_COLORS, dtype=np.float32)
+        means = np.array([crop.reshape(-1, 3).mean(axis=0) for crop in crops], dtype=np.float32)
+        distances = np.linalg.norm(means[:, None, :] - colors[None, :, :], axis=2)
+        return distances.argmin(axis=1)
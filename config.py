@@ -9,10 +9,31 @@ ROBOFLOW_API_KEY = os.getenv("ROBOFLOW_API_KEY")
 
 # Modèles
 YOLO11_MODEL_PATH = "models/yolov11_best.pt"
+# Moteur d'inférence YOLO11 : auto (export ONNX/OpenVINO sur CPU s'il existe), pytorch, onnx ou openvino
+DETECTION_BACKEND = os.getenv("FOOTBALL_AI_DETECTION_BACKEND", "auto")
 FIELD_DETECTION_MODEL_ID = "football-field-detection-f07vi/14"
+# Poids locaux du modèle de points clés (pose ultralytics .pt, export .onnx ou OpenVINO) :
+# utilisés à la place du modèle Roboflow s'ils existent (aucune clé d'API requise)
+FIELD_KEYPOINT_MODEL_PATH = os.getenv("FOOTBALL_AI_KEYPOINT_MODEL", "models/field_keypoints.pt")
+FIELD_KEYPOINT_MODEL = FIELD_KEYPOINT_MODEL_PATH if os.path.exists(FIELD_KEYPOINT_MODEL_PATH) else FIELD_DETECTION_MODEL_ID
 
 # Paramètres détection
 DEFAULT_CONFIDENCE = 0.30
+DEFAULT_BATCH_SIZE = 8  # Frames par micro-batch d'inférence YOLO
+TEAM_REFRESH_INTERVAL = 30  # Frames entre deux re-vérifications d'équipe d'une piste
+KEYFRAME_MIN_INTERVAL = 5  # Frames minimum entre deux inférences de points clés
+KEYFRAME_MAX_INTERVAL = 50  # Frames maximum entre deux inférences de points clés
+PIPELINE_QUEUE_SIZE = 16  # Taille des files entre étapes (None = traitement en série)
+DEFAULT_WORKERS = 1  # Processus pour le traitement par morceaux (1 = un seul processus)
+CHUNK_OVERLAP = 30  # Frames de recouvrement pour raccorder les pistes entre morceaux
+PREVIEW_DETECTION_STRIDE = 5  # Aperçu rapide : YOLO sur une frame sur N, pistes prolongées entre deux
+PREVIEW_FRAME_SCALE = 0.5  # Aperçu rapide : facteur de réduction des frames analysées et des vidéos produites
+PREVIEW_INFERENCE_SIZE = 640  # Aperçu rapide : taille d'entrée de YOLO (modèles PyTorch)
+PREVIEW_ACCURACY_FRAMES = 150  # Aperçu rapide : frames réanalysées en mode complet pour mesurer l'écart
+VORONOI_CELL_SIZE = 50  # Taille d'une cellule de la grille de contrôle (unités terrain, cm)
+TEAM_CLASSIFIER_MAX_FRAMES = 300  # Frames échantillonnées pour entraîner le classificateur d'équipes
+TEAM_CLASSIFIER_MAX_CROPS = 2000  # Crops de joueurs conservés au maximum pour l'entraînement
+TEAM_CLASSIFIER_DIR = "models/team_classifiers"  # Classificateurs d'équipes enregistrés par match
 BALL_ID = 0
 GOALKEEPER_ID = 1
 PLAYER_ID = 2
@@ -27,4 +48,44 @@ COLORS = {
 
 # Output
 OUTPUT_DIR = "outputs"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
\ No newline at end of file
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# Encodage des vidéos produites (ffmpeg : H.264 lisible dans le navigateur)
+VIDEO_ENCODER = os.getenv("FOOTBALL_AI_VIDEO_ENCODER", "auto")  # auto (ffmpeg s'il est installé), ffmpeg ou opencv
+VIDEO_CODEC = os.getenv("FOOTBALL_AI_VIDEO_CODEC", "libx264")
+VIDEO_PRESET = "veryfast"  # Compromis vitesse / taille du preset x264
+VIDEO_CRF = 23  # Qualité constante (plus bas = meilleure qualité, fichiers plus gros)
+VIDEO_HEIGHT = None  # Hauteur maximale des vidéos produites (None = résolution d'analyse)
+
+# Vidéos reçues, copiées sur disque par blocs (éviter un tmpfs pour les matchs complets)
+UPLOAD_DIR = os.getenv("FOOTBALL_AI_UPLOAD_DIR", os.path.join(OUTPUT_DIR, "uploads"))
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Serveur des résultats (lecture en streaming et requêtes partielles, hors de Streamlit)
+RESULTS_HOST = os.getenv("FOOTBALL_AI_RESULTS_HOST", "127.0.0.1")
+RESULTS_PORT = int(os.getenv("FOOTBALL_AI_RESULTS_PORT", 8502))
+# Adresse du serveur vue par le navigateur (ex. http://localhost:8502 en local, URL du proxy en production).
+# Sans elle, le serveur n'est pas démarré et les résultats passent par Streamlit.
+RESULTS_PUBLIC_URL = os.getenv("FOOTBALL_AI_RESULTS_URL")
+
+# Magasin des résultats complets, adressé par contenu (vidéo + modèles + réglages)
+RESULTS_STORE_DIR = os.path.join(OUTPUT_DIR, "results")
+RESULTS_STORE_MAX_BYTES = int(os.getenv("FOOTBALL_AI_RESULTS_MAX_BYTES", 20 * 1024 ** 3))  # Au-delà : éviction LRU
+
+# File d'analyses en arrière-plan
+JOBS_DIR = os.path.join(OUTPUT_DIR, "jobs")  # Historique des jobs terminés
+JOB_WORKERS = 1  # Analyses exécutées simultanément (les autres attendent)
+
+# Points de reprise des analyses complètes (un job interrompu reprend au dernier segment terminé)
+CHECKPOINT_DIR = os.getenv("FOOTBALL_AI_CHECKPOINT_DIR", os.path.join(OUTPUT_DIR, "checkpoints"))
+CHECKPOINT_SEGMENT_FRAMES = 1500  # Frames par segment (1 min à 25 FPS) ; None = sans point de reprise
+
+# Analyse en direct (live.py)
+LIVE_HOST = os.getenv("FOOTBALL_AI_LIVE_HOST", "127.0.0.1")  # Adresse du serveur de diffusion locale
+LIVE_PORT = int(os.getenv("FOOTBALL_AI_LIVE_PORT", 8765))
+LIVE_LATENCY_TARGET = 0.5  # Secondes : une frame plus ancienne est abandonnée
+LIVE_TEAM_CALIBRATION_FRAMES = 60  # Frames du flux utilisées pour entraîner le classificateur d'équipes
+
+# Cache des analyses (détections, pistes, équipes, points terrain)
+CACHE_DIR = os.getenv("FOOTBALL_AI_CACHE_DIR", "cache/analysis")
+CACHE_MAX_BYTES = int(os.getenv("FOOTBALL_AI_CACHE_MAX_BYTES", 5 * 1024 ** 3))
\ No newline at end of file
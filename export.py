@@ -0,0 +1,66 @@
+"""
+Exporte YOLO11 pour l'inférence CPU (ONNX Runtime ou OpenVINO, INT8 en option)
+et vérifie la parité des détections avec le modèle PyTorch.
+
+    python export.py --backend openvino --int8 --data datasets/football/data.yaml --check-video match.mp4
+    python export.py --backend onnx --int8 --calibration-video match.mp4 --check-video match.mp4
+
+L'application et `batch.py` utilisent ensuite automatiquement l'export
+sur les machines sans GPU (`FOOTBALL_AI_DETECTION_BACKEND=auto`).
+"""
+import argparse
+import logging
+import sys
+from config import *
+from utils.export import check_parity, export_detection_model, load_detection_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--weights', default=YOLO11_MODEL_PATH)
+    parser.add_argument('--backend', choices=('onnx', 'openvino'), default='openvino')
+    parser.add_argument('--int8', action='store_true', help="Quantification INT8 (calibration requise)")
+    parser.add_argument('--imgsz', type=int, help="Taille d'entrée (par défaut : celle de l'entraînement)")
+    parser.add_argument('--data', help="YAML du jeu de données pour calibrer OpenVINO INT8")
+    parser.add_argument('--calibration-video', help="Vidéo de match pour calibrer ONNX INT8")
+    parser.add_argument('--check-video', help="Vidéo sur laquelle comparer les détections à PyTorch")
+    parser.add_argument('--check-frames', type=int, default=50)
+    parser.add_argument('--check-batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Micro-batch de la vérification par batchs")
+    parser.add_argument('--min-recall', type=float, default=0.95, help="Rappel minimal exigé par rapport à PyTorch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    path = export_detection_model(
+        args.weights,
+        backend=args.backend,
+        int8=args.int8,
+        imgsz=args.imgsz,
+        data=args.data,
+        calibration_video=args.calibration_video
+    )
+    print(f"Export : {path}")
+    if not args.check_video:
+        return 0
+
+    report = check_parity(
+        load_detection_model(args.weights, backend='pytorch'),
+        load_detection_model(args.weights, backend=args.backend, int8=args.int8),
+        args.check_video,
+        n_frames=args.check_frames,
+        confidence=DEFAULT_CONFIDENCE,
+        batch_size=args.check_batch_size
+    )
+    print(
+        f"Rappel {report['recall']:.1%}, précision {report['precision']:.1%}, IoU moyenne {report['mean_iou']:.2f} | "
+        f"PyTorch {report['reference_fps']:.1f} FPS -> {args.backend} {report['candidate_fps']:.1f} FPS (x{report['speedup']:.1f})"
+    )
+    print(f"Par batchs de {report['batch_size']} : rappel {report['batch_recall']:.1%}, précision {report['batch_precision']:.1%}")
+    if min(report['recall'], report['batch_recall']) < args.min_recall:
+        print(f"Parité insuffisante : rappel < {args.min_recall:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Analyse en direct d'un flux caméra ou RTSP, diffusée localement par HTTP.
+
+    python live.py rtsp://192.168.1.20:554/stream --match-id psg-om
+    python live.py 0 --views tracking
+    python live.py match.mp4    # fichier rejoué en temps réel
+
+Les vues annotées sont servies en MJPEG (`/tracking.mjpg`, `/radar.mjpg`),
+les coordonnées terrain de chaque frame en JSON (`/positions`) et en
+Server-Sent Events (`/events`), et les métriques de latence sur `/metrics`.
+Les frames qui dépassent la latence cible sont abandonnées. Ctrl+C arrête
+l'analyse et affiche les métriques finales.
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+from config import *
+from utils.detection import get_team_classifier, train_team_classifier_from_frames
+from utils.pipeline import AnalysisPipeline
+from utils.registry import get_models
+from utils.streaming import LivePublisher, StreamSource, run_live
+from utils.team_store import load_team_classifier, save_team_classifier
+from utils.visualization import RadarSink, TrackingSink
+
+VIEWS = {'tracking': TrackingSink, 'radar': RadarSink}
+
+
+def team_classifier_for(args, detection_model):
+    """Classificateur d'équipes : enregistré pour le match, appris sur le fichier, ou sur les premières frames du flux."""
+    if args.match_id:
+        team_classifier, _ = load_team_classifier(TEAM_CLASSIFIER_DIR, args.match_id)
+        if team_classifier is not None:
+            return team_classifier
+    if StreamSource(args.source).is_file:
+        team_classifier, _ = get_team_classifier(
+            args.source, detection_model, match_id=args.match_id, store_dir=TEAM_CLASSIFIER_DIR,
+            max_frames=TEAM_CLASSIFIER_MAX_FRAMES, max_crops=TEAM_CLASSIFIER_MAX_CROPS
+        )
+        return team_classifier
+    print(f"Apprentissage des équipes sur {args.calibration_frames} frames du flux...")
+    with StreamSource(args.source) as source:
+        team_classifier = train_team_classifier_from_frames(
+            source.frames(args.calibration_frames, stride=5), detection_model,
+            max_crops=TEAM_CLASSIFIER_MAX_CROPS
+        )
+    if args.match_id:
+        save_team_classifier(team_classifier, TEAM_CLASSIFIER_DIR, args.match_id)
+    return team_classifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help="Indice de caméra, URL de flux (rtsp://, http://) ou fichier vidéo")
+    parser.add_argument('--views', nargs='+', choices=VIEWS, default=list(VIEWS))
+    parser.add_argument('--host', default=LIVE_HOST)
+    parser.add_argument('--port', type=int, default=LIVE_PORT)
+    parser.add_argument('--latency-target', type=float, default=LIVE_LATENCY_TARGET, help="Latence maximale (s) avant abandon d'une frame")
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument('--match-id', help="Identifiant du match pour réutiliser un classificateur d'équipes")
+    parser.add_argument('--calibration-frames', type=int, default=LIVE_TEAM_CALIBRATION_FRAMES)
+    parser.add_argument('--detection-stride', type=int, default=1, help="YOLO sur une frame analysée sur N (voir le mode aperçu)")
+    parser.add_argument('--frame-scale', type=float, default=1.0, help="Réduction des frames avant analyse")
+    parser.add_argument('--no-realtime', action='store_true', help="Fichier lu sans cadence ni perte de frames")
+    parser.add_argument('--max-frames', type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    models = get_models(YOLO11_MODEL_PATH, FIELD_KEYPOINT_MODEL, ROBOFLOW_API_KEY, DETECTION_BACKEND)
+    team_classifier = team_classifier_for(args, models.detection_model)
+    pipeline = AnalysisPipeline(
+        models.detection_model,
+        team_classifier,
+        keypoint_model=models.keypoint_model,
+        confidence=args.confidence,
+        team_refresh_interval=TEAM_REFRESH_INTERVAL,
+        keyframe_min_interval=KEYFRAME_MIN_INTERVAL,
+        keyframe_max_interval=KEYFRAME_MAX_INTERVAL,
+        detection_stride=args.detection_stride,
+        frame_scale=args.frame_scale
+    )
+    views = {name: VIEWS[name](None) for name in args.views}
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    with StreamSource(args.source, realtime=not args.no_realtime) as source, \
+            LivePublisher(args.host, args.port) as publisher:
+        print(f"Diffusion : {publisher.url}/ ({', '.join(f'/{name}.mjpg' for name in views)}, /positions, /events, /metrics)")
+        metrics = run_live(
+            source,
+            pipeline,
+            views,
+            publisher,
+            latency_target=args.latency_target,
+            stop_event=stop_event,
+            max_frames=args.max_frames
+        )
+    print(json.dumps(metrics, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from .checkpoint import checkpointed_team_classifier, run_checkpointed
+from .detection import get_team_classifier
+from .pipeline import PLAYER_ID, run_analysis
+from .visualization import CONFIG, TrackingSink, RadarSink, VoronoiSink
+
+logger = logging.getLogger(__name__)
+
+OUTPUTS = ('tracking', 'radar', 'voronoi')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov')
+
+# Modèles chargés une seule fois par processus de travail
+_WORKER = {}
+
+
+def find_videos(inputs) -> list:
+    """
+    Vidéos désignées par `inputs` : fichiers, dossiers (non récursif) ou
+    motifs glob. Renvoie des chemins uniques, triés.
+    """
+    videos = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern)
+        videos.update(
+            os.path.abspath(path) for path in candidates
+            if os.path.isfile(path) and path.lower().endswith(VIDEO_EXTENSIONS)
+        )
+    return sorted(videos)
+
+
+def video_output_dir(output_dir, video_path):
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(video_path))[0])
+
+
+def checkpoint_dir(output_dir, video_path):
+    return os.path.join(video_output_dir(output_dir, video_path), '.checkpoint')
+
+
+def summary_path(output_dir, video_path):
+    return os.path.join(video_output_dir(output_dir, video_path), 'summary.json')
+
+
+def build_sinks(video_dir, outputs, config=CONFIG, voronoi_cell_size=50, encoder=None):
+    """
+    Sorties demandées (`tracking`, `radar`, `voronoi`), écrites dans
+    `video_dir` avec l'encodage `encoder` (un `VideoEncoder`).
+    """
+    sinks, paths = [], {}
+    for name in outputs:
+        path = os.path.join(video_dir, f"{name}.mp4")
+        if name == 'tracking':
+            sinks.append(TrackingSink(path, encoder=encoder))
+        elif name == 'radar':
+            sinks.append(RadarSink(path, config, encoder=encoder))
+        elif name == 'voronoi':
+            sink = VoronoiSink(path, config, cell_size=voronoi_cell_size, encoder=encoder)
+            sinks.append(sink)
+            paths['voronoi_control'] = sink.control_path
+        else:
+            raise ValueError(f"Sortie inconnue : {name} (attendu : {', '.join(OUTPUTS)})")
+        paths[name] = path
+    return sinks, paths
+
+
+def is_done(output_dir, video_path, outputs) -> bool:
+    """
+    Vrai si la vidéo a déjà été traitée avec succès pour toutes les sorties
+    `outputs` et que les fichiers produits existent encore.
+    """
+    path = summary_path(output_dir, video_path)
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path) as file:
+            summary = json.load(file)
+    except (OSError, ValueError):
+        return False
+    return (
+        summary.get('status') == 'done'
+        and set(outputs) <= set(summary.get('outputs', {}))
+        and all(os.path.exists(output) for output in summary['outputs'].values())
+    )
+
+
+def write_summary(path, summary):
+    """Écrit le résumé JSON de façon atomique (jamais de fichier à moitié écrit)."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp.json')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(summary, file, indent=2, default=float)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(model_args, threads=None):
+    from .registry import get_models
+
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+    models = get_models(*model_args)
+    _WORKER.update(detection_model=models.detection_model, keypoint_model=models.keypoint_model)
+
+
+def process_video(
+    video_path,
+    output_dir,
+    outputs,
+    confidence,
+    team_options=None,
+    voronoi_cell_size=50,
+    encoder=None,
+    checkpoint_frames=None,
+    **options
+) -> dict:
+    """
+    Traite une vidéo dans le processus courant (modèles de `_init_worker`) :
+    classification des équipes, puis une seule passe d'analyse pour toutes
+    les sorties. Avec `checkpoint_frames`, l'analyse est faite par segments
+    avec points de reprise (voir `run_checkpointed`) : une vidéo interrompue
+    reprend au dernier segment terminé. Écrit et renvoie le résumé (durées,
+    nombre de frames).
+    """
+    video_dir = video_output_dir(output_dir, video_path)
+    os.makedirs(video_dir, exist_ok=True)
+    summary = {
+        'video': video_path,
+        'outputs': {},
+        'confidence': confidence,
+        'status': 'running',
+        'started_at': time.time()
+    }
+    started = time.perf_counter()
+    try:
+        sinks, paths = build_sinks(
+            video_dir, outputs, config=options.get('config', CONFIG),
+            voronoi_cell_size=voronoi_cell_size, encoder=encoder
+        )
+        resume_dir = checkpoint_dir(output_dir, video_path)
+        team_classifier, warnings = None, []
+        if checkpoint_frames:
+            team_classifier = checkpointed_team_classifier(resume_dir)
+        if team_classifier is None:
+            team_classifier, warnings = get_team_classifier(
+                video_path, _WORKER['detection_model'], player_id=PLAYER_ID, **(team_options or {})
+            )
+        summary['team_classifier_seconds'] = time.perf_counter() - started
+        summary['warnings'] = warnings
+
+        if checkpoint_frames:
+            stats = run_checkpointed(
+                video_path,
+                sinks,
+                _WORKER['detection_model'],
+                team_classifier,
+                keypoint_model=_WORKER['keypoint_model'],
+                checkpoint_dir=resume_dir,
+                segment_frames=checkpoint_frames,
+                confidence=confidence,
+                desc=os.path.basename(video_path),
+                **options
+            )
+        else:
+            stats = run_analysis(
+                video_path,
+                sinks,
+                _WORKER['detection_model'],
+                team_classifier,
+                keypoint_model=_WORKER['keypoint_model'],
+                confidence=confidence,
+                desc=os.path.basename(video_path),
+                **options
+            )
+        summary.update(stats=stats, frames=stats['frames'], analysis_seconds=stats['seconds'], fps=stats['fps'])
+        summary['outputs'] = paths
+        summary['status'] = 'done'
+    except Exception as error:
+        logger.exception("Échec du traitement de %s", video_path)
+        summary.update(status='failed', error=str(error), traceback=traceback.format_exc())
+    summary['total_seconds'] = time.perf_counter() - started
+    write_summary(summary_path(output_dir, video_path), summary)
+    return summary
+
+
+def run_batch(
+    videos,
+    output_dir,
+    outputs,
+    confidence,
+    model_args,
+    workers=1,
+    resume=True,
+    team_options=None,
+    **options
+) -> list:
+    """
+    Traite une liste de vidéos avec `workers` processus, chacun chargeant
+    ses modèles une seule fois (`model_args` est passé à `get_models`).
+
+    Avec `resume`, les vidéos déjà traitées avec succès (résumé `done` et
+    sorties présentes) sont ignorées : relancer la même commande après une
+    interruption termine le lot, et avec `checkpoint_frames` la vidéo en
+    cours reprend à son dernier point de reprise. Renvoie les résumés des vidéos traitées.
+    """
+    stems = [os.path.basename(video_output_dir(output_dir, video)) for video in videos]
+    duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicates:
+        raise ValueError(f"Plusieurs vidéos portent le même nom : {', '.join(duplicates)}")
+
+    pending = [video for video in videos if not (resume and is_done(output_dir, video, outputs))]
+    if not resume:
+        for video in pending:
+            shutil.rmtree(checkpoint_dir(output_dir, video), ignore_errors=True)
+    if len(pending) < len(videos):
+        logger.info("%d vidéo(s) déjà traitée(s), ignorée(s)", len(videos) - len(pending))
+    if not pending:
+        return []
+
+    workers = max(1, min(workers, len(pending)))
+    summaries = []
+    if workers == 1:
+        _init_worker(model_args)
+        for video in pending:
+            summaries.append(process_video(video, output_dir, outputs, confidence, team_options, **options))
+        return summaries
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(model_args, threads)
+    ) as executor:
+        futures = [
+            executor.submit(process_video, video, output_dir, outputs, confidence, team_options, **options)
+            for video in pending
+        ]
+        for future in as_completed(futures):
+            summary = future.result()
+            logger.info("%s : %s en %.1f s", summary['video'], summary['status'], summary['total_seconds'])
+            summaries.append(summary)
+    return summaries
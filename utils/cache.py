@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Champs d'un record (`FrameAnalysis.to_record`) et forme d'une ligne
+RECORD_FIELDS = {
+    'xyxy': (4,),
+    'confidence': (),
+    'class_id': (),
+    'tracker_id': (),
+    'role': (),
+    'ball_xyxy': (4,),
+    'ball_confidence': (),
+    'pitch_xy': (2,),
+    'pitch_ball_xy': (2,)
+}
+
+_DIGESTS = {}
+
+
+def file_digest(path, chunk_size=1 << 20) -> str:
+    """
+    Empreinte SHA-256 du contenu d'un fichier, mémorisée tant que sa taille
+    et sa date de modification ne changent pas.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _DIGESTS:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(chunk_size), b''):
+                digest.update(block)
+        _DIGESTS[memo_key] = digest.hexdigest()
+    return _DIGESTS[memo_key]
+
+
+def remember_digest(path, digest):
+    """Enregistre l'empreinte déjà calculée d'un fichier (ex. pendant son écriture)."""
+    stat = os.stat(path)
+    _DIGESTS[(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)] = digest
+
+
+def model_fingerprint(model) -> str:
+    """
+    Identifie un modèle : empreinte de ses poids s'ils sont sur disque,
+    sinon son identifiant (modèles Roboflow). Accepte aussi directement
+    un chemin de poids ou un identifiant de modèle.
+    """
+    if model is None:
+        return 'none'
+    if isinstance(model, (str, os.PathLike)):
+        return file_digest(model) if os.path.isfile(model) else str(model)
+    for attribute in ('ckpt_path', 'model_path', 'weights_path'):
+        path = getattr(model, attribute, None)
+        if isinstance(path, (str, os.PathLike)) and os.path.isfile(path):
+            return file_digest(path)
+    for attribute in ('endpoint', 'model_id', 'model_name'):
+        value = getattr(model, attribute, None)
+        if value:
+            return str(value)
+    return type(model).__name__
+
+
+def team_classifier_fingerprint(team_classifier) -> str:
+    """
+    Identifie les équipes apprises par un classificateur : empreinte de sa
+    réduction UMAP et de ses clusters K-Means (les poids SigLIP sont communs
+    à tous les matchs).
+    """
+    if team_classifier is None:
+        return 'none'
+    state = (getattr(team_classifier, 'reducer', None), getattr(team_classifier, 'cluster_model', None))
+    return hashlib.sha256(pickle.dumps(state)).hexdigest()
+
+
+def pack_records(records) -> dict:
+    """
+    Met une liste de records au format colonnes : chaque champ est concaténé
+    sur toutes les frames, avec un tableau `<champ>_offsets` par champ.
+    """
+    columns = {'n_frames': np.array(len(records))}
+    for name, shape in RECORD_FIELDS.items():
+        if not records or name not in records[0]:
+            continue
+        values = [record[name] for record in records]
+        lengths = [len(value) for value in values]
+        columns[name] = np.concatenate(values) if values else np.zeros((0,) + shape)
+        columns[f'{name}_offsets'] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    return columns
+
+
+def unpack_records(columns) -> list:
+    """Inverse de `pack_records`."""
+    n_frames = int(columns['n_frames'])
+    fields = [name for name in RECORD_FIELDS if name in columns]
+    records = [{} for _ in range(n_frames)]
+    for name in fields:
+        values = columns[name]
+        offsets = columns[f'{name}_offsets']
+        for i, record in enumerate(records):
+            record[name] = values[offsets[i]:offsets[i + 1]]
+    return records
+
+
+def save_records(path, records, video_info=None, start=0):
+    """
+    Écrit des records dans un fichier NPZ autonome, avec la résolution,
+    le FPS de la vidéo source et l'indice de la première frame.
+    """
+    columns = pack_records(records)
+    columns['start'] = np.array(start)
+    if video_info is not None:
+        columns['video_info'] = np.array([video_info.width, video_info.height, video_info.fps])
+    np.savez_compressed(path, **columns)
+
+
+def load_records(path):
+    """
+    Relit un fichier écrit par `save_records`. Renvoie les records et les
+    métadonnées (`start`, et `width`/`height`/`fps` si disponibles).
+    """
+    with np.load(path) as columns:
+        records = unpack_records(columns)
+        metadata = {'start': int(columns['start']) if 'start' in columns else 0}
+        if 'video_info' in columns:
+            width, height, fps = columns['video_info'].tolist()
+            metadata.update(width=int(width), height=int(height), fps=fps)
+    return records, metadata
+
+
+class AnalysisCache:
+    """
+    Cache disque des analyses par frame (détections, pistes, équipes,
+    coordonnées terrain), au format NPZ colonnes.
+
+    La clé combine le contenu de la vidéo, les poids des modèles et les
+    paramètres d'analyse. La taille totale est bornée par `max_bytes` :
+    les entrées les moins récemment utilisées sont supprimées en premier.
+    """
+
+    def __init__(self, directory, max_bytes=5 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, video_path, detection_model, keypoint_model=None, **params) -> str:
+        description = {
+            'video': file_digest(video_path),
+            'detection_model': model_fingerprint(detection_model),
+            'keypoint_model': model_fingerprint(keypoint_model),
+            'params': params
+        }
+        payload = json.dumps(description, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(self, key):
+        """Renvoie les records mis en cache pour `key`, ou `None`."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            records, _ = load_records(path)
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning("Entrée de cache illisible %s : %s", path, error)
+            os.remove(path)
+            return None
+        os.utime(path)
+        logger.info("Analyse trouvée dans le cache (%s)", key[:12])
+        return records
+
+    def store(self, key, records):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp.npz')
+        os.close(fd)
+        try:
+            save_records(tmp_path, records)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de `max_bytes`."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz') or name.endswith('.tmp.npz'):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            logger.info("Entrée de cache supprimée : %s", path)
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+import supervision as sv
+from .cache import file_digest, load_records, model_fingerprint, save_records
+from .chunking import _concatenate_csv, concatenate_videos
+from .pipeline import AnalysisPipeline, RecordCollector, render_records
+from .team_store import load_team_classifier, save_team_classifier
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'checkpoint.pkl'
+TEAM_CLASSIFIER_ID = 'team_classifier'
+
+
+def plan_segments(total_frames, segment_frames):
+    """Découpe `[0, total_frames)` en segments consécutifs de `segment_frames` frames."""
+    segment_frames = max(1, segment_frames)
+    return [(start, min(start + segment_frames, total_frames)) for start in range(0, total_frames, segment_frames)]
+
+
+def checkpoint_fingerprint(source_video_path, sinks, detection_model, keypoint_model, segment_frames, options) -> str:
+    """
+    Empreinte de ce qui doit être identique pour reprendre une analyse :
+    contenu de la vidéo, poids des modèles, sorties, découpage et réglages
+    simples du pipeline.
+    """
+    settings = {
+        name: value for name, value in options.items()
+        if isinstance(value, (bool, int, float, str, type(None)))
+    }
+    description = {
+        'video': file_digest(source_video_path),
+        'detection_model': model_fingerprint(detection_model),
+        'keypoint_model': model_fingerprint(keypoint_model),
+        'sinks': [type(sink).__name__ for sink in sinks],
+        'segment_frames': segment_frames,
+        'options': settings
+    }
+    payload = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_checkpoint(checkpoint_dir, fingerprint=None):
+    """
+    Point de reprise enregistré dans `checkpoint_dir`, ou `None` s'il est
+    absent, illisible ou fait pour une autre analyse (`fingerprint`).
+    """
+    path = os.path.join(checkpoint_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as file:
+            checkpoint = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as error:
+        logger.warning("Point de reprise illisible %s : %s", path, error)
+        return None
+    if fingerprint is not None and checkpoint['fingerprint'] != fingerprint:
+        logger.info("Point de reprise %s fait pour une autre analyse : ignoré", path)
+        return None
+    return checkpoint
+
+
+def save_checkpoint(checkpoint_dir, checkpoint):
+    """Écrit le point de reprise de façon atomique (un arrêt pendant l'écriture garde le précédent)."""
+    path = os.path.join(checkpoint_dir, CHECKPOINT_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(checkpoint, file)
+    os.replace(tmp_path, path)
+
+
+def checkpointed_team_classifier(checkpoint_dir):
+    """
+    Classificateur d'équipes d'une analyse interrompue dans `checkpoint_dir`,
+    à réutiliser pour la reprendre (les équipes mémorisées par piste en
+    dépendent), ou `None`.
+    """
+    if not os.path.isdir(checkpoint_dir):
+        return None
+    team_classifier, _ = load_team_classifier(checkpoint_dir, TEAM_CLASSIFIER_ID)
+    return team_classifier
+
+
+def _segment_sink(checkpoint_dir, sink, sink_index, segment_index):
+    ext = os.path.splitext(sink.target_video_path)[1]
+    return sink.with_target(os.path.join(checkpoint_dir, f"sink{sink_index}.seg{segment_index:04d}{ext}"))
+
+
+def _records_path(checkpoint_dir, segment_index):
+    return os.path.join(checkpoint_dir, f"records.seg{segment_index:04d}.npz")
+
+
+def run_checkpointed(
+    source_video_path,
+    sinks,
+    detection_model,
+    team_classifier,
+    keypoint_model=None,
+    checkpoint_dir='checkpoint',
+    segment_frames=1500,
+    desc="Analysing video",
+    cancel_event=None,
+    progress_callback=None,
+    **options
+):
+    """
+    Analyse une longue vidéo par segments consécutifs de `segment_frames`
+    frames, avec un point de reprise dans `checkpoint_dir` après chaque
+    segment : frame suivante, état du tracker, mémoire d'équipes et
+    keyframes (`AnalysisPipeline.state`), état des rendus, records et
+    segments vidéo déjà encodés.
+
+    Relancée après une interruption (arrêt du processus, redéploiement,
+    annulation), la même analyse reprend au dernier segment terminé au lieu
+    de la frame 0. L'état étant repris à l'identique, les segments sont les
+    mêmes qu'en une seule exécution, et les vidéos finales (segments
+    concaténés sans ré-encodage) aussi. Pour reprendre, passer le
+    classificateur renvoyé par `checkpointed_team_classifier`.
+
+    `options` est transmis à `AnalysisPipeline` ; avec `cache`, une analyse
+    déjà en cache est seulement redessinée. Le point de reprise est supprimé
+    une fois les sorties finales écrites.
+    """
+    cache = options.pop('cache', None)
+    pipeline = AnalysisPipeline(detection_model, team_classifier, keypoint_model=keypoint_model, cache=cache, **options)
+    video_info = sv.VideoInfo.from_video_path(source_video_path)
+    total = video_info.total_frames
+    with_homography = any(sink.requires_homography for sink in sinks)
+    if cache is not None and pipeline.load_cached(source_video_path, with_homography, 0, total) is not None:
+        return pipeline.run(
+            source_video_path, sinks, desc=desc, cancel_event=cancel_event, progress_callback=progress_callback
+        )
+    cache_key = pipeline.cache_key(source_video_path, with_homography, 0, total) if cache is not None else None
+    # Les segments ne sont pas mis en cache individuellement
+    pipeline.cache = None
+
+    segments = plan_segments(total, segment_frames)
+    record_sinks = [sink for sink in sinks if isinstance(sink, RecordCollector)]
+    video_sinks = [sink for sink in sinks if not isinstance(sink, RecordCollector)]
+    fingerprint = checkpoint_fingerprint(
+        source_video_path, sinks, detection_model, keypoint_model, segment_frames, options
+    )
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    checkpoint = load_checkpoint(checkpoint_dir, fingerprint)
+    if checkpoint is None:
+        checkpoint = {'fingerprint': fingerprint, 'next_segment': 0, 'pipeline': None, 'sinks': None}
+        save_team_classifier(team_classifier, checkpoint_dir, TEAM_CLASSIFIER_ID)
+    else:
+        pipeline.restore(checkpoint['pipeline'])
+        for sink, state in zip(video_sinks, checkpoint['sinks']):
+            sink.restore(state)
+        logger.info(
+            "Reprise au segment %d/%d (frame %d)",
+            checkpoint['next_segment'] + 1, len(segments), pipeline.frame_index
+        )
+    resumed_from = segments[checkpoint['next_segment']][0] if checkpoint['next_segment'] < len(segments) else total
+
+    profiler = pipeline.profiler
+    started = time.perf_counter()
+    frames = 0
+    first_frame = None
+    queues = {}
+    # Un seul profilage pour tous les segments de ce traitement
+    profiler.start()
+    try:
+        for index in range(checkpoint['next_segment'], len(segments)):
+            start, end = segments[index]
+            collector = RecordCollector(requires_homography=with_homography)
+            segment_sinks = [_segment_sink(checkpoint_dir, sink, i, index) for i, sink in enumerate(video_sinks)]
+
+            # Progression de ce traitement seulement : débit et temps restant restent justes après une reprise
+            def segment_progress(done, _, offset=start - resumed_from):
+                progress_callback(offset + done, total - resumed_from)
+
+            segment_started = time.perf_counter()
+            stats = pipeline.run(
+                source_video_path,
+                segment_sinks + [collector],
+                desc=f"{desc} [{start}-{end}]",
+                cancel_event=cancel_event,
+                start=start,
+                end=end,
+                progress_callback=segment_progress if progress_callback is not None else None,
+                reset=index == 0
+            )
+            frames += stats['frames']
+            if first_frame is None and 'time_to_first_frame' in stats:
+                first_frame = segment_started - started + stats['time_to_first_frame']
+            _merge_queue_depths(queues, stats.get('queues', {}), stats['frames'])
+
+            save_records(_records_path(checkpoint_dir, index), collector.records, start=start)
+            checkpoint.update(
+                next_segment=index + 1,
+                pipeline=pipeline.state(),
+                sinks=[sink.state() for sink in segment_sinks]
+            )
+            save_checkpoint(checkpoint_dir, checkpoint)
+            # Les sorties d'origine suivent l'état des rendus pour le segment suivant
+            for sink, state in zip(video_sinks, checkpoint['sinks']):
+                sink.restore(state)
+
+        all_records = []
+        for index in range(len(segments)):
+            records, _ = load_records(_records_path(checkpoint_dir, index))
+            all_records.extend(records)
+        if cache is not None:
+            cache.store(cache_key, all_records)
+
+        if record_sinks:
+            render_info = sv.VideoInfo(width=video_info.width, height=video_info.height, fps=video_info.fps, total_frames=total)
+            if pipeline.frame_scale != 1.0:
+                render_info.width, render_info.height = pipeline.scaled_size(video_info)
+            render_records(all_records, record_sinks, render_info)
+
+        for i, sink in enumerate(video_sinks):
+            parts = [_segment_sink(checkpoint_dir, sink, i, index) for index in range(len(segments))]
+            concatenate_videos([part.target_video_path for part in parts], sink.target_video_path)
+            for j, side_output in enumerate(sink.side_outputs):
+                _concatenate_csv([part.side_outputs[j] for part in parts], side_output)
+    finally:
+        profiler.stop()
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+    stats = pipeline.report(frames, time.perf_counter() - started)
+    stats.update(segments=len(segments), resumed_from=resumed_from)
+    if profiler.enabled:
+        stats['profile'] = profiler.report()
+    if first_frame is not None:
+        stats['time_to_first_frame'] = first_frame
+    if queues:
+        stats['queues'] = {
+            name: {'mean': total_depth / count if count else 0.0, 'max': peak}
+            for name, (total_depth, count, peak) in queues.items()
+        }
+    logger.info("%d segments, reprise à la frame %d", len(segments), resumed_from)
+    return stats
+
+
+def _merge_queue_depths(merged, depths, frames):
+    """Cumule les profondeurs de files d'un segment, moyennes pondérées par son nombre de frames."""
+    for name, depth in depths.items():
+        total_depth, count, peak = merged.get(name, (0.0, 0, 0))
+        merged[name] = (total_depth + depth['mean'] * frames, count + frames, max(peak, depth['max']))
+
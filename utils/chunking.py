@@ -0,0 +1,328 @@
+import supervision as sv
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import numpy as np
+from .export import detection_weights, weights_file
+from .helpers import match_boxes
+from .pipeline import PLAYER_ID, AnalysisPipeline, RecordCollector, render_records
+from .stages import PipelineCancelled
+
+logger = logging.getLogger(__name__)
+
+# Modèles chargés une seule fois par processus de travail
+_WORKER = {}
+
+
+def plan_chunks(total_frames, n_chunks):
+    """
+    Découpe `[0, total_frames)` en `n_chunks` plages contiguës `(start, end)`.
+    """
+    n_chunks = max(1, min(n_chunks, total_frames))
+    bounds = np.linspace(0, total_frames, n_chunks + 1).astype(int)
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _init_worker(model_args, team_classifier, threads):
+    import torch
+    from .detection import load_models
+
+    torch.set_num_threads(threads)
+    detection_model, keypoint_model = load_models(*model_args)
+    _WORKER.update(
+        detection_model=detection_model,
+        keypoint_model=keypoint_model,
+        team_classifier=team_classifier
+    )
+
+
+def _analyse_chunk(source_video_path, start, end, overlap, requires_homography, options, cancel_event=None):
+    pipeline = AnalysisPipeline(
+        _WORKER['detection_model'],
+        _WORKER['team_classifier'],
+        keypoint_model=_WORKER['keypoint_model'] if requires_homography else None,
+        **options
+    )
+    collector = RecordCollector(requires_homography=requires_homography)
+    pipeline.run(
+        source_video_path,
+        [collector],
+        desc=f"Analysing frames {start}-{end}",
+        cancel_event=cancel_event,
+        start=max(0, start - overlap),
+        end=end
+    )
+    return collector.records
+
+
+def _render_chunk(source_video_path, sinks, records, start, video_info):
+    render_records(
+        records,
+        sinks,
+        video_info,
+        source_video_path=source_video_path,
+        start=start,
+        desc=f"Rendering frames {start}-{start + len(records)}"
+    )
+
+
+def _gather(futures, cancel_event=None, worker_cancel=None, poll_interval=0.2):
+    """
+    Résultats des `futures`, dans l'ordre. Si `cancel_event` est levé, les
+    tâches en attente sont abandonnées, celles en cours prévenues par
+    `worker_cancel`, et `PipelineCancelled` est levée.
+    """
+    pending = set(futures)
+    while pending:
+        _, pending = wait(pending, timeout=poll_interval)
+        if cancel_event is not None and cancel_event.is_set():
+            if worker_cancel is not None:
+                worker_cancel.set()
+            for future in pending:
+                future.cancel()
+            raise PipelineCancelled("Traitement annulé")
+    return [future.result() for future in futures]
+
+
+def _keypoint_weights(roboflow_model_id):
+    return weights_file(roboflow_model_id) if os.path.exists(roboflow_model_id) else roboflow_model_id
+
+
+def _match_tracks(previous, current, iou_threshold):
+    """
+    Associe les pistes locales de `current` aux pistes globales de `previous`
+    (mêmes frames) par vote sur le recouvrement des boîtes : à chaque frame,
+    les boîtes sont appariées une à une et seulement à rôle égal (un arbitre
+    ne reprend jamais l'identifiant d'un joueur).
+    """
+    votes = Counter()
+    for a, b in zip(previous, current):
+        for i, j, _ in match_boxes(b['xyxy'], a['xyxy'], iou_threshold, b['role'], a['role']):
+            votes[(int(b['tracker_id'][i]), int(a['tracker_id'][j]))] += 1
+
+    mapping, matched = {}, set()
+    for (local_id, global_id), _ in votes.most_common():
+        if local_id in mapping or global_id in matched:
+            continue
+        mapping[local_id] = global_id
+        matched.add(global_id)
+
+    teams = {}
+    for record in previous:
+        players = record['role'] == PLAYER_ID
+        for tid, team in zip(record['tracker_id'][players], record['class_id'][players]):
+            if int(tid) in matched:
+                teams.setdefault(int(tid), Counter())[int(team)] += 1
+    team_override = {tid: counts.most_common(1)[0][0] for tid, counts in teams.items()}
+
+    return mapping, team_override
+
+
+def _remap(record, mapping, team_override):
+    record = dict(record)
+    tracker_id = np.array([mapping[int(tid)] for tid in record['tracker_id']], dtype=np.int32)
+    class_id = record['class_id'].copy()
+    for i in np.flatnonzero(record['role'] == PLAYER_ID):
+        class_id[i] = team_override.get(int(tracker_id[i]), class_id[i])
+    record['tracker_id'] = tracker_id
+    record['class_id'] = class_id
+    return record
+
+
+def stitch_chunks(chunks, chunk_records, iou_threshold=0.5):
+    """
+    Raccorde les morceaux analysés indépendamment en une chronologie globale.
+
+    Chaque morceau commence quelques frames avant son début (`overlap`) ;
+    sur ces frames communes, ses pistes sont associées à celles du morceau
+    précédent, dont elles reprennent l'identifiant et l'équipe. Les autres
+    pistes reçoivent de nouveaux identifiants. Renvoie, pour chaque morceau,
+    ses records limités à `[start, end)`.
+    """
+    stitched = []
+    previous = []
+    next_id = 1
+    for (start, end), records in zip(chunks, chunk_records):
+        lead = len(records) - (end - start)
+        shared = min(lead, len(previous))
+
+        mapping, team_override = {}, {}
+        if shared > 0:
+            mapping, team_override = _match_tracks(previous[-shared:], records[lead - shared:lead], iou_threshold)
+
+        for tid in sorted({int(tid) for record in records for tid in record['tracker_id']}):
+            if tid not in mapping:
+                mapping[tid] = next_id
+                next_id += 1
+
+        previous = [_remap(record, mapping, team_override) for record in records[lead:]]
+        stitched.append(previous)
+    return stitched
+
+
+def concatenate_videos(part_paths, target_video_path):
+    """
+    Concatène des vidéos de même format, sans ré-encodage si ffmpeg est disponible.
+    """
+    if shutil.which('ffmpeg'):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as list_file:
+            for path in part_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                list_file.write(f"file '{escaped}'\n")
+        try:
+            subprocess.run(
+                ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                 '-i', list_file.name, '-c', 'copy', '-movflags', '+faststart', target_video_path],
+                check=True
+            )
+        finally:
+            os.remove(list_file.name)
+        return
+
+    video_info = sv.VideoInfo.from_video_path(part_paths[0])
+    with sv.VideoSink(target_video_path, video_info=video_info) as video_sink:
+        for path in part_paths:
+            for frame in sv.get_video_frames_generator(path):
+                video_sink.write_frame(frame)
+
+
+def _concatenate_csv(part_paths, target_path):
+    """Concatène des CSV de mêmes colonnes en gardant un seul en-tête."""
+    with open(target_path, 'w', newline='') as target:
+        for i, path in enumerate(part_paths):
+            with open(path, newline='') as part:
+                lines = part.readlines()
+            target.writelines(lines if i == 0 else lines[1:])
+
+
+def _part_path(target_video_path, index):
+    root, ext = os.path.splitext(target_video_path)
+    return f"{root}.part{index:03d}{ext}"
+
+
+def run_chunked_analysis(
+    source_video_path,
+    sinks,
+    model_args,
+    team_classifier,
+    workers=None,
+    overlap=30,
+    cancel_event=None,
+    **options
+):
+    """
+    Analyse une longue vidéo par morceaux dans plusieurs processus.
+
+    Chaque processus charge ses propres modèles (`model_args` est passé à
+    `load_models`) et son propre ByteTrack ; les morceaux sont analysés en
+    parallèle avec `overlap` frames de recouvrement, raccordés par
+    `stitch_chunks`, rendus en parallèle puis concaténés dans les vidéos
+    finales. `options` est transmis à `AnalysisPipeline` ; avec `cache`,
+    une analyse déjà en cache est seulement redessinée. Si `cancel_event`
+    est levé, les morceaux en attente sont abandonnés et ceux en cours
+    interrompus (`PipelineCancelled`).
+    """
+    workers = workers or os.cpu_count() or 1
+    cache = options.pop('cache', None)
+    video_info = sv.VideoInfo.from_video_path(source_video_path)
+    requires_homography = any(sink.requires_homography for sink in sinks)
+
+    chunks = plan_chunks(video_info.total_frames, workers)
+    # Pistes raccordées entre morceaux : résultat propre au découpage, distinct d'une analyse en un seul processus
+    chunking = {'chunks': chunks, 'overlap': overlap}
+    if cache is not None:
+        # Les poids que chargeront les processus (export du backend choisi) suffisent à calculer la clé
+        keying = AnalysisPipeline(
+            detection_weights(model_args[0], *model_args[3:]),
+            team_classifier,
+            keypoint_model=_keypoint_weights(model_args[1]),
+            cache=cache,
+            **options
+        )
+        records = keying.load_cached(source_video_path, requires_homography, 0, video_info.total_frames, chunking=chunking)
+        if records is not None:
+            started = time.perf_counter()
+            render_records(records, sinks, video_info, source_video_path)
+            return keying.report(len(records), time.perf_counter() - started)
+
+    threads = max(1, (os.cpu_count() or 1) // len(chunks))
+    context = multiprocessing.get_context('spawn')
+
+    started = time.perf_counter()
+    # Événement partagé avec les processus, levé si `cancel_event` l'est
+    manager = context.Manager() if cancel_event is not None else None
+    worker_cancel = manager.Event() if manager is not None else None
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(chunks),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_args, team_classifier, threads)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _analyse_chunk, source_video_path, start, end, overlap, requires_homography, options, worker_cancel
+                )
+                for start, end in chunks
+            ]
+            chunk_records = _gather(futures, cancel_event, worker_cancel)
+    finally:
+        if manager is not None:
+            manager.shutdown()
+
+    if cancel_event is not None and cancel_event.is_set():
+        raise PipelineCancelled("Traitement annulé")
+    stitched = stitch_chunks(chunks, chunk_records)
+    all_records = [record for records in stitched for record in records]
+    if cache is not None:
+        cache.store(
+            keying.cache_key(source_video_path, requires_homography, 0, video_info.total_frames, chunking=chunking),
+            all_records
+        )
+
+    # Les exports de données n'ont pas d'image à dessiner : écrits directement
+    record_sinks = [sink for sink in sinks if isinstance(sink, RecordCollector)]
+    sinks = [sink for sink in sinks if not isinstance(sink, RecordCollector)]
+    if record_sinks:
+        render_records(all_records, record_sinks, video_info)
+
+    part_sinks = [
+        [sink.with_target(_part_path(sink.target_video_path, index)) for sink in sinks]
+        for index in range(len(chunks))
+    ]
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=context) as executor:
+        futures = [
+            executor.submit(_render_chunk, source_video_path, chunk_sinks, records, start, video_info)
+            for chunk_sinks, (start, _), records in zip(part_sinks, chunks, stitched)
+        ]
+        _gather(futures, cancel_event)
+
+    for i, sink in enumerate(sinks):
+        parts = [chunk_sinks[i].target_video_path for chunk_sinks in part_sinks]
+        concatenate_videos(parts, sink.target_video_path)
+        for j, side_output in enumerate(sink.side_outputs):
+            side_parts = [chunk_sinks[i].side_outputs[j] for chunk_sinks in part_sinks]
+            _concatenate_csv(side_parts, side_output)
+            parts += side_parts
+        for path in parts:
+            os.remove(path)
+
+    seconds = time.perf_counter() - started
+    stats = {
+        'frames': video_info.total_frames,
+        'seconds': seconds,
+        'fps': video_info.total_frames / seconds if seconds > 0 else 0.0,
+        'batch_size': options.get('batch_size', 1),
+        'workers': len(chunks)
+    }
+    logger.info(
+        "%d frames en %.1f s (%.2f FPS) sur %d processus",
+        stats['frames'], seconds, stats['fps'], stats['workers']
+    )
+    return stats
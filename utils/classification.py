@@ -0,0 +1,129 @@
+import supervision as sv
+from collections import deque
+import numpy as np
+
+
+class _TrackTeamState:
+    """État d'équipe mémorisé pour un `tracker_id`."""
+
+    def __init__(self, history_size):
+        self.votes = deque(maxlen=history_size)
+        self.last_checked = -1
+        self.last_seen = -1
+
+    @property
+    def team_id(self) -> int:
+        """Vote majoritaire ; en cas d'égalité, la prédiction la plus récente."""
+        counts = np.bincount(np.array(self.votes, dtype=int), minlength=2)
+        if counts[0] == counts[1]:
+            return int(self.votes[-1])
+        return int(np.argmax(counts))
+
+    @property
+    def confidence(self) -> float:
+        """Part des votes en accord avec l'équipe retenue."""
+        votes = np.array(self.votes, dtype=int)
+        return float(np.mean(votes == self.team_id))
+
+
+class TeamAssignmentCache:
+    """
+    Mémoire d'équipe par piste ByteTrack.
+
+    Les nouvelles pistes sont classifiées immédiatement ; les pistes connues
+    ne sont re-vérifiées que toutes les `refresh_interval` frames ou lorsque
+    leur vote est incertain (confiance < `min_confidence`). L'équipe retenue
+    est le vote majoritaire des `history_size` dernières prédictions. Les
+    pistes absentes depuis plus de `max_missing` frames sont oubliées.
+    """
+
+    def __init__(
+        self,
+        team_classifier,
+        refresh_interval=30,
+        history_size=15,
+        min_confidence=0.6,
+        max_missing=90
+    ):
+        self.team_classifier = team_classifier
+        self.refresh_interval = refresh_interval
+        self.history_size = history_size
+        self.min_confidence = min_confidence
+        self.max_missing = max_missing
+        self.reset()
+
+    def reset(self):
+        self.tracks = {}
+        self.hits = 0
+        self.misses = 0
+        self.embedding_calls = 0
+
+    def _needs_check(self, state, frame_index) -> bool:
+        return (
+            state is None
+            or frame_index - state.last_checked >= self.refresh_interval
+            or state.confidence < self.min_confidence
+        )
+
+    def predict(self, frame, players_detections: sv.Detections, frame_index) -> np.ndarray:
+        """
+        Renvoie l'équipe (0 ou 1) de chaque joueur détecté, en ne passant
+        au classificateur que les crops des pistes à (re)vérifier.
+        """
+        if len(players_detections) == 0:
+            self._evict(frame_index)
+            return np.array([], dtype=int)
+
+        if players_detections.tracker_id is None:
+            self.misses += len(players_detections)
+            self.embedding_calls += 1
+            crops = [sv.crop_image(frame, xyxy) for xyxy in players_detections.xyxy]
+            return np.asarray(self.team_classifier.predict(crops), dtype=int)
+
+        tracker_ids = [int(tid) for tid in players_detections.tracker_id]
+        to_check = [
+            i for i, tid in enumerate(tracker_ids)
+            if self._needs_check(self.tracks.get(tid), frame_index)
+        ]
+
+        if to_check:
+            crops = [sv.crop_image(frame, players_detections.xyxy[i]) for i in to_check]
+            predictions = self.team_classifier.predict(crops)
+            self.embedding_calls += 1
+            for i, team_id in zip(to_check, predictions):
+                state = self.tracks.get(tracker_ids[i])
+                if state is None:
+                    state = self.tracks[tracker_ids[i]] = _TrackTeamState(self.history_size)
+                state.votes.append(int(team_id))
+                state.last_checked = frame_index
+
+        self.misses += len(to_check)
+        self.hits += len(tracker_ids) - len(to_check)
+
+        team_ids = []
+        for tid in tracker_ids:
+            state = self.tracks[tid]
+            state.last_seen = frame_index
+            team_ids.append(state.team_id)
+
+        self._evict(frame_index)
+        return np.array(team_ids, dtype=int)
+
+    def _evict(self, frame_index):
+        lost = [
+            tid for tid, state in self.tracks.items()
+            if frame_index - state.last_seen > self.max_missing
+        ]
+        for tid in lost:
+            del self.tracks[tid]
+
+    @property
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'embedding_calls': self.embedding_calls,
+            'active_tracks': len(self.tracks)
+        }
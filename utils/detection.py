@@ -1,34 +1,144 @@
 import supervision as sv
+import os
 import torch
-from ultralytics import YOLO
-from inference import get_model
 from sports.common.team import TeamClassifier
 from tqdm import tqdm
 import numpy as np
+from .export import load_detection_model
+from .keypoints import LocalKeypointModel
+from .helpers import batched, predict_batch, read_frames, sample_frame_indices
+from .team_store import check_team_classifier, load_team_classifier, save_team_classifier
 
-def load_models(yolo_path, roboflow_model_id, roboflow_api_key):
+def load_models(yolo_path, roboflow_model_id, roboflow_api_key, backend='auto'):
     """
     Charge les modèles YOLO11 et le modèle de détection de points clés.
+    `backend` choisit le moteur d'inférence de YOLO11 (voir `load_detection_model`).
+    Si `roboflow_model_id` est un chemin de poids existant, le modèle de
+    points clés est chargé localement (`LocalKeypointModel`), sans Roboflow.
     """
-    detection_model = YOLO(yolo_path)
-    keypoint_model = get_model(model_id=roboflow_model_id, api_key=roboflow_api_key)
+    detection_model = load_detection_model(yolo_path, backend)
+    if os.path.exists(roboflow_model_id):
+        keypoint_model = LocalKeypointModel(roboflow_model_id)
+    else:
+        from inference import get_model
+        keypoint_model = get_model(model_id=roboflow_model_id, api_key=roboflow_api_key)
     return detection_model, keypoint_model
 
-def train_team_classifier(video_path, detection_model, player_id=2, stride=30):
+class CropReservoir:
+    """
+    Échantillon aléatoire uniforme d'au plus `capacity` crops parmi un flux
+    de taille inconnue (algorithme du réservoir) : la mémoire reste bornée
+    quelle que soit la longueur de la vidéo.
+    """
+
+    def __init__(self, capacity, seed=0):
+        self.capacity = capacity
+        self.crops = []
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, crop):
+        self.seen += 1
+        if len(self.crops) < self.capacity:
+            self.crops.append(crop)
+            return
+        slot = self.rng.integers(self.seen)
+        if slot < self.capacity:
+            self.crops[slot] = crop
+
+def collect_player_crops(
+    video_path,
+    detection_model,
+    player_id=2,
+    stride=30,
+    batch_size=8,
+    max_frames=300,
+    max_crops=2000,
+    seed=0
+):
+    """
+    Collecte des crops de joueurs sur la vidéo.
+
+    Une frame toutes les `stride` frames est lue par accès direct (au plus
+    `max_frames`, réparties sur toute la vidéo), détectée par batchs, et au
+    plus `max_crops` crops sont conservés.
+    """
+    video_info = sv.VideoInfo.from_video_path(video_path)
+    indices = sample_frame_indices(video_info.total_frames, stride, max_frames=max_frames, seed=seed)
+    
+    frames = read_frames(video_path, indices)
+    return collect_crops_from_frames(
+        frames, detection_model, player_id=player_id, batch_size=batch_size,
+        max_crops=max_crops, seed=seed, total=len(indices)
+    )
+
+def collect_crops_from_frames(frames, detection_model, player_id=2, batch_size=8, max_crops=2000, seed=0, total=None):
+    """
+    Collecte au plus `max_crops` crops de joueurs sur un itérable de frames
+    (vidéo échantillonnée ou flux en direct), détectées par batchs.
+    """
+    reservoir = CropReservoir(max_crops, seed=seed)
+    n_batches = -(-total // batch_size) if total else None
+    for batch in tqdm(batched(frames, batch_size), total=n_batches, desc='Collecting crops for team classification'):
+        for frame, detections in zip(batch, predict_batch(detection_model, batch, confidence=0.3)):
+            players_detections = detections[detections.class_id == player_id]
+            for xyxy in players_detections.xyxy:
+                reservoir.add(sv.crop_image(frame, xyxy))
+    
+    return reservoir.crops
+
+def train_team_classifier(video_path, detection_model, player_id=2, stride=30, **sampling):
     """
     Entraîne le classificateur d'équipes sur la vidéo fournie.
+    `sampling` est passé à `collect_player_crops` (batch_size, max_frames, max_crops...).
     """
-    frame_generator = sv.get_video_frames_generator(source_path=video_path, stride=stride)
+    crops = collect_player_crops(video_path, detection_model, player_id=player_id, stride=stride, **sampling)
+    
+    team_classifier = TeamClassifier(device="cuda" if torch.cuda.is_available() else "cpu")
+    team_classifier.fit(crops)
     
-    crops = []
-    for frame in tqdm(frame_generator, desc='Collecting crops for team classification'):
-        result = detection_model.predict(frame, conf=0.3)[0]
-        detections = sv.Detections.from_ultralytics(result)
-        players_detections = detections[detections.class_id == player_id]
-        players_crops = [sv.crop_image(frame, xyxy) for xyxy in players_detections.xyxy]
-        crops += players_crops
+    return team_classifier
+
+def train_team_classifier_from_frames(frames, detection_model, player_id=2, **sampling):
+    """
+    Entraîne le classificateur d'équipes sur un itérable de frames (flux en
+    direct). `sampling` est passé à `collect_crops_from_frames`.
+    """
+    crops = collect_crops_from_frames(frames, detection_model, player_id=player_id, **sampling)
     
     team_classifier = TeamClassifier(device="cuda" if torch.cuda.is_available() else "cpu")
     team_classifier.fit(crops)
     
-    return team_classifier
\ No newline at end of file
+    return team_classifier
+
+def get_team_classifier(
+    video_path,
+    detection_model,
+    match_id=None,
+    store_dir="models/team_classifiers",
+    player_id=2,
+    stride=30,
+    check_frames=30,
+    check_crops=200,
+    **sampling
+):
+    """
+    Classificateur d'équipes pour `match_id` (match ou paire de maillots).
+
+    S'il a déjà été entraîné, il est rechargé et seulement vérifié sur un
+    petit échantillon de la nouvelle vidéo ; sinon il est entraîné puis
+    enregistré. Renvoie `(team_classifier, avertissements)`.
+    """
+    if match_id:
+        team_classifier, profile = load_team_classifier(store_dir, match_id)
+        if team_classifier is not None:
+            crops = collect_player_crops(
+                video_path, detection_model, player_id=player_id, stride=stride,
+                batch_size=sampling.get('batch_size', 8), max_frames=check_frames, max_crops=check_crops
+            )
+            return team_classifier, check_team_classifier(team_classifier, profile, crops)
+    
+    team_classifier = train_team_classifier(video_path, detection_model, player_id=player_id, stride=stride, **sampling)
+    if match_id:
+        save_team_classifier(team_classifier, store_dir, match_id)
+    return team_classifier, []
\ No newline at end of file
@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+import logging
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+import supervision as sv
+
+logger = logging.getLogger(__name__)
+
+ENCODER_BACKENDS = ('auto', 'ffmpeg', 'opencv')
+
+
+class FFmpegVideoSink:
+    """
+    Même interface que `sv.VideoSink`, mais les frames brutes (BGR) sont
+    envoyées par un pipe à un processus ffmpeg : l'encodage tourne en
+    parallèle de l'analyse, sur d'autres cœurs. Le MP4 produit est en
+    `yuv420p` avec l'index en tête de fichier (`faststart`), lisible
+    directement par un navigateur en H.264.
+    """
+
+    def __init__(self, target_path, video_info, codec='libx264', preset='veryfast', crf=23, height=None):
+        self.target_path = target_path
+        self.video_info = video_info
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.height = height
+        self.process = None
+        self._stderr = None
+
+    def command(self) -> list:
+        width, height = self.video_info.resolution_wh
+        if self.height and self.height < height:
+            scale = f"scale=-2:{self.height}"
+        else:
+            # yuv420p impose des dimensions paires
+            scale = "scale=trunc(iw/2)*2:trunc(ih/2)*2"
+        return [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f"{width}x{height}", '-r', str(self.video_info.fps),
+            '-i', '-',
+            '-vf', scale,
+            '-c:v', self.codec, '-preset', self.preset, '-crf', str(self.crf),
+            '-pix_fmt', 'yuv420p', '-movflags', '+faststart', '-an',
+            self.target_path
+        ]
+
+    def __enter__(self):
+        self._stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(self.command(), stdin=subprocess.PIPE, stderr=self._stderr)
+        return self
+
+    def _error(self) -> str:
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors='replace').strip()
+
+    def write_frame(self, frame):
+        if frame.shape[1::-1] != self.video_info.resolution_wh:
+            raise ValueError(
+                f"Frame de taille {frame.shape[1]}x{frame.shape[0]} pour une vidéo "
+                f"{self.video_info.width}x{self.video_info.height} ({self.target_path})"
+            )
+        try:
+            self.process.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            self.process.wait()
+            raise RuntimeError(f"Encodage ffmpeg interrompu ({self.target_path}) : {self._error()}")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self.process.wait()
+        error = self._error()
+        self._stderr.close()
+        if returncode != 0 and exc_type is None:
+            raise RuntimeError(f"Encodage ffmpeg en échec ({self.target_path}) : {error}")
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_available() -> bool:
+    if shutil.which('ffmpeg'):
+        return True
+    logger.warning("ffmpeg introuvable : vidéos encodées par OpenCV (mp4v, peu lisibles dans un navigateur)")
+    return False
+
+
+@dataclass
+class VideoEncoder:
+    """
+    Réglages d'encodage des vidéos produites. `backend` vaut `ffmpeg`
+    (`FFmpegVideoSink` : codec, preset, CRF et hauteur de sortie), `opencv`
+    (`sv.VideoSink`, mp4v, réglages ignorés) ou `auto` (ffmpeg s'il est
+    installé).
+    """
+    backend: str = 'auto'
+    codec: str = 'libx264'
+    preset: str = 'veryfast'
+    crf: int = 23
+    height: Optional[int] = None
+
+    def resolve_backend(self) -> str:
+        if self.backend not in ENCODER_BACKENDS:
+            raise ValueError(f"Encodeur inconnu : {self.backend} (attendu : {', '.join(ENCODER_BACKENDS)})")
+        if self.backend != 'auto':
+            return self.backend
+        return 'ffmpeg' if ffmpeg_available() else 'opencv'
+
+    def open(self, target_path, video_info):
+        """Écrivain vidéo (gestionnaire de contexte avec `write_frame`) pour `target_path`."""
+        if self.resolve_backend() == 'ffmpeg':
+            return FFmpegVideoSink(target_path, video_info, self.codec, self.preset, self.crf, self.height)
+        return sv.VideoSink(target_path, video_info=video_info)
@@ -0,0 +1,315 @@
+import importlib.util
+import json
+import logging
+import os
+import time
+import cv2
+import numpy as np
+import supervision as sv
+from .cache import file_digest
+from .helpers import match_boxes, predict_batch, read_frames, sample_frame_indices
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('pytorch', 'onnx', 'openvino')
+# Ordre de préférence sur CPU : OpenVINO puis ONNX Runtime, INT8 d'abord
+CPU_PREFERENCE = (('openvino', True), ('openvino', False), ('onnx', True), ('onnx', False))
+_RUNTIMES = {'onnx': 'onnxruntime', 'openvino': 'openvino'}
+
+
+def exported_path(yolo_path, backend, int8=False) -> str:
+    """
+    Chemin de l'export de `yolo_path` (noms produits par ultralytics) :
+    `<nom>[_int8].onnx` ou dossier `<nom>[_int8]_openvino_model`.
+    """
+    root, _ = os.path.splitext(yolo_path)
+    suffix = '_int8' if int8 else ''
+    if backend == 'onnx':
+        return f"{root}{suffix}.onnx"
+    if backend == 'openvino':
+        return f"{root}{suffix}_openvino_model"
+    if backend == 'pytorch':
+        return yolo_path
+    raise ValueError(f"Backend inconnu : {backend} (attendu : {', '.join(BACKENDS)})")
+
+
+def _manifest_path(path):
+    return f"{path.rstrip(os.sep)}.json"
+
+
+def weights_file(path):
+    """Fichier de poids d'un export (le `.bin` d'un dossier OpenVINO)."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.bin'):
+                return os.path.join(path, name)
+    return path
+
+
+def _letterbox(frame, imgsz):
+    height, width = frame.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    resized = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top = (imgsz - resized.shape[0]) // 2
+    left = (imgsz - resized.shape[1]) // 2
+    canvas[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+    return canvas
+
+
+def _quantize_onnx(source_path, target_path, calibration_video, imgsz, n_frames=100):
+    """
+    Quantification INT8 statique (QDQ, par canal) d'un export ONNX, calibrée
+    sur des frames de `calibration_video` prétraitées comme par ultralytics.
+    """
+    import onnxruntime
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    input_name = onnxruntime.InferenceSession(source_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    total_frames = int(sv.VideoInfo.from_video_path(calibration_video).total_frames)
+    indices = sample_frame_indices(total_frames, stride=1, max_frames=n_frames)
+
+    class VideoCalibration(CalibrationDataReader):
+        def __init__(self):
+            self.frames = read_frames(calibration_video, indices)
+
+        def get_next(self):
+            frame = next(self.frames, None)
+            if frame is None:
+                return None
+            image = _letterbox(frame, imgsz)[:, :, ::-1].transpose(2, 0, 1)
+            return {input_name: (image[None].astype(np.float32) / 255.0)}
+
+    quantize_static(
+        source_path,
+        target_path,
+        VideoCalibration(),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8
+    )
+
+
+def export_detection_model(yolo_path, backend='openvino', int8=False, imgsz=None, data=None, calibration_video=None):
+    """
+    Exporte le modèle YOLO `yolo_path` (détection, ou pose pour les points
+    clés du terrain) pour l'inférence CPU et écrit à côté
+    un manifeste (`<export>.json` : taille d'entrée, empreinte des poids
+    source). L'entrée a un batch dynamique, pour les micro-batchs du
+    pipeline. En INT8, OpenVINO se calibre sur le jeu `data` (YAML
+    ultralytics) et ONNX sur des frames de `calibration_video`.
+    Renvoie le chemin de l'export.
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(yolo_path)
+    imgsz = imgsz or model.overrides.get('imgsz', 640)
+    target = exported_path(yolo_path, backend, int8)
+
+    if backend == 'onnx':
+        exported = model.export(format='onnx', imgsz=imgsz, simplify=True, dynamic=True)
+        if int8:
+            if calibration_video is None:
+                raise ValueError("La quantification INT8 ONNX demande une vidéo de calibration")
+            _quantize_onnx(exported, target, calibration_video, imgsz)
+    elif backend == 'openvino':
+        if int8 and data is None:
+            raise ValueError("La quantification INT8 OpenVINO demande un jeu de calibration (`data`)")
+        exported = model.export(
+            format='openvino', imgsz=imgsz, int8=int8, dynamic=True, **({'data': data} if data else {})
+        )
+        if os.path.abspath(exported) != os.path.abspath(target):
+            os.replace(exported, target)
+    else:
+        raise ValueError(f"Export impossible vers {backend} (attendu : onnx, openvino)")
+
+    manifest = {
+        'source': yolo_path,
+        'source_digest': file_digest(yolo_path),
+        'backend': backend,
+        'int8': int8,
+        'imgsz': imgsz,
+        'dynamic': True
+    }
+    with open(_manifest_path(target), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    logger.info("Modèle exporté : %s (%s%s, imgsz=%s)", target, backend, ', INT8' if int8 else '', imgsz)
+    return target
+
+
+def export_manifest(path):
+    """Manifeste écrit par `export_detection_model` pour `path`, ou `None`."""
+    manifest_path = _manifest_path(path)
+    if not os.path.exists(path) or not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as file:
+        return json.load(file)
+
+
+def max_batch_size(manifest):
+    """
+    Nombre maximal de frames par appel d'un export : `None` (illimité) pour
+    PyTorch et les exports à batch dynamique, 1 pour les exports antérieurs
+    dont le graphe a un batch fixe.
+    """
+    if manifest is None or manifest.get('dynamic'):
+        return None
+    return 1
+
+
+def _read_manifest(yolo_path, path):
+    """Manifeste d'un export à jour, ou `None` (absent ou périmé)."""
+    manifest = export_manifest(path)
+    if manifest is None:
+        return None
+    if os.path.exists(yolo_path) and manifest.get('source_digest') != file_digest(yolo_path):
+        logger.warning("Export %s périmé (poids %s modifiés depuis) : ignoré", path, yolo_path)
+        return None
+    return manifest
+
+
+def select_detection_backend(yolo_path, backend='auto', int8=None):
+    """
+    Choisit le modèle de détection à charger. En `auto` : PyTorch si un GPU
+    est disponible, sinon le meilleur export à jour dont le runtime est
+    installé (voir `CPU_PREFERENCE`), sinon PyTorch. `int8` restreint le
+    choix aux exports quantifiés (`True`) ou non (`False`).
+    Renvoie `(backend, chemin, manifeste)`.
+    """
+    if backend == 'pytorch':
+        return 'pytorch', yolo_path, None
+    if backend == 'auto':
+        import torch
+        if torch.cuda.is_available():
+            return 'pytorch', yolo_path, None
+        candidates = CPU_PREFERENCE
+    else:
+        exported_path(yolo_path, backend)
+        candidates = ((backend, True), (backend, False))
+
+    for name, quantized in candidates:
+        if int8 is not None and quantized != int8:
+            continue
+        if importlib.util.find_spec(_RUNTIMES[name]) is None:
+            continue
+        path = exported_path(yolo_path, name, quantized)
+        manifest = _read_manifest(yolo_path, path)
+        if manifest is not None:
+            return name, path, manifest
+
+    if backend != 'auto':
+        raise FileNotFoundError(
+            f"Aucun export {backend} à jour pour {yolo_path} (python export.py --backend {backend})"
+        )
+    return 'pytorch', yolo_path, None
+
+
+def detection_weights(yolo_path, backend='auto', int8=None) -> str:
+    """
+    Fichier de poids que `load_detection_model` chargerait (export choisi ou
+    `.pt`), sans charger le modèle : sert à identifier les résultats d'un
+    backend pour le cache des analyses.
+    """
+    _, path, manifest = select_detection_backend(yolo_path, backend, int8)
+    return path if manifest is None else weights_file(path)
+
+
+def load_detection_model(yolo_path, backend='auto', int8=None):
+    """
+    Charge YOLO11 avec le backend choisi par `select_detection_backend`.
+    Le modèle garde l'interface `predict` d'ultralytics quel que soit le backend.
+    """
+    from ultralytics import YOLO
+
+    backend, path, manifest = select_detection_backend(yolo_path, backend, int8)
+    if manifest is None:
+        model = YOLO(path)
+    else:
+        model = YOLO(path, task='detect')
+        # Les exports ont une taille d'entrée fixe, celle de l'export
+        model.overrides['imgsz'] = manifest['imgsz']
+        # Empreinte propre à l'export pour le cache des analyses
+        model.weights_path = weights_file(path)
+        model.max_batch = max_batch_size(manifest)
+        if model.max_batch:
+            logger.warning("Export %s à batch fixe : frames inférées une par une (réexporter avec export.py)", path)
+    model.backend_name = backend
+    logger.info("Modèle de détection : %s (%s)", path, backend)
+    return model
+
+
+def check_parity(
+    reference_model,
+    candidate_model,
+    video_path,
+    n_frames=50,
+    confidence=0.3,
+    iou_threshold=0.5,
+    batch_size=8
+) -> dict:
+    """
+    Compare les détections de `candidate_model` (export) à celles de
+    `reference_model` (PyTorch) sur `n_frames` frames de `video_path` :
+    rappel et précision par rapport à la référence (même classe, IoU
+    >= `iou_threshold`), IoU moyenne des paires et débit de chaque modèle.
+    Les frames sont aussi passées à l'export par micro-batchs de
+    `batch_size`, comme dans le pipeline (`batch_recall`, `batch_precision`).
+    """
+    total_frames = int(sv.VideoInfo.from_video_path(video_path).total_frames)
+    indices = sample_frame_indices(total_frames, stride=1, max_frames=n_frames)
+    frames = list(read_frames(video_path, indices))
+
+    # Première inférence hors mesure (initialisation du backend)
+    predict_batch(reference_model, frames[:1], confidence)
+    predict_batch(candidate_model, frames[:1], confidence)
+
+    seconds = {'reference': 0.0, 'candidate': 0.0}
+    matched, reference_boxes, candidate_boxes, ious = 0, 0, 0, []
+    references = []
+    for frame in frames:
+        started = time.perf_counter()
+        reference = predict_batch(reference_model, [frame], confidence)[0]
+        references.append(reference)
+        seconds['reference'] += time.perf_counter() - started
+        started = time.perf_counter()
+        candidate = predict_batch(candidate_model, [frame], confidence)[0]
+        seconds['candidate'] += time.perf_counter() - started
+
+        reference_boxes += len(reference)
+        candidate_boxes += len(candidate)
+        pairs = match_boxes(reference.xyxy, candidate.xyxy, iou_threshold, reference.class_id, candidate.class_id)
+        matched += len(pairs)
+        ious.extend(iou for _, _, iou in pairs)
+
+    batched = []
+    for i in range(0, len(frames), batch_size):
+        batched.extend(predict_batch(candidate_model, frames[i:i + batch_size], confidence))
+    batch_matched = sum(
+        len(match_boxes(reference.xyxy, candidate.xyxy, iou_threshold, reference.class_id, candidate.class_id))
+        for reference, candidate in zip(references, batched)
+    )
+    batch_boxes = sum(len(candidate) for candidate in batched)
+
+    report = {
+        'frames': len(frames),
+        'reference_boxes': reference_boxes,
+        'candidate_boxes': candidate_boxes,
+        'recall': matched / reference_boxes if reference_boxes else 1.0,
+        'precision': matched / candidate_boxes if candidate_boxes else 1.0,
+        'mean_iou': float(np.mean(ious)) if ious else 0.0,
+        'batch_size': batch_size,
+        'batch_recall': batch_matched / reference_boxes if reference_boxes else 1.0,
+        'batch_precision': batch_matched / batch_boxes if batch_boxes else 1.0,
+        'reference_fps': len(frames) / seconds['reference'],
+        'candidate_fps': len(frames) / seconds['candidate']
+    }
+    report['speedup'] = report['candidate_fps'] / report['reference_fps']
+    logger.info(
+        "Parité : rappel %.1f%%, précision %.1f%%, IoU moyenne %.2f, par batchs de %d : rappel %.1f%%, "
+        "x%.1f (%.1f -> %.1f FPS)",
+        100 * report['recall'], 100 * report['precision'], report['mean_iou'],
+        batch_size, 100 * report['batch_recall'],
+        report['speedup'], report['reference_fps'], report['candidate_fps']
+    )
+    return report
@@ -1,3 +1,4 @@
+import cv2
 import numpy as np
 import supervision as sv
 
@@ -21,4 +22,111 @@ def resolve_goalkeepers_team_id(
         dist_1 = np.linalg.norm(goalkeeper_xy - team_1_centroid)
         goalkeepers_team_id.append(0 if dist_0 < dist_1 else 1)
     
-    return np.array(goalkeepers_team_id)
\ No newline at end of file
+    return np.array(goalkeepers_team_id)
+
+def batched(iterable, size):
+    """
+    Regroupe les éléments d'un itérable en listes de `size` éléments
+    (la dernière peut être plus courte), en conservant l'ordre.
+    """
+    if size < 1:
+        raise ValueError("size doit être >= 1")
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def predict_batch(detection_model, frames, confidence=0.3, imgsz=None):
+    """
+    Lance YOLO sur un micro-batch de frames et renvoie une liste de
+    `sv.Detections`, dans le même ordre que `frames`. `imgsz` remplace
+    la taille d'inférence du modèle. Un modèle avec `max_batch` (export
+    à batch fixe) reçoit le micro-batch en plusieurs appels.
+    """
+    options = {'imgsz': imgsz} if imgsz else {}
+    frames = list(frames)
+    step = getattr(detection_model, 'max_batch', None) or max(1, len(frames))
+    results = []
+    for i in range(0, len(frames), step):
+        results.extend(detection_model.predict(frames[i:i + step], conf=confidence, **options))
+    return [sv.Detections.from_ultralytics(result) for result in results]
+
+
+def predict_keypoints(keypoint_model, frames, confidence=0.3):
+    """
+    Points clés du terrain (`sv.KeyPoints`) d'un micro-batch de frames, pour
+    un modèle local (`LocalKeypointModel`) comme pour un modèle Roboflow.
+    """
+    if hasattr(keypoint_model, 'predict_keypoints'):
+        return keypoint_model.predict_keypoints(frames, confidence=confidence)
+    return [
+        sv.KeyPoints.from_inference(keypoint_model.infer(frame, confidence=confidence)[0])
+        for frame in frames
+    ]
+
+
+def match_boxes(xyxy_a, xyxy_b, iou_threshold=0.5, class_a=None, class_b=None):
+    """
+    Appariement glouton (meilleures IoU d'abord) de deux ensembles de boîtes,
+    éventuellement limité aux paires de même classe. Renvoie la liste des
+    paires `(i, j, iou)` d'IoU >= `iou_threshold`.
+    """
+    if len(xyxy_a) == 0 or len(xyxy_b) == 0:
+        return []
+    iou = sv.box_iou_batch(np.asarray(xyxy_a), np.asarray(xyxy_b))
+    if class_a is not None and class_b is not None:
+        iou[np.asarray(class_a)[:, None] != np.asarray(class_b)[None, :]] = 0
+    pairs, used_a, used_b = [], set(), set()
+    for i, j in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+        if iou[i, j] < iou_threshold:
+            break
+        if i in used_a or j in used_b:
+            continue
+        used_a.add(i)
+        used_b.add(j)
+        pairs.append((int(i), int(j), float(iou[i, j])))
+    return pairs
+
+
+def sample_frame_indices(total_frames, stride, max_frames=None, seed=0):
+    """
+    Indices d'une frame toutes les `stride` frames. Au-delà de `max_frames`,
+    la vidéo est découpée en `max_frames` tranches de temps et une frame est
+    tirée au hasard dans chacune (échantillonnage stratifié).
+    """
+    indices = np.arange(0, total_frames, stride)
+    if max_frames and len(indices) > max_frames:
+        rng = np.random.default_rng(seed)
+        indices = np.array([rng.choice(stratum) for stratum in np.array_split(indices, max_frames)])
+    return [int(index) for index in indices]
+
+
+def read_frames(video_path, indices, seek_threshold=48):
+    """
+    Lit uniquement les frames `indices` (croissants). Les grands écarts sont
+    franchis par un seek, les petits par `grab()`, sans conversion d'image.
+    """
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        raise Exception(f"Could not open video at {video_path}")
+    position = 0
+    try:
+        for index in indices:
+            if index - position > seek_threshold:
+                video.set(cv2.CAP_PROP_POS_FRAMES, index)
+            else:
+                while position < index:
+                    video.grab()
+                    position += 1
+            success, frame = video.read()
+            if not success:
+                break
+            position = index + 1
+            yield frame
+    finally:
+        video.release()
@@ -0,0 +1,137 @@
+import cv2
+import numpy as np
+
+
+class ShiftedTransformer:
+    """
+    Transformation image -> terrain d'une keyframe, recalée sur la frame
+    courante par la translation globale de la caméra depuis la keyframe.
+    """
+
+    def __init__(self, transformer, offset):
+        shift = np.array([
+            [1.0, 0.0, -offset[0]],
+            [0.0, 1.0, -offset[1]],
+            [0.0, 0.0, 1.0]
+        ])
+        self.m = transformer.m @ shift
+
+    def transform_points(self, points: np.ndarray) -> np.ndarray:
+        if points.size == 0:
+            return points
+        reshaped_points = points.reshape(-1, 1, 2).astype(np.float32)
+        transformed_points = cv2.perspectiveTransform(reshaped_points, self.m)
+        return transformed_points.reshape(-1, 2).astype(np.float32)
+
+
+class HomographyScheduler:
+    """
+    Planifie l'inférence des points clés du terrain sur des keyframes.
+
+    Entre deux keyframes, le mouvement global de la caméra est estimé par
+    corrélation de phase sur des frames réduites et la dernière homographie
+    est décalée d'autant. Une nouvelle keyframe est demandée lorsque le
+    déplacement cumulé dépasse `motion_threshold` pixels ou que la
+    corrélation devient peu fiable (coupure, zoom), jamais avant
+    `min_interval` frames et au plus tard après `max_interval` frames.
+    Une keyframe en échec (trop peu de points clés) n'est retentée qu'après
+    `min_interval` frames, la transformation propagée servant entre-temps.
+    """
+
+    def __init__(
+        self,
+        compute_transformer,
+        min_interval=5,
+        max_interval=50,
+        motion_threshold=30.0,
+        min_response=0.1,
+        motion_scale=0.25
+    ):
+        self.compute_transformer = compute_transformer
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.motion_threshold = motion_threshold
+        self.min_response = min_response
+        self.motion_scale = motion_scale
+        self.reset()
+
+    def reset(self):
+        self.transformer = None
+        self.key_index = None
+        self.retry_index = None
+        self.offset = np.zeros(2)
+        self.prev_gray = None
+        self.window = None
+        self.inferences = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def estimate_motion(self, frame):
+        """
+        Translation globale (dx, dy) en pixels depuis la frame précédente,
+        et score de confiance de la corrélation de phase.
+        """
+        small = cv2.resize(frame, None, fx=self.motion_scale, fy=self.motion_scale, interpolation=cv2.INTER_AREA)
+        gray = np.float32(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            self.prev_gray = gray
+            self.window = cv2.createHanningWindow(gray.shape[::-1], cv2.CV_32F)
+            return np.zeros(2), 1.0
+
+        (dx, dy), response = cv2.phaseCorrelate(self.prev_gray, gray, self.window)
+        self.prev_gray = gray
+        return np.array([dx, dy]) / self.motion_scale, response
+
+    def _needs_keyframe(self, index, response) -> bool:
+        if self.transformer is None:
+            return True
+        if self.retry_index is not None and index - self.retry_index < self.min_interval:
+            return False
+        since_key = index - self.key_index
+        if since_key >= self.max_interval:
+            return True
+        if since_key < self.min_interval:
+            return False
+        return np.linalg.norm(self.offset) > self.motion_threshold or response < self.min_response
+
+    def update(self, index, frame):
+        """
+        Renvoie la transformation image -> terrain pour la frame `index`.
+        """
+        shift, response = self.estimate_motion(frame)
+        self.offset += shift
+
+        if not self._needs_keyframe(index, response):
+            self.skipped += 1
+        else:
+            self.inferences += 1
+            try:
+                transformer = self.compute_transformer(frame)
+            except (ValueError, cv2.error):
+                # Points clés insuffisants : on garde la transformation propagée
+                # et la prochaine tentative attend `min_interval` frames.
+                if self.transformer is None:
+                    raise
+                self.failures += 1
+                self.retry_index = index
+            else:
+                self.transformer = transformer
+                self.key_index = index
+                self.retry_index = None
+                self.offset = np.zeros(2)
+                return transformer
+
+        if not self.offset.any():
+            return self.transformer
+        return ShiftedTransformer(self.transformer, self.offset)
+
+    @property
+    def stats(self) -> dict:
+        total = self.inferences + self.skipped
+        return {
+            'keypoint_inferences': self.inferences,
+            'skipped': self.skipped,
+            'failed_keyframes': self.failures,
+            'skip_rate': self.skipped / total if total else 0.0
+        }
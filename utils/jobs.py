@@ -0,0 +1,210 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from .stages import PipelineCancelled
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_QUEUES = {}
+_LOCK = threading.Lock()
+
+
+@dataclass
+class Job:
+    """
+    Analyse soumise à la file : `target(job)` est exécuté par un thread de
+    travail et renvoie un dictionnaire de résultats. `target` peut publier
+    sa progression avec `set_phase` et `update_progress`, et doit s'arrêter
+    (via `PipelineCancelled`) quand `cancel_event` est levé.
+    """
+    id: str
+    name: str
+    target: Optional[Callable] = None
+    status: str = QUEUED
+    phase: str = ''
+    frames_done: int = 0
+    frames_total: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress_started_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+    def set_phase(self, phase):
+        """Nouvelle étape : la progression repart de zéro."""
+        self.phase = phase
+        self.frames_done = self.frames_total = 0
+        self.progress_started_at = None
+
+    def update_progress(self, done, total):
+        """Compatible avec `progress_callback` de `AnalysisPipeline.run`."""
+        if self.progress_started_at is None:
+            self.progress_started_at = time.time()
+        self.frames_done, self.frames_total = done, total
+
+    @property
+    def fps(self) -> float:
+        if self.progress_started_at is None or not self.frames_done:
+            return 0.0
+        end = self.finished_at or time.time()
+        return self.frames_done / max(end - self.progress_started_at, 1e-6)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Secondes restantes estimées pour la phase en cours, ou `None`."""
+        if self.status != RUNNING or not self.fps or not self.frames_total:
+            return None
+        return (self.frames_total - self.frames_done) / self.fps
+
+    @property
+    def fraction(self) -> float:
+        if self.status == DONE:
+            return 1.0
+        return self.frames_done / self.frames_total if self.frames_total else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'phase': self.phase,
+            'frames_done': self.frames_done,
+            'frames_total': self.frames_total,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'progress_started_at': self.progress_started_at,
+            'result': self.result,
+            'error': self.error
+        }
+
+    @classmethod
+    def from_dict(cls, state) -> "Job":
+        return cls(**state)
+
+
+class JobQueue:
+    """
+    File d'analyses exécutées en arrière-plan par `workers` threads : les
+    envois s'enchaînent au lieu de se disputer le CPU, et une session qui
+    se ferme n'interrompt pas son analyse.
+
+    Les jobs terminés sont écrits dans `history_dir` (un JSON par job) et
+    rechargés au démarrage, pour retrouver un résultat après un redémarrage.
+    """
+
+    def __init__(self, workers=1, history_dir=None):
+        self.history_dir = history_dir
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        if history_dir:
+            os.makedirs(history_dir, exist_ok=True)
+            self._load_history()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, name, target) -> Job:
+        job = Job(id=uuid.uuid4().hex[:12], name=name, target=target)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._queue.put(job)
+        logger.info("Job %s soumis (%s)", job.id, name)
+        return job
+
+    def get(self, job_id) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list:
+        """Tous les jobs, du plus récent au plus ancien."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def position(self, job) -> int:
+        """Nombre de jobs en attente devant `job` (0 s'il n'attend pas)."""
+        if job.status != QUEUED:
+            return 0
+        with self._lock:
+            return sum(
+                1 for other in self._jobs.values()
+                if other.status == QUEUED and other.created_at < job.created_at
+            )
+
+    def cancel(self, job_id) -> bool:
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return False
+        job.cancel_event.set()
+        with self._lock:
+            queued = job.status == QUEUED
+            if queued:
+                job.status = CANCELLED
+        if queued:
+            self._finish(job, CANCELLED)
+        logger.info("Job %s annulé", job_id)
+        return True
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                if job.status != QUEUED:
+                    continue
+                job.status, job.started_at = RUNNING, time.time()
+            try:
+                result = job.target(job)
+            except PipelineCancelled:
+                self._finish(job, CANCELLED)
+            except Exception as error:
+                logger.exception("Échec du job %s", job.id)
+                job.error = str(error)
+                self._finish(job, FAILED)
+            else:
+                job.result = result
+                self._finish(job, DONE)
+
+    def _finish(self, job, status):
+        job.status, job.finished_at = status, time.time()
+        job.target = None
+        if self.history_dir:
+            fd, tmp_path = tempfile.mkstemp(dir=self.history_dir, suffix='.tmp.json')
+            with os.fdopen(fd, 'w') as file:
+                json.dump(job.to_dict(), file, default=float)
+            os.replace(tmp_path, os.path.join(self.history_dir, f"{job.id}.json"))
+
+    def _load_history(self):
+        for name in os.listdir(self.history_dir):
+            if not name.endswith('.json') or name.endswith('.tmp.json'):
+                continue
+            try:
+                with open(os.path.join(self.history_dir, name)) as file:
+                    job = Job.from_dict(json.load(file))
+            except (OSError, ValueError, TypeError) as error:
+                logger.warning("Job illisible %s : %s", name, error)
+                continue
+            self._jobs[job.id] = job
+
+
+def get_job_queue(history_dir=None, workers=1) -> JobQueue:
+    """File de jobs unique par processus (partagée entre les sessions)."""
+    with _LOCK:
+        if history_dir not in _QUEUES:
+            _QUEUES[history_dir] = JobQueue(workers=workers, history_dir=history_dir)
+        return _QUEUES[history_dir]
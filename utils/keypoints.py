@@ -0,0 +1,36 @@
+from typing import List
+import logging
+import supervision as sv
+from .export import export_manifest, max_batch_size, weights_file
+
+logger = logging.getLogger(__name__)
+
+
+class LocalKeypointModel:
+    """
+    Modèle de points clés du terrain chargé depuis le disque : poids pose
+    ultralytics (`.pt`), ou leur export ONNX / OpenVINO (`export.py`).
+    Aucune clé d'API ni téléchargement ; les frames peuvent être passées
+    par micro-batchs.
+    """
+
+    def __init__(self, weights_path, imgsz=None):
+        from ultralytics import YOLO
+
+        manifest = export_manifest(weights_path)
+        self.model = YOLO(weights_path, task='pose')
+        self.imgsz = imgsz or (manifest['imgsz'] if manifest else None)
+        self.max_batch = max_batch_size(manifest)
+        # Empreinte des poids pour le cache des analyses
+        self.weights_path = weights_file(weights_path)
+        logger.info("Modèle de points clés local : %s", weights_path)
+
+    def predict_keypoints(self, frames, confidence=0.3) -> List[sv.KeyPoints]:
+        """Points clés de chaque frame, dans l'ordre de `frames`."""
+        options = {'imgsz': self.imgsz} if self.imgsz else {}
+        frames = list(frames)
+        step = self.max_batch or max(1, len(frames))
+        results = []
+        for i in range(0, len(frames), step):
+            results.extend(self.model.predict(frames[i:i + step], conf=confidence, verbose=False, **options))
+        return [sv.KeyPoints.from_ultralytics(result) for result in results]
@@ -0,0 +1,683 @@
+import supervision as sv
+from sports.configs.soccer import SoccerPitchConfiguration
+from sports.common.view import ViewTransformer
+from contextlib import ExitStack, nullcontext
+from dataclasses import dataclass
+from typing import List, Optional
+from tqdm import tqdm
+import itertools
+import logging
+import time
+import cv2
+import numpy as np
+from .helpers import batched, predict_batch, predict_keypoints, resolve_goalkeepers_team_id
+from .classification import TeamAssignmentCache
+from .homography import HomographyScheduler
+from .stages import StagedRunner
+from .cache import save_records, team_classifier_fingerprint
+from .profiling import NULL_PROFILER
+from .tracking import MotionPredictor
+
+logger = logging.getLogger(__name__)
+
+BALL_ID = 0
+GOALKEEPER_ID = 1
+PLAYER_ID = 2
+REFEREE_ID = 3
+
+CONFIG = SoccerPitchConfiguration()
+
+
+@dataclass
+class FrameAnalysis:
+    """
+    Résultat de l'analyse d'une frame, partagé entre toutes les sorties.
+
+    Les `class_id` des joueurs et gardiens contiennent l'équipe (0 ou 1),
+    ceux des arbitres valent 2. Les coordonnées terrain ne sont calculées
+    que si une sortie a besoin de l'homographie.
+    """
+    index: int
+    frame: np.ndarray
+    ball_detections: sv.Detections
+    players_detections: sv.Detections
+    goalkeepers_detections: sv.Detections
+    referees_detections: sv.Detections
+    transformer: Optional[ViewTransformer] = None
+    pitch_ball_xy: Optional[np.ndarray] = None
+    pitch_players_xy: Optional[np.ndarray] = None
+    pitch_referees_xy: Optional[np.ndarray] = None
+
+    @property
+    def all_players(self) -> sv.Detections:
+        """Joueurs et gardiens, dans l'ordre utilisé par les vues terrain."""
+        return sv.Detections.merge([self.players_detections, self.goalkeepers_detections])
+
+    @property
+    def all_detections(self) -> sv.Detections:
+        """Joueurs, gardiens et arbitres, dans l'ordre utilisé par la vue tracking."""
+        return sv.Detections.merge([
+            self.players_detections,
+            self.goalkeepers_detections,
+            self.referees_detections
+        ])
+
+    def to_record(self) -> dict:
+        """
+        État compact de la frame (sans l'image) : boîtes, équipes, pistes,
+        rôle de chaque détection, ballon et, si disponibles, coordonnées terrain.
+        """
+        all_detections = self.all_detections
+        role = np.concatenate([
+            np.full(len(self.players_detections), PLAYER_ID),
+            np.full(len(self.goalkeepers_detections), GOALKEEPER_ID),
+            np.full(len(self.referees_detections), REFEREE_ID)
+        ]).astype(np.int8)
+        record = {
+            'xyxy': np.asarray(all_detections.xyxy, dtype=np.float32).reshape(-1, 4),
+            'confidence': _as_array(all_detections.confidence, len(role), np.float32),
+            'class_id': _as_array(all_detections.class_id, len(role), np.int32),
+            'tracker_id': _as_array(all_detections.tracker_id, len(role), np.int32),
+            'role': role,
+            'ball_xyxy': np.asarray(self.ball_detections.xyxy, dtype=np.float32).reshape(-1, 4),
+            'ball_confidence': _as_array(self.ball_detections.confidence, len(self.ball_detections), np.float32)
+        }
+        if self.pitch_players_xy is not None:
+            record['pitch_xy'] = np.concatenate([
+                np.asarray(self.pitch_players_xy, dtype=np.float32).reshape(-1, 2),
+                np.asarray(self.pitch_referees_xy, dtype=np.float32).reshape(-1, 2)
+            ])
+            record['pitch_ball_xy'] = np.asarray(self.pitch_ball_xy, dtype=np.float32).reshape(-1, 2)
+        return record
+
+    @classmethod
+    def from_record(cls, index, record, frame=None) -> "FrameAnalysis":
+        """Reconstruit une analyse à partir de `to_record`, sans aucun modèle."""
+        role = record['role']
+        detections = sv.Detections(
+            xyxy=record['xyxy'],
+            confidence=record['confidence'],
+            class_id=record['class_id'],
+            tracker_id=record['tracker_id']
+        )
+        ball_detections = sv.Detections(
+            xyxy=record['ball_xyxy'],
+            confidence=record['ball_confidence'],
+            class_id=np.full(len(record['ball_xyxy']), BALL_ID)
+        )
+        analysis = cls(
+            index=index,
+            frame=frame,
+            ball_detections=ball_detections,
+            players_detections=detections[role == PLAYER_ID],
+            goalkeepers_detections=detections[role == GOALKEEPER_ID],
+            referees_detections=detections[role == REFEREE_ID]
+        )
+        if 'pitch_xy' in record:
+            analysis.pitch_players_xy = record['pitch_xy'][role != REFEREE_ID]
+            analysis.pitch_referees_xy = record['pitch_xy'][role == REFEREE_ID]
+            analysis.pitch_ball_xy = record['pitch_ball_xy']
+        return analysis
+
+
+def _attributes(component, exclude=()):
+    if component is None:
+        return None
+    return {name: value for name, value in vars(component).items() if name not in exclude}
+
+
+def _as_array(values, length, dtype) -> np.ndarray:
+    if values is None:
+        return np.zeros(length, dtype=dtype)
+    return np.asarray(values, dtype=dtype)
+
+
+class RecordCollector:
+    """
+    Sortie qui conserve l'état compact (`FrameAnalysis.to_record`) de chaque
+    frame au lieu d'écrire une vidéo.
+    """
+    requires_frame = False
+
+    def __init__(self, requires_homography=False):
+        self.requires_homography = requires_homography
+        self.records = []
+
+    def open(self, video_info):
+        return nullcontext(self)
+
+    def write(self, analysis):
+        self.encode(self.render(analysis))
+
+    def render(self, analysis):
+        return analysis.to_record()
+
+    def encode(self, record):
+        self.records.append(record)
+
+
+class AnalysisExporter(RecordCollector):
+    """
+    Sortie qui exporte l'état complet de chaque frame (boîtes, pistes,
+    équipes, coordonnées terrain, ballon) dans un fichier NPZ, relisible
+    par les fonctions `render_*_video` sans aucun modèle.
+    """
+
+    def __init__(self, target_path, requires_homography=True):
+        super().__init__(requires_homography=requires_homography)
+        self.target_path = target_path
+        self.video_info = None
+        self.start = None
+
+    def open(self, video_info):
+        self.video_info = video_info
+        self.records = []
+        self.start = None
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            save_records(self.target_path, self.records, self.video_info, start=self.start or 0)
+
+    def render(self, analysis):
+        if self.start is None:
+            self.start = analysis.index
+        return super().render(analysis)
+
+
+class AnalysisPipeline:
+    """
+    Pipeline d'analyse image par image : détection, tracking, classification
+    des équipes et homographie, exécutés une seule fois par frame.
+
+    Avec `team_refresh_interval`, l'équipe de chaque piste est mémorisée et
+    re-vérifiée périodiquement (voir `TeamAssignmentCache`) ; avec `None`
+    (par défaut), chaque crop est classifié à chaque frame.
+
+    De même, `keyframe_max_interval` active la planification des points clés
+    du terrain (voir `HomographyScheduler`) ; avec `None` (par défaut), le
+    modèle de points clés est appelé à chaque frame. Les deux sont activés
+    par l'application et les scripts via `config.py`.
+
+    Avec `cache` (un `AnalysisCache`), une analyse déjà faite pour la même
+    vidéo, les mêmes modèles et les mêmes paramètres est relue sur disque et
+    seules les vidéos sont redessinées.
+
+    Avec `profiler` (un `StageProfiler`), la latence de chaque étape est
+    mesurée et ajoutée aux statistiques (`stats['profile']`).
+
+    Mode aperçu : avec `detection_stride` > 1, YOLO ne tourne que sur une
+    frame sur `detection_stride` et les pistes sont prolongées entre deux
+    (voir `MotionPredictor`) ; `frame_scale` réduit les frames dès le
+    décodage (analyse et vidéos produites) et `inference_size` la taille
+    d'entrée de YOLO (modèles PyTorch, les exports ayant une taille fixe).
+    """
+
+    def __init__(
+        self,
+        detection_model,
+        team_classifier,
+        keypoint_model=None,
+        config=CONFIG,
+        confidence=0.3,
+        batch_size=1,
+        team_refresh_interval=None,
+        keyframe_min_interval=5,
+        keyframe_max_interval=None,
+        queue_size=None,
+        cache=None,
+        profiler=None,
+        detection_stride=1,
+        frame_scale=1.0,
+        inference_size=None
+    ):
+        self.detection_model = detection_model
+        self.team_classifier = team_classifier
+        self.keypoint_model = keypoint_model
+        self.config = config
+        self.confidence = confidence
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.cache = cache
+        self.profiler = profiler or NULL_PROFILER
+        self.team_refresh_interval = team_refresh_interval
+        self.keyframe_min_interval = keyframe_min_interval
+        self.keyframe_max_interval = keyframe_max_interval
+        self.detection_stride = detection_stride
+        self.frame_scale = frame_scale
+        self.inference_size = inference_size
+        self.motion = MotionPredictor() if detection_stride > 1 else None
+        self.team_cache = None
+        if team_refresh_interval is not None:
+            self.team_cache = TeamAssignmentCache(team_classifier, refresh_interval=team_refresh_interval)
+        self.homography = None
+        if keyframe_max_interval is not None:
+            self.homography = HomographyScheduler(
+                self.compute_transformer,
+                min_interval=keyframe_min_interval,
+                max_interval=keyframe_max_interval
+            )
+        self.tracker = sv.ByteTrack()
+        self._team_fingerprint = None
+        self.reset()
+
+    def reset(self):
+        """Réinitialise l'état temporel (tracker, mémoire d'équipes, keyframes) avant une nouvelle vidéo."""
+        self.frame_index = 0
+        self.detect_origin = 0
+        self.tracker.reset()
+        if self.team_cache is not None:
+            self.team_cache.reset()
+        if self.homography is not None:
+            self.homography.reset()
+        if self.motion is not None:
+            self.motion.reset()
+
+    def state(self) -> dict:
+        """
+        État temporel après le dernier traitement (frame suivante, tracker,
+        mémoire d'équipes, keyframes, pistes prolongées), sérialisable avec
+        `pickle` et sans les modèles ; `restore` le réinstalle pour reprendre
+        l'analyse exactement là où elle s'est arrêtée (voir `utils.checkpoint`).
+        """
+        return {
+            'frame_index': self.frame_index,
+            'detect_origin': self.detect_origin,
+            'tracker': self.tracker,
+            'team_cache': _attributes(self.team_cache, exclude=('team_classifier',)),
+            'homography': _attributes(self.homography, exclude=('compute_transformer',)),
+            'motion': self.motion
+        }
+
+    def restore(self, state):
+        """Réinstalle un état obtenu par `state`."""
+        self.frame_index = state['frame_index']
+        self.detect_origin = state['detect_origin']
+        self.tracker = state['tracker']
+        if self.team_cache is not None:
+            vars(self.team_cache).update(state['team_cache'])
+        if self.homography is not None:
+            vars(self.homography).update(state['homography'])
+        self.motion = state['motion']
+
+    def cache_key(self, source_video_path, with_homography, start, end, **params) -> str:
+        """
+        Clé de cache des paramètres qui influencent le résultat de l'analyse,
+        dont les équipes apprises et la configuration du terrain. `params`
+        distingue les analyses faites autrement (ex. par morceaux).
+        """
+        if self._team_fingerprint is None:
+            self._team_fingerprint = team_classifier_fingerprint(self.team_classifier)
+        return self.cache.key(
+            source_video_path,
+            self.detection_model,
+            self.keypoint_model if with_homography else None,
+            team_classifier=self._team_fingerprint,
+            config=repr(self.config),
+            confidence=self.confidence,
+            team_refresh_interval=self.team_refresh_interval,
+            keyframe_min_interval=self.keyframe_min_interval,
+            keyframe_max_interval=self.keyframe_max_interval,
+            homography=with_homography,
+            detection_stride=self.detection_stride,
+            frame_scale=self.frame_scale,
+            inference_size=self.inference_size,
+            start=start,
+            end=end,
+            **params
+        )
+
+    def load_cached(self, source_video_path, with_homography, start, end, **params):
+        """
+        Records en cache pour cette plage ; une analyse avec homographie
+        convient aussi aux sorties qui n'en ont pas besoin.
+        """
+        candidates = [with_homography]
+        if not with_homography and self.keypoint_model is not None:
+            candidates.append(True)
+        for candidate in candidates:
+            records = self.cache.load(self.cache_key(source_video_path, candidate, start, end, **params))
+            if records is not None:
+                return records
+        return None
+
+    def detect(self, frames) -> List[sv.Detections]:
+        """Détecte un micro-batch de frames, résultats dans l'ordre des frames."""
+        imgsz = None
+        if getattr(self.detection_model, 'backend_name', 'pytorch') == 'pytorch':
+            imgsz = self.inference_size
+        with self.profiler.measure('predict'):
+            return predict_batch(self.detection_model, frames, confidence=self.confidence, imgsz=imgsz)
+
+    def scaled_size(self, video_info):
+        """Résolution d'analyse `(largeur, hauteur)` après `frame_scale`, paire pour les encodeurs."""
+        return (
+            2 * round(video_info.width * self.frame_scale / 2),
+            2 * round(video_info.height * self.frame_scale / 2)
+        )
+
+    def compute_transformer(self, frame) -> ViewTransformer:
+        """
+        Construit la transformation image -> terrain à partir des points clés.
+        """
+        with self.profiler.measure('keypoints'):
+            key_points = predict_keypoints(self.keypoint_model, [frame], confidence=self.confidence)[0]
+        if len(key_points) == 0:
+            raise ValueError("Aucun point clé du terrain détecté")
+
+        filter_pts = key_points.confidence[0] > 0.5
+        frame_reference_points = key_points.xy[0][filter_pts]
+        pitch_reference_points = np.array(self.config.vertices)[filter_pts]
+
+        return ViewTransformer(source=frame_reference_points, target=pitch_reference_points)
+
+    def process(self, index, frame, detections, with_homography=False) -> FrameAnalysis:
+        """
+        Applique tracking, classification des équipes et, si demandé,
+        la projection sur le terrain aux détections d'une frame. Avec
+        `detections=None` (frame non détectée en mode aperçu), les pistes
+        de la dernière frame détectée sont prolongées.
+        """
+        if detections is None:
+            with self.profiler.measure('tracking'):
+                ball_detections, all_detections = self.motion.predict(index)
+        else:
+            ball_detections = detections[detections.class_id == BALL_ID]
+            ball_detections.xyxy = sv.pad_boxes(xyxy=ball_detections.xyxy, px=10)
+
+            all_detections = detections[detections.class_id != BALL_ID]
+            with self.profiler.measure('nms'):
+                all_detections = all_detections.with_nms(threshold=0.5, class_agnostic=True)
+            with self.profiler.measure('tracking'):
+                all_detections = self.tracker.update_with_detections(detections=all_detections)
+                if self.motion is not None:
+                    self.motion.update(index, all_detections, ball_detections, tracker=self.tracker)
+
+        goalkeepers_detections = all_detections[all_detections.class_id == GOALKEEPER_ID]
+        players_detections = all_detections[all_detections.class_id == PLAYER_ID]
+        referees_detections = all_detections[all_detections.class_id == REFEREE_ID]
+
+        with self.profiler.measure('teams'):
+            players_detections.class_id = self.classify_teams(index, frame, players_detections)
+        goalkeepers_detections.class_id = resolve_goalkeepers_team_id(players_detections, goalkeepers_detections)
+        referees_detections.class_id -= 1
+
+        analysis = FrameAnalysis(
+            index=index,
+            frame=frame,
+            ball_detections=ball_detections,
+            players_detections=players_detections,
+            goalkeepers_detections=goalkeepers_detections,
+            referees_detections=referees_detections
+        )
+
+        if with_homography:
+            # Inclut les inférences de points clés (`keypoints`)
+            with self.profiler.measure('homography'):
+                self.project(analysis, self.transformer_for(index, frame))
+
+        return analysis
+
+    def transformer_for(self, index, frame):
+        if self.homography is not None:
+            return self.homography.update(index, frame)
+        return self.compute_transformer(frame)
+
+    def classify_teams(self, index, frame, players_detections) -> np.ndarray:
+        if self.team_cache is not None:
+            return self.team_cache.predict(frame, players_detections, index)
+        players_crops = [sv.crop_image(frame, xyxy) for xyxy in players_detections.xyxy]
+        return self.team_classifier.predict(players_crops)
+
+    def project(self, analysis, transformer):
+        """Remplit les coordonnées terrain d'une analyse avec `transformer`."""
+        analysis.transformer = transformer
+        analysis.pitch_ball_xy = transformer.transform_points(
+            points=analysis.ball_detections.get_anchors_coordinates(sv.Position.BOTTOM_CENTER)
+        )
+        analysis.pitch_players_xy = transformer.transform_points(
+            points=analysis.all_players.get_anchors_coordinates(sv.Position.BOTTOM_CENTER)
+        )
+        analysis.pitch_referees_xy = transformer.transform_points(
+            points=analysis.referees_detections.get_anchors_coordinates(sv.Position.BOTTOM_CENTER)
+        )
+
+    def run(
+        self,
+        source_video_path,
+        sinks,
+        desc="Analysing video",
+        cancel_event=None,
+        start=0,
+        end=None,
+        progress_callback=None,
+        reset=True
+    ):
+        """
+        Décode la vidéo une seule fois et envoie chaque frame analysée
+        à toutes les sorties (`sinks`).
+
+        La détection est faite par micro-batchs de `batch_size` frames ; le
+        tracking reste strictement séquentiel. Avec `queue_size`, décodage,
+        détection, analyse, rendu et encodage tournent chacun dans un thread
+        (voir `StagedRunner`). `start`/`end` limitent le traitement à une
+        plage de frames. Si l'analyse est en cache, les vidéos sont produites
+        sans aucun modèle. `progress_callback(done, total)` est appelé après
+        chaque frame encodée. Avec `reset=False`, l'état temporel du
+        traitement précédent est conservé : `start` doit être la frame qui
+        suit la plage précédente. Renvoie les statistiques de débit.
+        """
+        with_homography = any(sink.requires_homography for sink in sinks)
+        if with_homography and self.keypoint_model is None:
+            raise ValueError("Un modèle de points clés est requis pour les vues terrain")
+
+        video_info = sv.VideoInfo.from_video_path(source_video_path)
+        end = video_info.total_frames if end is None else min(end, video_info.total_frames)
+        video_info.total_frames = end - start
+        if self.frame_scale != 1.0:
+            video_info.width, video_info.height = self.scaled_size(video_info)
+
+        collector = None
+        if self.cache is not None:
+            records = self.load_cached(source_video_path, with_homography, start, end)
+            if records is not None:
+                started = time.perf_counter()
+                render_records(
+                    records, sinks, video_info, source_video_path,
+                    start=start, desc=desc, progress_callback=progress_callback
+                )
+                stats = self.report(len(records), time.perf_counter() - started)
+                stats['cached'] = True
+                return stats
+            collector = RecordCollector(requires_homography=with_homography)
+            sinks = list(sinks) + [collector]
+
+        frame_generator = sv.get_video_frames_generator(source_video_path, start=start, end=end)
+        if self.frame_scale != 1.0:
+            frame_generator = (
+                cv2.resize(frame, video_info.resolution_wh, interpolation=cv2.INTER_AREA)
+                for frame in frame_generator
+            )
+        if reset:
+            self.reset()
+            self.frame_index = start
+            self.detect_origin = start
+        elif start != self.frame_index:
+            raise ValueError(f"Reprise à la frame {start} impossible : l'état s'arrête à la frame {self.frame_index}")
+
+        profiler = self.profiler
+        profiler.start()
+        started = time.perf_counter()
+        first_frame = []
+        with ExitStack() as stack:
+            stack.callback(profiler.stop)
+            for sink in sinks:
+                stack.enter_context(sink.open(video_info))
+            progress = stack.enter_context(tqdm(total=video_info.total_frames, desc=desc))
+
+            next_index = [start]
+
+            def detect_stage(frames):
+                # En mode aperçu, seules les frames `origine + k * detection_stride` passent par YOLO
+                indices = range(next_index[0], next_index[0] + len(frames))
+                next_index[0] += len(frames)
+                keyframes = [(index - self.detect_origin) % self.detection_stride == 0 for index in indices]
+                to_detect = [frame for frame, key in zip(frames, keyframes) if key]
+                detected = iter(self.detect(to_detect) if to_detect else [])
+                return [(frames, [next(detected) if key else None for key in keyframes])]
+
+            def analyse_stage(batch):
+                analyses = []
+                for frame, detections in zip(*batch):
+                    analyses.append(self.process(self.frame_index, frame, detections, with_homography=with_homography))
+                    self.frame_index += 1
+                return analyses
+
+            def render_stage(analysis):
+                rendered = []
+                for sink in sinks:
+                    with profiler.measure(f'render.{type(sink).__name__}'):
+                        rendered.append(sink.render(analysis))
+                return [rendered]
+
+            def encode_stage(rendered):
+                for sink, frame in zip(sinks, rendered):
+                    with profiler.measure(f'encode.{type(sink).__name__}'):
+                        sink.encode(frame)
+                profiler.frame_done()
+                if not first_frame:
+                    first_frame.append(time.perf_counter() - started)
+                progress.update(1)
+                if progress_callback is not None:
+                    progress_callback(progress.n, progress.total)
+                return []
+
+            runner = StagedRunner(
+                [
+                    ('detect', detect_stage),
+                    ('analyse', analyse_stage),
+                    ('render', render_stage),
+                    ('encode', encode_stage)
+                ],
+                queue_size=self.queue_size,
+                cancel_event=cancel_event
+            )
+            runner.run(profiler.iterate('decode', batched(frame_generator, self.batch_size)))
+
+        if collector is not None:
+            self.cache.store(self.cache_key(source_video_path, with_homography, start, end), collector.records)
+
+        stats = self.report(self.frame_index - start, time.perf_counter() - started)
+        if profiler.enabled:
+            stats['profile'] = profiler.report()
+        if first_frame:
+            stats['time_to_first_frame'] = first_frame[0]
+            logger.info("Première frame encodée après %.2f s", first_frame[0])
+        if self.queue_size is not None:
+            stats['queues'] = runner.queue_depths
+            for name, depth in stats['queues'].items():
+                logger.info("File d'entrée '%s' : profondeur moyenne %.1f, max %d", name, depth['mean'], depth['max'])
+        return stats
+
+    def report(self, frames, seconds):
+        """Statistiques de débit du dernier traitement, également journalisées."""
+        stats = {
+            'frames': frames,
+            'seconds': seconds,
+            'fps': frames / seconds if seconds > 0 else 0.0,
+            'batch_size': self.batch_size
+        }
+        logger.info(
+            "%d frames en %.1f s (%.2f FPS, batch_size=%d)",
+            stats['frames'], stats['seconds'], stats['fps'], stats['batch_size']
+        )
+        if self.team_cache is not None and self.team_cache.hits + self.team_cache.misses:
+            stats['team_cache'] = self.team_cache.stats
+            logger.info(
+                "Mémoire d'équipes : %d hits, %d misses (%.0f%% de crops évités, %d appels d'embedding)",
+                self.team_cache.hits, self.team_cache.misses,
+                100 * stats['team_cache']['hit_rate'], self.team_cache.embedding_calls
+            )
+        if self.homography is not None and self.homography.inferences:
+            stats['homography'] = self.homography.stats
+            logger.info(
+                "Points clés : %d inférences (%d en échec), %d évitées (%.0f%%)",
+                self.homography.inferences, self.homography.failures, self.homography.skipped,
+                100 * stats['homography']['skip_rate']
+            )
+        return stats
+
+
+def render_records(
+    records,
+    sinks,
+    video_info,
+    source_video_path=None,
+    start=0,
+    desc="Rendering video",
+    progress_callback=None
+):
+    """
+    Génère les vidéos des `sinks` à partir d'états de frames enregistrés
+    (`FrameAnalysis.to_record`), sans aucun modèle. Les sorties qui ont
+    besoin de l'image source (tracking) relisent `source_video_path`
+    à partir de la frame `start`, redimensionnée à la résolution de
+    `video_info` si l'analyse a été faite en résolution réduite.
+    """
+    video_info = sv.VideoInfo(
+        width=video_info.width,
+        height=video_info.height,
+        fps=video_info.fps,
+        total_frames=len(records)
+    )
+    if any(sink.requires_frame for sink in sinks):
+        if source_video_path is None:
+            raise ValueError("La vidéo source est requise pour la vue tracking")
+        frames = sv.get_video_frames_generator(source_video_path, start=start, end=start + len(records))
+        frames = (
+            frame if frame.shape[1::-1] == video_info.resolution_wh
+            else cv2.resize(frame, video_info.resolution_wh, interpolation=cv2.INTER_AREA)
+            for frame in frames
+        )
+    else:
+        frames = itertools.repeat(None)
+
+    with ExitStack() as stack:
+        for sink in sinks:
+            stack.enter_context(sink.open(video_info))
+        for offset, (record, frame) in enumerate(tqdm(zip(records, frames), total=len(records), desc=desc)):
+            analysis = FrameAnalysis.from_record(start + offset, record, frame)
+            for sink in sinks:
+                sink.write(analysis)
+            if progress_callback is not None:
+                progress_callback(offset + 1, len(records))
+
+
+def run_analysis(
+    source_video_path,
+    sinks: List,
+    detection_model,
+    team_classifier,
+    keypoint_model=None,
+    desc="Analysing video",
+    cancel_event=None,
+    progress_callback=None,
+    **options
+):
+    """
+    Analyse la vidéo une seule fois et produit toutes les vidéos demandées.
+    `options` est transmis à `AnalysisPipeline` (config, confidence, batch_size...).
+    Renvoie les statistiques de débit (frames, secondes, FPS, taille de batch).
+    """
+    pipeline = AnalysisPipeline(
+        detection_model,
+        team_classifier,
+        keypoint_model=keypoint_model,
+        **options
+    )
+    return pipeline.run(
+        source_video_path, sinks, desc=desc, cancel_event=cancel_event, progress_callback=progress_callback
+    )
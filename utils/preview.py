@@ -0,0 +1,143 @@
+import supervision as sv
+from typing import List
+import logging
+import time
+import numpy as np
+from .helpers import match_boxes
+from .pipeline import PLAYER_ID, AnalysisPipeline, RecordCollector
+
+logger = logging.getLogger(__name__)
+
+
+def compare_records(reference, preview, scale=(1.0, 1.0), iou_threshold=0.5) -> dict:
+    """
+    Écart entre une analyse en mode aperçu (`preview`) et l'analyse complète
+    (`reference`) des mêmes frames. Les boîtes de l'aperçu sont ramenées à
+    la résolution de la référence en divisant par `scale` (largeur, hauteur).
+
+    Renvoie le rappel et la précision des boîtes (même rôle, IoU >=
+    `iou_threshold`), l'IoU moyenne des paires, l'accord sur les équipes des
+    joueurs appariés, le rappel du ballon et, si les deux analyses ont des
+    coordonnées terrain, l'écart moyen de position sur le terrain (mètres).
+    """
+    box_scale = np.array([scale[0], scale[1], scale[0], scale[1]], dtype=np.float32)
+    matched, reference_boxes, preview_boxes = 0, 0, 0
+    ious, same_team, pitch_errors = [], [], []
+    ball_frames, ball_found = 0, 0
+    for expected, actual in zip(reference, preview):
+        xyxy = actual['xyxy'] / box_scale
+        reference_boxes += len(expected['xyxy'])
+        preview_boxes += len(xyxy)
+        pairs = match_boxes(expected['xyxy'], xyxy, iou_threshold, expected['role'], actual['role'])
+        matched += len(pairs)
+        for i, j, iou in pairs:
+            ious.append(iou)
+            if expected['role'][i] == PLAYER_ID:
+                same_team.append(expected['class_id'][i] == actual['class_id'][j])
+            if 'pitch_xy' in expected and 'pitch_xy' in actual:
+                # Coordonnées terrain en centimètres
+                pitch_errors.append(float(np.linalg.norm(expected['pitch_xy'][i] - actual['pitch_xy'][j])) / 100)
+        if len(expected['ball_xyxy']):
+            ball_frames += 1
+            ball_found += bool(match_boxes(expected['ball_xyxy'], actual['ball_xyxy'] / box_scale, iou_threshold))
+
+    report = {
+        'frames': min(len(reference), len(preview)),
+        'recall': matched / reference_boxes if reference_boxes else 1.0,
+        'precision': matched / preview_boxes if preview_boxes else 1.0,
+        'mean_iou': float(np.mean(ious)) if ious else 0.0,
+        'team_agreement': float(np.mean(same_team)) if same_team else 1.0,
+        'ball_recall': ball_found / ball_frames if ball_frames else 1.0
+    }
+    if pitch_errors:
+        report['pitch_error_m'] = float(np.mean(pitch_errors))
+    return report
+
+
+def run_preview(
+    source_video_path,
+    sinks: List,
+    detection_model,
+    team_classifier,
+    keypoint_model=None,
+    detection_stride=5,
+    frame_scale=0.5,
+    inference_size=640,
+    accuracy_frames=150,
+    desc="Previewing video",
+    cancel_event=None,
+    progress_callback=None,
+    **options
+):
+    """
+    Analyse rapide de la vidéo (voir le mode aperçu d'`AnalysisPipeline`),
+    puis mesure de la précision perdue : les `accuracy_frames` premières
+    frames sont analysées aussi en mode complet et comparées à l'aperçu
+    (`compare_records`). Le gain de vitesse compare les deux modes sur ces
+    mêmes frames, démarrage compris de part et d'autre. Renvoie les
+    statistiques de débit de l'aperçu, avec le rapport de précision dans
+    `stats['preview_accuracy']`.
+    `options` est transmis aux deux pipelines.
+    """
+    with_homography = any(sink.requires_homography for sink in sinks)
+    preview = AnalysisPipeline(
+        detection_model,
+        team_classifier,
+        keypoint_model=keypoint_model,
+        detection_stride=detection_stride,
+        frame_scale=frame_scale,
+        inference_size=inference_size,
+        **options
+    )
+    collector = RecordCollector(requires_homography=with_homography)
+    # Durée des `accuracy_frames` premières frames, fenêtre de la référence
+    window = {}
+
+    def preview_progress(done, total):
+        if done <= accuracy_frames:
+            window['seconds'] = time.perf_counter() - started
+        if progress_callback is not None:
+            progress_callback(done, total)
+
+    started = time.perf_counter()
+    stats = preview.run(
+        source_video_path,
+        list(sinks) + [collector],
+        desc=desc,
+        cancel_event=cancel_event,
+        progress_callback=preview_progress
+    )
+    stats['preview'] = {
+        'detection_stride': detection_stride,
+        'frame_scale': frame_scale,
+        'inference_size': inference_size
+    }
+    if not accuracy_frames or not collector.records:
+        return stats
+
+    end = min(accuracy_frames, len(collector.records))
+    reference = RecordCollector(requires_homography=with_homography)
+    full = AnalysisPipeline(detection_model, team_classifier, keypoint_model=keypoint_model, **options)
+    started = time.perf_counter()
+    full.run(source_video_path, [reference], desc="Reference", cancel_event=cancel_event, end=end)
+    reference_seconds = time.perf_counter() - started
+
+    video_info = sv.VideoInfo.from_video_path(source_video_path)
+    width, height = preview.scaled_size(video_info)
+    accuracy = compare_records(
+        reference.records,
+        collector.records[:end],
+        scale=(width / video_info.width, height / video_info.height)
+    )
+    accuracy['reference_fps'] = end / reference_seconds if reference_seconds > 0 else 0.0
+    preview_seconds = window.get('seconds', 0.0)
+    accuracy['preview_fps'] = end / preview_seconds if preview_seconds > 0 else 0.0
+    if accuracy['reference_fps'] and accuracy['preview_fps']:
+        accuracy['speedup'] = accuracy['preview_fps'] / accuracy['reference_fps']
+    stats['preview_accuracy'] = accuracy
+    logger.info(
+        "Aperçu sur %d frames : rappel %.1f%%, précision %.1f%%, équipes %.1f%%, ballon %.1f%% (x%.1f)",
+        accuracy['frames'], 100 * accuracy['recall'], 100 * accuracy['precision'],
+        100 * accuracy['team_agreement'], 100 * accuracy['ball_recall'], accuracy.get('speedup', 0.0)
+    )
+    return stats
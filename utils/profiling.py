@@ -0,0 +1,207 @@
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import numpy as np
+
+
+class _Timer:
+    __slots__ = ('samples', 'started')
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.samples.append(time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullProfiler:
+    """Profileur désactivé : aucune mesure, coût quasi nul dans les boucles."""
+    enabled = False
+
+    def measure(self, stage):
+        return _NULL_TIMER
+
+    def iterate(self, stage, iterable):
+        return iterable
+
+    def frame_done(self):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def summarize(samples) -> dict:
+    """Nombre, total, moyenne, percentiles et maximum (ms) de durées en secondes."""
+    values = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'count': len(values),
+        'total_ms': float(values.sum()),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(values.max())
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _rss_mb():
+    """Mémoire résidente actuelle du processus (Linux), ou `None` si elle n'est pas lisible."""
+    try:
+        with open('/proc/self/statm') as file:
+            pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+
+
+class StageProfiler:
+    """
+    Latences par étape du pipeline (décodage, inférence, NMS, tracking,
+    équipes, points clés, dessin, encodage), intervalle entre deux frames
+    encodées et pic mémoire du traitement.
+
+    Le pic de mémoire résidente du traitement (`peak_rss_mb`) est relevé au
+    début, à la fin et après chaque frame encodée (Linux) ; celui du
+    processus depuis son démarrage est donné à part (`process_peak_rss_mb`).
+
+    Les étapes peuvent être mesurées depuis plusieurs threads (pipeline
+    par étapes) : chaque nom d'étape a sa propre liste d'échantillons.
+    Avec `trace_python`, le pic d'allocations Python est suivi par
+    `tracemalloc`, au prix d'un ralentissement notable.
+
+    Les appels `start`/`stop` s'emboîtent : entre un `start` et son `stop`,
+    les traitements successifs (segments d'une analyse avec points de
+    reprise) s'ajoutent à une seule mesure.
+    """
+    enabled = True
+
+    def __init__(self, trace_python=False):
+        self.trace_python = trace_python
+        self.samples = {}
+        self._lock = threading.Lock()
+        self._started = None
+        self._last_frame = None
+        self.wall_seconds = 0.0
+        self.memory = {}
+        self._peak_rss = None
+        self._depth = 0
+
+    def _samples(self, stage):
+        samples = self.samples.get(stage)
+        if samples is None:
+            with self._lock:
+                samples = self.samples.setdefault(stage, [])
+        return samples
+
+    def measure(self, stage):
+        """Contexte qui chronomètre un passage dans `stage`."""
+        return _Timer(self._samples(stage))
+
+    def iterate(self, stage, iterable):
+        """Itère sur `iterable` en chronométrant chaque élément produit."""
+        samples = self._samples(stage)
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            samples.append(time.perf_counter() - started)
+            yield item
+
+    def frame_done(self):
+        """À appeler après chaque frame encodée (une seule étape d'encodage)."""
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self._samples('frame').append(now - self._last_frame)
+        self._last_frame = now
+        self._sample_rss()
+
+    def _sample_rss(self):
+        rss = _rss_mb()
+        if rss is not None and (self._peak_rss is None or rss > self._peak_rss):
+            self._peak_rss = rss
+
+    def start(self):
+        self._depth += 1
+        if self._depth > 1:
+            return
+        self._started = time.perf_counter()
+        self._last_frame = None
+        self._peak_rss = None
+        self._sample_rss()
+        if self.trace_python:
+            tracemalloc.start()
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+
+    def stop(self):
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        self.wall_seconds = time.perf_counter() - self._started
+        self._sample_rss()
+        self.memory = {}
+        if self._peak_rss is not None:
+            self.memory['peak_rss_mb'] = self._peak_rss
+        # Pic du processus depuis son démarrage (le noyau ne le remet pas à zéro)
+        self.memory['process_peak_rss_mb'] = _peak_rss_mb()
+        if self.trace_python:
+            self.memory['python_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            self.memory['cuda_peak_mb'] = torch.cuda.max_memory_allocated() / 1024 ** 2
+
+    def report(self) -> dict:
+        stages = {name: summarize(samples) for name, samples in self.samples.items() if samples}
+        frame = stages.pop('frame', None)
+        return {
+            'wall_seconds': self.wall_seconds,
+            'stages': dict(sorted(stages.items(), key=lambda item: -item[1]['total_ms'])),
+            'frame': frame,
+            'memory': self.memory
+        }
+
+    def save(self, path):
+        """Écrit le rapport au format JSON."""
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+        return path
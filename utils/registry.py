@@ -0,0 +1,77 @@
+from collections import namedtuple
+import logging
+import threading
+import time
+import numpy as np
+from .detection import load_models
+from .helpers import predict_keypoints
+
+logger = logging.getLogger(__name__)
+
+LoadedModels = namedtuple('LoadedModels', ['detection_model', 'keypoint_model', 'load_seconds', 'warmup_seconds'])
+
+_MODELS = {}
+_LOCK = threading.Lock()
+
+
+# Méthodes d'inférence sérialisées par le verrou du modèle partagé
+_INFERENCE_METHODS = ('predict', 'infer', 'predict_keypoints')
+
+
+class SharedModel:
+    """
+    Modèle partagé entre plusieurs sessions : les appels d'inférence sont
+    sérialisés par un verrou, les autres attributs sont ceux du modèle.
+    """
+
+    def __init__(self, model):
+        self._model = model
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._model, name)
+        if name not in _INFERENCE_METHODS:
+            return attribute
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attribute(*args, **kwargs)
+        return locked
+
+
+def warm_up(detection_model, keypoint_model, frame_shape=(720, 1280, 3)):
+    """
+    Première inférence sur une image vide, pour payer l'initialisation
+    (graphe, noyaux, allocations) avant le premier vrai match.
+    """
+    frame = np.zeros(frame_shape, dtype=np.uint8)
+    detection_model.predict(frame, verbose=False)
+    predict_keypoints(keypoint_model, [frame])
+
+
+def get_models(yolo_path, roboflow_model_id, roboflow_api_key, backend='auto', warmup=True) -> LoadedModels:
+    """
+    Modèles de détection et de points clés, chargés et préchauffés une seule
+    fois par processus puis partagés entre toutes les sessions.
+    """
+    key = (yolo_path, roboflow_model_id, backend)
+    with _LOCK:
+        entry = _MODELS.get(key)
+        if entry is None:
+            started = time.perf_counter()
+            detection_model, keypoint_model = load_models(yolo_path, roboflow_model_id, roboflow_api_key, backend)
+            detection_model, keypoint_model = SharedModel(detection_model), SharedModel(keypoint_model)
+            loaded = time.perf_counter()
+            if warmup:
+                warm_up(detection_model, keypoint_model)
+            entry = _MODELS[key] = LoadedModels(
+                detection_model,
+                keypoint_model,
+                load_seconds=loaded - started,
+                warmup_seconds=time.perf_counter() - loaded
+            )
+            logger.info(
+                "Modèles chargés en %.1f s, préchauffés en %.1f s",
+                entry.load_seconds, entry.warmup_seconds
+            )
+    return entry
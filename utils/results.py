@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+_STAGING_PREFIX = 'staging-'
+
+
+def _relocate(value, source, target):
+    """Remplace le dossier `source` par `target` dans les chemins d'un résultat (dict, liste, chaîne)."""
+    if isinstance(value, dict):
+        return {key: _relocate(item, source, target) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_relocate(item, source, target) for item in value]
+    if isinstance(value, str) and os.path.isabs(value) and os.path.commonpath([value, source]) == source:
+        return os.path.join(target, os.path.relpath(value, source))
+    return value
+
+
+def _files(value):
+    if isinstance(value, dict):
+        return [path for item in value.values() for path in _files(item)]
+    if isinstance(value, list):
+        return [path for item in value for path in _files(item)]
+    if isinstance(value, str) and os.path.isabs(value):
+        return [value]
+    return []
+
+
+class ResultStore:
+    """
+    Magasin des résultats complets (vidéos, données, rapports) adressé par
+    contenu : la clé combine l'empreinte de la vidéo, celles des modèles et
+    les réglages qui influencent les fichiers produits. Une même vidéo
+    analysée avec les mêmes réglages est servie sans nouvelle analyse, et
+    deux vidéos de même nom ne s'écrasent plus.
+
+    Chaque entrée est un dossier `<clé>/` avec un `manifest.json` (le
+    résultat, chemins relatifs). Les analyses écrivent dans un dossier de
+    préparation, publié d'un bloc par `commit`. La taille totale est bornée
+    par `max_bytes` : les entrées les moins récemment servies sont
+    supprimées en premier.
+    """
+
+    def __init__(self, directory, max_bytes=20 * 1024 ** 3):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, video_digest, **params) -> str:
+        payload = json.dumps({'video': video_digest, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def lookup(self, key):
+        """Résultat enregistré pour `key` (chemins absolus), ou `None` si absent ou incomplet."""
+        entry = self._entry(key)
+        manifest_path = os.path.join(entry, MANIFEST)
+        with self._lock:
+            if not os.path.exists(manifest_path):
+                return None
+            try:
+                with open(manifest_path) as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError) as error:
+                logger.warning("Manifeste illisible %s : %s", manifest_path, error)
+                shutil.rmtree(entry, ignore_errors=True)
+                return None
+            result = _relocate(manifest['result'], '/', entry)
+            missing = [path for path in _files(result) if not os.path.exists(path)]
+            if missing:
+                logger.warning("Entrée %s incomplète (%s) : supprimée", key[:12], ', '.join(missing))
+                shutil.rmtree(entry, ignore_errors=True)
+                return None
+            # Date d'accès pour l'éviction LRU
+            os.utime(manifest_path)
+        logger.info("Résultats trouvés dans le magasin (%s)", key[:12])
+        return result
+
+    def staging(self, name) -> str:
+        """Nouveau dossier de préparation pour une analyse en cours."""
+        return tempfile.mkdtemp(prefix=f"{_STAGING_PREFIX}{name}-", dir=self.directory)
+
+    def discard(self, staging_dir):
+        """Supprime un dossier de préparation (analyse annulée ou en échec)."""
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def commit(self, key, staging_dir, result) -> dict:
+        """
+        Publie le dossier de préparation comme entrée `key` et renvoie le
+        résultat avec ses chemins définitifs. Si une analyse identique a été
+        publiée entre-temps, elle est conservée et la préparation supprimée.
+        """
+        staging_dir = os.path.abspath(staging_dir)
+        entry = self._entry(key)
+        manifest = {
+            'key': key,
+            'created_at': time.time(),
+            'result': _relocate(result, staging_dir, '/')
+        }
+        with open(os.path.join(staging_dir, MANIFEST), 'w') as file:
+            json.dump(manifest, file, indent=2, default=str)
+        with self._lock:
+            if os.path.exists(entry):
+                shutil.rmtree(staging_dir, ignore_errors=True)
+            else:
+                os.replace(staging_dir, entry)
+        self.evict(keep=key)
+        return self.lookup(key) or _relocate(result, staging_dir, entry)
+
+    def evict(self, keep=None):
+        """Supprime les entrées les moins récemment servies au-delà de `max_bytes` (sauf `keep`)."""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                manifest_path = os.path.join(self.directory, name, MANIFEST)
+                if name.startswith(_STAGING_PREFIX) or not os.path.exists(manifest_path):
+                    continue
+                entry = os.path.join(self.directory, name)
+                size = sum(
+                    os.path.getsize(os.path.join(root, file_name))
+                    for root, _, file_names in os.walk(entry) for file_name in file_names
+                )
+                entries.append((os.stat(manifest_path).st_mtime, size, name, entry))
+
+            total = sum(size for _, size, _, _ in entries)
+            for _, size, name, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                logger.info("Résultats supprimés du magasin : %s", name)
@@ -0,0 +1,177 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import re
+import secrets
+import tempfile
+import threading
+from .cache import remember_digest
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+SERVE_CHUNK_SIZE = 256 * 1024
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+_SERVER = None
+_SERVER_LOCK = threading.Lock()
+
+
+def spool_upload(fileobj, directory=None, suffix='', chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Copie un fichier reçu (`st.file_uploader`, ou tout objet avec `read`)
+    sur disque par blocs de `chunk_size` octets, en calculant son empreinte
+    SHA-256 au passage : la mémoire utilisée reste celle d'un bloc.
+    L'empreinte est mémorisée pour le cache des analyses.
+    Renvoie `(chemin, empreinte)`.
+    """
+    if hasattr(fileobj, 'seek'):
+        fileobj.seek(0)
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(dir=directory, suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as target:
+            for block in iter(lambda: fileobj.read(chunk_size), b''):
+                digest.update(block)
+                target.write(block)
+    except BaseException:
+        os.remove(path)
+        raise
+    remember_digest(path, digest.hexdigest())
+    return path, digest.hexdigest()
+
+
+class ResultServer:
+    """
+    Sert les fichiers de `root` (vidéos et données produites) par HTTP,
+    en streaming et avec les requêtes partielles (`Range`) : le navigateur
+    lit les vidéos au fil de l'eau et les téléchargements ne passent pas
+    par la mémoire de Streamlit.
+
+    Chaque URL est signée (HMAC avec un secret propre au processus) :
+    seuls les fichiers pour lesquels l'application a produit un lien sont
+    accessibles. `public_url` est l'adresse vue par le navigateur (proxy),
+    par défaut `http://localhost:<port>`.
+    """
+
+    def __init__(self, root, host='127.0.0.1', port=8502, public_url=None):
+        self.root = os.path.abspath(root)
+        self.secret = secrets.token_bytes(32)
+        handler = type('ResultRequestHandler', (_ResultRequestHandler,), {'server_files': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.public_url = (public_url or f"http://localhost:{self._server.server_address[1]}").rstrip('/')
+        threading.Thread(target=self._server.serve_forever, name='result-server', daemon=True).start()
+        logger.info("Résultats servis sur %s (%s)", self.public_url, self.root)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _signature(self, relative_path) -> str:
+        return hmac.new(self.secret, relative_path.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def url_for(self, path, download=False) -> str:
+        """URL signée de `path` (dans `root`) ; `download` force l'enregistrement du fichier."""
+        relative_path = os.path.relpath(os.path.abspath(path), self.root)
+        if relative_path.startswith(os.pardir):
+            raise ValueError(f"{path} n'est pas dans {self.root}")
+        relative_path = relative_path.replace(os.sep, '/')
+        url = f"{self.public_url}/files/{quote(relative_path)}?sig={self._signature(relative_path)}"
+        return url + '&download=1' if download else url
+
+    def resolve(self, relative_path, signature):
+        """Chemin local d'une URL signée, ou `None` si la signature est invalide."""
+        if not hmac.compare_digest(self._signature(relative_path), signature):
+            return None
+        path = os.path.abspath(os.path.join(self.root, relative_path))
+        if os.path.commonpath([path, self.root]) != self.root or not os.path.isfile(path):
+            return None
+        return path
+
+
+class _ResultRequestHandler(BaseHTTPRequestHandler):
+    server_files = None
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if not url.path.startswith('/files/'):
+            self.send_error(404)
+            return
+        path = self.server_files.resolve(unquote(url.path[len('/files/'):]), query.get('sig', [''])[0])
+        if path is None:
+            self.send_error(404)
+            return
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = _RANGE.match(self.headers.get('Range', '').strip())
+        if match and match.group(1) + match.group(2):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start > end or start >= size:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            self.send_response(200)
+
+        self.send_header('Content-Type', mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Cache-Control', 'private, max-age=3600')
+        if 'download' in query:
+            self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(os.path.basename(path))}")
+        self.end_headers()
+        if not send_body:
+            return
+
+        remaining = end - start + 1
+        try:
+            with open(path, 'rb') as file:
+                file.seek(start)
+                while remaining > 0:
+                    block = file.read(min(SERVE_CHUNK_SIZE, remaining))
+                    if not block:
+                        break
+                    self.wfile.write(block)
+                    remaining -= len(block)
+        except (BrokenPipeError, ConnectionResetError):
+            # Le navigateur interrompt souvent une lecture pour demander une autre plage
+            pass
+
+
+def get_result_server(root, host='127.0.0.1', port=8502, public_url=None):
+    """
+    Serveur de résultats partagé par toutes les sessions du processus, ou
+    `None` s'il ne peut pas démarrer (port occupé).
+    """
+    global _SERVER
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            try:
+                _SERVER = ResultServer(root, host, port, public_url)
+            except OSError as error:
+                logger.warning("Serveur de résultats indisponible (%s:%s) : %s", host, port, error)
+                return None
+        return _SERVER
@@ -0,0 +1,141 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+class PipelineCancelled(Exception):
+    """Levée lorsque le traitement est interrompu par `cancel_event`."""
+
+
+class StagedRunner:
+    """
+    Exécute une chaîne d'étapes `(nom, fonction)` sur les éléments d'une source.
+
+    Chaque fonction reçoit un élément et renvoie un itérable de résultats,
+    transmis dans l'ordre à l'étape suivante. Avec `queue_size`, chaque étape
+    (et la lecture de la source) tourne dans son propre thread, reliée aux
+    autres par des files bornées : l'ordre est conservé car chaque étape est
+    traitée par un seul thread. Sans `queue_size`, tout s'exécute en série.
+    """
+
+    def __init__(self, stages, queue_size=None, cancel_event=None, poll_interval=0.1):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.cancel_event = cancel_event or threading.Event()
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._errors = []
+        self._depth = {}
+
+    def run(self, source):
+        if self.queue_size is None:
+            self._run_serial(source)
+        else:
+            self._run_threaded(source)
+
+    def _check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise PipelineCancelled("Traitement annulé")
+
+    def _run_serial(self, source):
+        def feed(items, stage_index):
+            if stage_index == len(self.stages):
+                return
+            _, fn = self.stages[stage_index]
+            for item in items:
+                feed(fn(item), stage_index + 1)
+
+        for item in source:
+            self._check_cancelled()
+            feed([item], 0)
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q, name):
+        while not self._stop.is_set():
+            try:
+                depth = q.qsize()
+                item = q.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+            samples = self._depth.setdefault(name, [0, 0, 0])
+            samples[0] += depth
+            samples[1] += 1
+            samples[2] = max(samples[2], depth)
+            return item
+        return _DONE
+
+    def _fail(self, error):
+        self._errors.append(error)
+        self._stop.set()
+
+    def _read_source(self, source, out_queue):
+        try:
+            for item in source:
+                if self.cancel_event.is_set():
+                    self._fail(PipelineCancelled("Traitement annulé"))
+                    return
+                if not self._put(out_queue, item):
+                    return
+            self._put(out_queue, _DONE)
+        except BaseException as error:
+            self._fail(error)
+
+    def _run_stage(self, name, fn, in_queue, out_queue):
+        try:
+            while True:
+                item = self._get(in_queue, name)
+                if item is _DONE:
+                    break
+                for result in fn(item):
+                    if out_queue is not None and not self._put(out_queue, result):
+                        return
+            if out_queue is not None:
+                self._put(out_queue, _DONE)
+        except BaseException as error:
+            self._fail(error)
+
+    def _run_threaded(self, source):
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = [threading.Thread(
+            target=self._read_source, args=(source, queues[0]), name="stage-source", daemon=True
+        )]
+        for i, (name, fn) in enumerate(self.stages):
+            out_queue = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(threading.Thread(
+                target=self._run_stage, args=(name, fn, queues[i], out_queue),
+                name=f"stage-{name}", daemon=True
+            ))
+
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                if self.cancel_event.is_set() and not self._stop.is_set():
+                    self._fail(PipelineCancelled("Traitement annulé"))
+                threads[-1].join(timeout=self.poll_interval)
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+    @property
+    def queue_depths(self) -> dict:
+        """Profondeur moyenne et maximale de la file d'entrée de chaque étape."""
+        return {
+            name: {'mean': total / count if count else 0.0, 'max': peak}
+            for name, (total, count, peak) in self._depth.items()
+        }
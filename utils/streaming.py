@@ -0,0 +1,405 @@
+from collections import deque, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import threading
+import time
+import cv2
+import supervision as sv
+from .pipeline import GOALKEEPER_ID, PLAYER_ID, REFEREE_ID
+from .profiling import summarize
+
+logger = logging.getLogger(__name__)
+
+LiveFrame = namedtuple('LiveFrame', ['index', 'frame', 'captured_at'])
+
+ROLE_NAMES = {PLAYER_ID: 'player', GOALKEEPER_ID: 'goalkeeper', REFEREE_ID: 'referee'}
+
+
+class StreamSource:
+    """
+    Source vidéo continue : caméra (indice, ex. `0`), flux réseau (`rtsp://`,
+    `http://`...) ou fichier local rejoué au rythme de la vidéo pour simuler
+    un direct.
+
+    Un thread lit les frames en continu et ne garde que la plus récente :
+    si l'analyse prend du retard, les frames intermédiaires sont abandonnées
+    (`dropped`) au lieu de s'accumuler. Un flux coupé est rouvert jusqu'à
+    `max_reconnects` fois. Avec `realtime=False`, un fichier est lu aussi
+    vite que l'analyse le consomme, sans perte.
+    """
+
+    def __init__(self, source, realtime=True, reconnect_delay=1.0, max_reconnects=5):
+        source = str(source)
+        self.is_camera = source.isdigit()
+        self.is_file = not self.is_camera and '://' not in source
+        self.source = int(source) if self.is_camera else source
+        self.realtime = realtime
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnects = max_reconnects
+        self.fps = None
+        self.resolution_wh = None
+        self.read_frames = 0
+        self.dropped = 0
+        self.finished = False
+        self._latest = None
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._capture = None
+        self._thread = None
+
+    def _open_capture(self):
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            raise IOError(f"Impossible d'ouvrir la source vidéo : {self.source}")
+        if not self.is_file:
+            # Pas de file d'attente côté OpenCV : la latence reste celle d'une frame
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return capture
+
+    def __enter__(self):
+        self._capture = self._open_capture()
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS) or 25.0
+        self.resolution_wh = (
+            int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        )
+        self.finished = False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._read_loop, name='stream-reader', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._thread.join(timeout=5)
+        self._capture.release()
+
+    @property
+    def video_info(self) -> sv.VideoInfo:
+        return sv.VideoInfo(width=self.resolution_wh[0], height=self.resolution_wh[1], fps=self.fps)
+
+    def _read_loop(self):
+        index, reconnects = 0, 0
+        started = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                ok, frame = self._capture.read()
+                if not ok:
+                    if self.is_file or reconnects >= self.max_reconnects:
+                        break
+                    reconnects += 1
+                    logger.warning("Flux interrompu, reconnexion %d/%d", reconnects, self.max_reconnects)
+                    self._capture.release()
+                    self._stop.wait(self.reconnect_delay)
+                    try:
+                        self._capture = self._open_capture()
+                    except IOError as error:
+                        logger.warning("%s", error)
+                    continue
+                reconnects = 0
+                if self.is_file and self.realtime:
+                    # Rejeu au rythme de la vidéo, comme une caméra
+                    delay = started + index / self.fps - time.monotonic()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                self._put(LiveFrame(index, frame, time.monotonic()))
+                index += 1
+        finally:
+            with self._condition:
+                self.finished = True
+                self._condition.notify_all()
+
+    def _put(self, live):
+        with self._condition:
+            if self._latest is not None:
+                if self.is_file and not self.realtime:
+                    self._condition.wait_for(lambda: self._latest is None or self._stop.is_set())
+                else:
+                    self.dropped += 1
+            self._latest = live
+            self.read_frames += 1
+            self._condition.notify_all()
+
+    def read(self, timeout=None):
+        """
+        Frame la plus récente (`LiveFrame`), en attendant au plus `timeout`
+        secondes ; `None` si aucune frame n'est arrivée ou si la source est terminée.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._latest is not None or self.finished, timeout)
+            live, self._latest = self._latest, None
+            self._condition.notify_all()
+            return live
+
+    def frames(self, n_frames, stride=1):
+        """Itère sur `n_frames` frames de la source, une frame reçue sur `stride`."""
+        received, taken = 0, 0
+        while taken < n_frames:
+            live = self.read(timeout=1.0)
+            if live is None:
+                if self.finished:
+                    return
+                continue
+            if received % stride == 0:
+                taken += 1
+                yield live.frame
+            received += 1
+
+
+class LivePublisher:
+    """
+    Publie l'analyse en direct pour un consommateur local, par HTTP :
+
+    - `/<vue>.mjpg` : frames annotées de chaque vue en MJPEG (navigateur, OpenCV, VLC) ;
+    - `/positions` : coordonnées terrain de la dernière frame (JSON) ;
+    - `/events` : coordonnées de chaque frame au fil de l'eau (Server-Sent Events) ;
+    - `/metrics` : métriques de latence et de pertes (JSON).
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, jpeg_quality=80):
+        self.host = host
+        self.port = port
+        self.jpeg_quality = jpeg_quality
+        self.images = {}
+        self.payload = b'{}'
+        self.metrics = b'{}'
+        self.sequence = 0
+        self.closed = False
+        self._condition = threading.Condition()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self._server.server_address[1] if self._server else self.port}"
+
+    def __enter__(self):
+        handler = type('LiveRequestHandler', (_LiveRequestHandler,), {'publisher': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='live-publisher', daemon=True).start()
+        logger.info("Diffusion en direct sur %s", self.url)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def publish(self, payload, images):
+        """Publie les coordonnées (`payload`, JSON) et les images annotées d'une frame."""
+        encoded = {}
+        for name, image in images.items():
+            ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if ok:
+                encoded[name] = buffer.tobytes()
+        with self._condition:
+            self.images.update(encoded)
+            self.payload = json.dumps(payload).encode()
+            self.sequence += 1
+            self._condition.notify_all()
+
+    def set_metrics(self, metrics):
+        self.metrics = json.dumps(metrics).encode()
+
+    def wait(self, sequence, timeout=5.0) -> int:
+        """Attend une publication postérieure à `sequence` ; renvoie le nouveau numéro."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.sequence > sequence or self.closed, timeout)
+            return self.sequence
+
+
+class _LiveRequestHandler(BaseHTTPRequestHandler):
+    publisher = None
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, content_type, part):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        publisher, sequence = self.publisher, 0
+        try:
+            while not publisher.closed:
+                new_sequence = publisher.wait(sequence)
+                if new_sequence == sequence:
+                    continue
+                sequence = new_sequence
+                body = part()
+                if body is not None:
+                    self.wfile.write(body)
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        publisher = self.publisher
+        path = self.path.split('?')[0].strip('/')
+        if path == 'positions':
+            self._send(publisher.payload, 'application/json')
+        elif path == 'metrics':
+            self._send(publisher.metrics, 'application/json')
+        elif path == 'events':
+            self._stream('text/event-stream', lambda: b'data: ' + publisher.payload + b'\n\n')
+        elif path.endswith('.mjpg') and path[:-len('.mjpg')] in publisher.images:
+            name = path[:-len('.mjpg')]
+
+            def part():
+                image = publisher.images.get(name)
+                return (
+                    b'--frame\r\nContent-Type: image/jpeg\r\n'
+                    + f'Content-Length: {len(image)}\r\n\r\n'.encode() + image + b'\r\n'
+                )
+
+            self._stream('multipart/x-mixed-replace; boundary=frame', part)
+        elif path == '':
+            endpoints = [f'/{name}.mjpg' for name in publisher.images] + ['/positions', '/events', '/metrics']
+            self._send(json.dumps({'endpoints': endpoints}).encode(), 'application/json')
+        else:
+            self.send_error(404)
+
+
+def frame_payload(analysis, live, latency) -> dict:
+    """
+    Coordonnées terrain (unités de la configuration du terrain, cm) de chaque
+    piste et du ballon pour une frame, avec sa latence de bout en bout.
+    """
+    record = analysis.to_record()
+    pitch_xy = record.get('pitch_xy')
+    objects = [
+        {
+            'tracker_id': int(tracker_id),
+            'role': ROLE_NAMES.get(int(role), 'unknown'),
+            'team': int(class_id) if role != REFEREE_ID else None,
+            'xy': pitch_xy[i].round(1).tolist() if pitch_xy is not None else None
+        }
+        for i, (tracker_id, role, class_id) in enumerate(zip(record['tracker_id'], record['role'], record['class_id']))
+    ]
+    ball_xy = record.get('pitch_ball_xy')
+    return {
+        'index': live.index,
+        'timestamp': time.time(),
+        'latency_ms': round(1000 * latency, 1),
+        'objects': objects,
+        'ball': ball_xy[0].round(1).tolist() if ball_xy is not None and len(ball_xy) else None
+    }
+
+
+def run_live(
+    source,
+    pipeline,
+    views,
+    publisher,
+    latency_target=0.5,
+    stop_event=None,
+    max_frames=None,
+    window=500,
+    metrics_interval=1.0
+):
+    """
+    Analyse un flux en direct (`StreamSource` déjà ouverte) avec `pipeline`
+    (un `AnalysisPipeline`) et publie chaque frame via `publisher`.
+
+    `views` associe un nom de flux à une sortie dont seul `render` est
+    utilisé (`TrackingSink`, `RadarSink`). Une frame plus ancienne que
+    `latency_target` secondes au moment d'être prise est abandonnée ; la
+    source ne garde de toute façon que la plus récente. Une frame sans
+    points clés du terrain est publiée sans les vues terrain.
+
+    Les métriques (latence capture -> publication et durée d'analyse sur les
+    `window` dernières frames, frames analysées et abandonnées) sont publiées
+    toutes les `metrics_interval` secondes et renvoyées à la fin.
+    """
+    with_homography = any(view.requires_homography for view in views.values())
+    if with_homography and pipeline.keypoint_model is None:
+        raise ValueError("Un modèle de points clés est requis pour les vues terrain")
+
+    video_info = source.video_info
+    size = pipeline.scaled_size(video_info) if pipeline.frame_scale != 1.0 else None
+    pipeline.reset()
+
+    latencies, durations = deque(maxlen=window), deque(maxlen=window)
+    counts = {'processed': 0, 'stale': 0, 'homography_failures': 0}
+    started = last_metrics = time.monotonic()
+
+    def metrics():
+        elapsed = time.monotonic() - started
+        report = dict(
+            counts,
+            dropped=source.dropped,
+            read=source.read_frames,
+            seconds=elapsed,
+            fps=counts['processed'] / elapsed if elapsed > 0 else 0.0,
+            latency_target_ms=1000 * latency_target
+        )
+        if latencies:
+            report['latency'] = summarize(latencies)
+            report['analysis'] = summarize(durations)
+        return report
+
+    while not (stop_event is not None and stop_event.is_set()):
+        if max_frames is not None and counts['processed'] >= max_frames:
+            break
+        live = source.read(timeout=1.0)
+        if live is None:
+            if source.finished:
+                break
+            continue
+        if time.monotonic() - live.captured_at > latency_target:
+            counts['stale'] += 1
+            continue
+
+        analysis_started = time.monotonic()
+        frame = live.frame if size is None else cv2.resize(live.frame, size, interpolation=cv2.INTER_AREA)
+        # Les frames abandonnées ne comptent pas : une frame analysée sur `detection_stride` passe par YOLO
+        detections = None
+        if counts['processed'] % pipeline.detection_stride == 0:
+            detections = pipeline.detect([frame])[0]
+        analysis = pipeline.process(live.index, frame, detections)
+        if with_homography:
+            # Homographie impossible (trop peu de points clés, matrice dégénérée) : frame publiée sans radar
+            try:
+                pipeline.project(analysis, pipeline.transformer_for(live.index, frame))
+            except (ValueError, cv2.error):
+                analysis.transformer = None
+                counts['homography_failures'] += 1
+        images = {
+            name: view.render(analysis)
+            for name, view in views.items()
+            if not view.requires_homography or analysis.transformer is not None
+        }
+
+        now = time.monotonic()
+        latency = now - live.captured_at
+        publisher.publish(frame_payload(analysis, live, latency), images)
+        latencies.append(latency)
+        durations.append(now - analysis_started)
+        counts['processed'] += 1
+
+        if now - last_metrics >= metrics_interval:
+            last_metrics = now
+            publisher.set_metrics(metrics())
+
+    report = metrics()
+    publisher.set_metrics(report)
+    if latencies:
+        logger.info(
+            "Direct : %d frames analysées (%.1f FPS), %d abandonnées, latence p50 %.0f ms / p95 %.0f ms",
+            report['processed'], report['fps'], report['dropped'] + report['stale'],
+            report['latency']['p50_ms'], report['latency']['p95_ms']
+        )
+    return report
@@ -0,0 +1,99 @@
+import logging
+import os
+import pickle
+import re
+import torch
+import numpy as np
+from sports.common.team import TeamClassifier
+
+logger = logging.getLogger(__name__)
+
+
+def _store_path(directory, match_id):
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', match_id.strip()).strip('_')
+    if not slug:
+        raise ValueError("Identifiant de match vide")
+    return os.path.join(directory, f"{slug}.pkl")
+
+
+def cluster_profile(team_classifier) -> dict:
+    """
+    Résumé des clusters appris : distance moyenne d'un crop d'entraînement
+    au centre de son équipe et part de chaque équipe.
+    """
+    projections = team_classifier.reducer.embedding_
+    distances = team_classifier.cluster_model.transform(projections).min(axis=1)
+    counts = np.bincount(team_classifier.cluster_model.labels_, minlength=2)
+    return {
+        'mean_distance': float(distances.mean()),
+        'shares': (counts / counts.sum()).tolist()
+    }
+
+
+def save_team_classifier(team_classifier, directory, match_id):
+    """
+    Enregistre la réduction UMAP et les clusters K-Means d'un classificateur
+    entraîné sous `match_id` (match ou paire de maillots). Les poids SigLIP,
+    identiques pour tous les matchs, ne sont pas dupliqués.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = _store_path(directory, match_id)
+    state = {
+        'reducer': team_classifier.reducer,
+        'cluster_model': team_classifier.cluster_model,
+        'profile': cluster_profile(team_classifier)
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(state, file)
+    os.replace(tmp_path, path)
+    logger.info("Classificateur d'équipes enregistré : %s", path)
+    return path
+
+
+def load_team_classifier(directory, match_id, device=None):
+    """
+    Recharge le classificateur enregistré sous `match_id`. Renvoie
+    `(team_classifier, profile)`, ou `(None, None)` s'il n'existe pas.
+    """
+    path = _store_path(directory, match_id)
+    if not os.path.exists(path):
+        return None, None
+    with open(path, 'rb') as file:
+        state = pickle.load(file)
+
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    team_classifier = TeamClassifier(device=device)
+    team_classifier.reducer = state['reducer']
+    team_classifier.cluster_model = state['cluster_model']
+    logger.info("Classificateur d'équipes rechargé : %s", path)
+    return team_classifier, state['profile']
+
+
+def check_team_classifier(team_classifier, profile, crops, tolerance=2.0, min_share=0.1) -> list:
+    """
+    Vérifie qu'un classificateur enregistré convient aux crops d'une nouvelle
+    vidéo. Renvoie la liste des avertissements (vide si tout concorde).
+    """
+    if not crops:
+        return ["Aucun joueur détecté pour vérifier le classificateur d'équipes"]
+
+    projections = team_classifier.reducer.transform(team_classifier.extract_features(crops))
+    distances = team_classifier.cluster_model.transform(projections)
+    mean_distance = float(distances.min(axis=1).mean())
+    shares = np.bincount(distances.argmin(axis=1), minlength=2) / len(crops)
+
+    warnings = []
+    if mean_distance > tolerance * profile['mean_distance']:
+        warnings.append(
+            f"Les maillots de cette vidéo s'écartent des équipes enregistrées "
+            f"(distance moyenne {mean_distance:.2f} contre {profile['mean_distance']:.2f})"
+        )
+    if shares.min() < min_share:
+        warnings.append(
+            f"Une équipe n'est presque jamais reconnue ({shares.min():.0%} des joueurs) : "
+            f"les équipes enregistrées ne correspondent peut-être pas à ce match"
+        )
+    for warning in warnings:
+        logger.warning(warning)
+    return warnings
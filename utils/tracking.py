@@ -0,0 +1,114 @@
+import numpy as np
+import supervision as sv
+
+
+def kalman_velocities(tracker) -> dict:
+    """
+    Vitesses des pistes actives de ByteTrack d'après son filtre de Kalman,
+    converties en vitesses des quatre coins (xyxy) par pas du tracker, par
+    identifiant de piste (`tracker_id` des détections).
+    """
+    velocities = {}
+    for track in getattr(tracker, 'tracked_tracks', []):
+        track_id = getattr(track, 'external_track_id', getattr(track, 'track_id', -1))
+        mean = getattr(track, 'mean', None)
+        if mean is None or track_id is None or track_id < 0:
+            continue
+        # État (cx, cy, largeur/hauteur, hauteur) et ses vitesses
+        _, _, aspect, height, vx, vy, va, vh = np.asarray(mean, dtype=np.float64)
+        vw = va * height + aspect * vh
+        velocities[int(track_id)] = np.array([vx - vw / 2, vy - vh / 2, vx + vw / 2, vy + vh / 2], dtype=np.float32)
+    return velocities
+
+
+class MotionPredictor:
+    """
+    Prolonge les pistes entre deux frames détectées (mode aperçu).
+
+    Entre deux détections, les boîtes de la dernière frame détectée sont
+    extrapolées à vitesse constante, le modèle de mouvement du filtre de
+    Kalman de ByteTrack. La vitesse d'une piste est celle estimée par ce
+    filtre (`kalman_velocities`), ramenée en pixels par frame : ByteTrack ne
+    voyant que les frames détectées, un pas du tracker couvre l'intervalle
+    entre deux détections. L'état du tracker n'est pas modifié. Sans vitesse
+    du tracker (piste inconnue, pas de tracker), elle est estimée à partir
+    de la frame détectée précédente, lissée par `smoothing`. Le ballon, sans
+    piste ByteTrack, suit cette seconde règle tant qu'un seul ballon est
+    détecté.
+    """
+
+    def __init__(self, smoothing=0.5):
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        self.key_index = None
+        self.detections = None
+        self.velocity = None
+        self.ball_detections = None
+        self.ball_velocity = None
+        self._tracks = {}
+        self._ball = None
+
+    def _velocity(self, previous, xyxy, index):
+        if previous is None or index <= previous[0]:
+            return np.zeros(4, dtype=np.float32)
+        previous_index, previous_xyxy, previous_velocity = previous
+        velocity = (xyxy - previous_xyxy) / (index - previous_index)
+        return self.smoothing * previous_velocity + (1 - self.smoothing) * velocity
+
+    def update(self, index, detections, ball_detections, tracker=None):
+        """
+        Mémorise les pistes d'une frame détectée (après `tracker`, s'il est
+        donné) et met à jour leurs vitesses.
+        """
+        xyxy = np.asarray(detections.xyxy, dtype=np.float32).reshape(-1, 4)
+        tracker_ids = detections.tracker_id if detections.tracker_id is not None else [None] * len(xyxy)
+        kalman = kalman_velocities(tracker) if tracker is not None else {}
+        step = index - self.key_index if self.key_index is not None and index > self.key_index else None
+        velocity = np.zeros_like(xyxy)
+        tracks = {}
+        for i, tracker_id in enumerate(tracker_ids):
+            if tracker_id is None:
+                continue
+            if step and int(tracker_id) in kalman:
+                velocity[i] = kalman[int(tracker_id)] / step
+            else:
+                velocity[i] = self._velocity(self._tracks.get(int(tracker_id)), xyxy[i], index)
+            tracks[int(tracker_id)] = (index, xyxy[i], velocity[i])
+        self._tracks = tracks
+
+        ball_velocity = np.zeros((len(ball_detections), 4), dtype=np.float32)
+        if len(ball_detections) == 1:
+            ball_xyxy = np.asarray(ball_detections.xyxy[0], dtype=np.float32)
+            ball_velocity[0] = self._velocity(self._ball, ball_xyxy, index)
+            self._ball = (index, ball_xyxy, ball_velocity[0])
+        else:
+            self._ball = None
+
+        self.key_index = index
+        self.detections, self.velocity = detections, velocity
+        self.ball_detections, self.ball_velocity = ball_detections, ball_velocity
+
+    def predict(self, index):
+        """
+        Boîtes prédites `(ballon, joueurs/gardiens/arbitres)` pour une frame
+        sans détection, avec les pistes et classes de la dernière frame détectée.
+        """
+        if self.detections is None:
+            # Pistes vides mais identifiées, comme celles que renvoie le tracker
+            players = sv.Detections.empty()
+            players.tracker_id = np.empty(0, dtype=int)
+            return sv.Detections.empty(), players
+        elapsed = index - self.key_index
+        return (
+            self._shifted(self.ball_detections, self.ball_velocity, elapsed),
+            self._shifted(self.detections, self.velocity, elapsed)
+        )
+
+    @staticmethod
+    def _shifted(detections, velocity, elapsed):
+        # Indexation par tableau : copie, la frame détectée reste intacte
+        predicted = detections[np.arange(len(detections))]
+        predicted.xyxy = (np.asarray(detections.xyxy, dtype=np.float32) + velocity * elapsed).reshape(-1, 4)
+        return predicted
@@ -1,173 +1,366 @@
 import supervision as sv
 from sports.annotators.soccer import draw_pitch, draw_points_on_pitch
 from sports.configs.soccer import SoccerPitchConfiguration
-from sports.common.view import ViewTransformer
-from tqdm import tqdm
+import copy
+import csv
+import os
 import numpy as np
-from .helpers import resolve_goalkeepers_team_id
+from .pipeline import render_records, run_analysis
+from .cache import load_records
+from .encoding import VideoEncoder
+from .spatial_control import SpatialControlEngine
 
 CONFIG = SoccerPitchConfiguration()
 
-def generate_tracking_video(
-    source_video_path, 
-    target_video_path, 
-    detection_model, 
-    team_classifier,
-    confidence=0.3
-):
-    """
-    Génère une vidéo avec détection, tracking et annotation des joueurs/ballon.
-    """
-    BALL_ID = 0
-    GOALKEEPER_ID = 1
-    PLAYER_ID = 2
-    REFEREE_ID = 3
-
-    ellipse_annotator = sv.EllipseAnnotator(
-        color=sv.ColorPalette.from_hex(['#00BFFF', '#FF1493', '#FFD700']),
-        thickness=2
-    )
-    label_annotator = sv.LabelAnnotator(
-        color=sv.ColorPalette.from_hex(['#00BFFF', '#FF1493', '#FFD700']),
-        text_color=sv.Color.from_hex('#000000'),
-        text_position=sv.Position.BOTTOM_CENTER
-    )
-    triangle_annotator = sv.TriangleAnnotator(
-        color=sv.Color.from_hex('#FFD700'),
-        base=25,
-        height=21,
-        outline_thickness=1
-    )
+TEAM_COLORS = ('#00BFFF', '#FF1493')
+REFEREE_COLOR = '#FFD700'
 
-    tracker = sv.ByteTrack()
-    tracker.reset()
 
-    video_info = sv.VideoInfo.from_video_path(source_video_path)
-    video_sink = sv.VideoSink(target_video_path, video_info=video_info)
-    frame_generator = sv.get_video_frames_generator(source_video_path)
+_PITCH_BACKGROUNDS = {}
 
-    with video_sink:
-        for frame in tqdm(frame_generator, total=video_info.total_frames, desc="Generating tracking video"):
-            result = detection_model.predict(frame, conf=confidence)[0]
-            detections = sv.Detections.from_ultralytics(result)
 
-            ball_detections = detections[detections.class_id == BALL_ID]
-            ball_detections.xyxy = sv.pad_boxes(xyxy=ball_detections.xyxy, px=10)
+def pitch_background(config=CONFIG, **pitch_style) -> np.ndarray:
+    """
+    Terrain statique (`draw_pitch`) dessiné une seule fois par configuration
+    et par style, puis réutilisé. Le tableau renvoyé est en lecture seule :
+    le copier avant de dessiner dessus.
+    """
+    key = (id(config), tuple(sorted((name, repr(value)) for name, value in pitch_style.items())))
+    cached_config, background = _PITCH_BACKGROUNDS.get(key, (None, None))
+    if cached_config is not config:
+        background = draw_pitch(config, **pitch_style)
+        background.flags.writeable = False
+        _PITCH_BACKGROUNDS[key] = (config, background)
+    return background
 
-            all_detections = detections[detections.class_id != BALL_ID]
-            all_detections = all_detections.with_nms(threshold=0.5, class_agnostic=True)
-            all_detections = tracker.update_with_detections(detections=all_detections)
 
-            goalkeepers_detections = all_detections[all_detections.class_id == GOALKEEPER_ID]
-            players_detections = all_detections[all_detections.class_id == PLAYER_ID]
-            referees_detections = all_detections[all_detections.class_id == REFEREE_ID]
+class VideoOutputSink:
+    """
+    Sortie vidéo alimentée par le pipeline d'analyse partagé.
+    Les sous-classes implémentent `render` pour dessiner une frame ;
+    `encoder` (un `VideoEncoder`) choisit l'encodage du fichier.
+    """
+    requires_homography = False
+    requires_frame = True
 
-            players_crops = [sv.crop_image(frame, xyxy) for xyxy in players_detections.xyxy]
-            players_detections.class_id = team_classifier.predict(players_crops)
-            goalkeepers_detections.class_id = resolve_goalkeepers_team_id(players_detections, goalkeepers_detections)
-            referees_detections.class_id -= 1
+    def __init__(self, target_video_path, encoder=None):
+        self.target_video_path = target_video_path
+        self.encoder = encoder or VideoEncoder()
+        self.video_sink = None
 
-            all_detections = sv.Detections.merge([players_detections, goalkeepers_detections, referees_detections])
+    def with_target(self, target_video_path):
+        """Copie de cette sortie (mêmes réglages) écrivant dans un autre fichier."""
+        sink = copy.copy(self)
+        sink.target_video_path = target_video_path
+        sink.video_sink = None
+        return sink
 
-            labels = [f"#{int(tid)}" for tid in all_detections.tracker_id]
-            all_detections.class_id = all_detections.class_id.astype(int)
+    def open(self, video_info):
+        self.video_sink = self.encoder.open(self.target_video_path, video_info)
+        return self
 
-            annotated_frame = frame.copy()
-            annotated_frame = ellipse_annotator.annotate(scene=annotated_frame, detections=all_detections)
-            annotated_frame = label_annotator.annotate(scene=annotated_frame, detections=all_detections, labels=labels)
-            annotated_frame = triangle_annotator.annotate(scene=annotated_frame, detections=ball_detections)
+    def __enter__(self):
+        self.video_sink.__enter__()
+        return self
 
-            video_sink.write_frame(annotated_frame)
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.video_sink.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.finish()
 
+    def finish(self):
+        """Appelée une fois la vidéo terminée, pour écrire d'éventuelles sorties annexes."""
 
-def generate_radar_video(
-    source_video_path,
-    target_video_path,
-    detection_model,
-    keypoint_model,
-    team_classifier,
-    config,
-    confidence=0.3
-):
-    """
-    Génère une vidéo vue radar avec projection des joueurs sur le terrain.
-    """
-    BALL_ID = 0
-    GOALKEEPER_ID = 1
-    PLAYER_ID = 2
-    REFEREE_ID = 3
-
-    tracker = sv.ByteTrack()
-    tracker.reset()
+    @property
+    def side_outputs(self) -> list:
+        """Fichiers annexes (hors vidéo) produits par cette sortie."""
+        return []
 
-    video_info = sv.VideoInfo.from_video_path(source_video_path)
-    video_sink = sv.VideoSink(target_video_path, video_info=video_info)
-    frame_generator = sv.get_video_frames_generator(source_video_path)
+    def state(self):
+        """État du rendu à reprendre sur le segment suivant (voir `utils.checkpoint`), `None` sans état."""
+        return None
 
-    with video_sink:
-        for frame in tqdm(frame_generator, total=video_info.total_frames, desc="Generating radar video"):
-            result = detection_model.predict(frame, conf=confidence)[0]
-            detections = sv.Detections.from_ultralytics(result)
+    def restore(self, state):
+        """Reprend le rendu à partir d'un état obtenu par `state`, à la prochaine ouverture."""
 
-            ball_detections = detections[detections.class_id == BALL_ID]
-            ball_detections.xyxy = sv.pad_boxes(xyxy=ball_detections.xyxy, px=10)
+    def write(self, analysis):
+        self.encode(self.render(analysis))
 
-            all_detections = detections[detections.class_id != BALL_ID]
-            all_detections = all_detections.with_nms(threshold=0.5, class_agnostic=True)
-            all_detections = tracker.update_with_detections(all_detections)
+    def encode(self, frame):
+        self.video_sink.write_frame(frame)
 
-            goalkeepers_detections = all_detections[all_detections.class_id == GOALKEEPER_ID]
-            players_detections = all_detections[all_detections.class_id == PLAYER_ID]
-            referees_detections = all_detections[all_detections.class_id == REFEREE_ID]
+    def render(self, analysis) -> np.ndarray:
+        raise NotImplementedError
 
-            players_crops = [sv.crop_image(frame, xyxy) for xyxy in players_detections.xyxy]
-            players_detections.class_id = team_classifier.predict(players_crops)
-            goalkeepers_detections.class_id = resolve_goalkeepers_team_id(players_detections, goalkeepers_detections)
-            referees_detections.class_id -= 1
 
-            all_detections = sv.Detections.merge([players_detections, goalkeepers_detections, referees_detections])
+class TrackingSink(VideoOutputSink):
+    """
+    Vidéo avec détection, tracking et annotation des joueurs/ballon.
+    """
 
-            result_kp = keypoint_model.infer(frame, confidence=confidence)[0]
-            key_points = sv.KeyPoints.from_inference(result_kp)
+    def __init__(
+        self,
+        target_video_path,
+        team_colors=TEAM_COLORS,
+        referee_color=REFEREE_COLOR,
+        thickness=2,
+        encoder=None
+    ):
+        super().__init__(target_video_path, encoder)
+        palette = sv.ColorPalette.from_hex([*team_colors, referee_color])
+        self.ellipse_annotator = sv.EllipseAnnotator(
+            color=palette,
+            thickness=thickness
+        )
+        self.label_annotator = sv.LabelAnnotator(
+            color=palette,
+            text_color=sv.Color.from_hex('#000000'),
+            text_position=sv.Position.BOTTOM_CENTER
+        )
+        self.triangle_annotator = sv.TriangleAnnotator(
+            color=sv.Color.from_hex(referee_color),
+            base=25,
+            height=21,
+            outline_thickness=1
+        )
+
+    def render(self, analysis):
+        all_detections = analysis.all_detections
+
+        labels = [f"#{int(tid)}" for tid in all_detections.tracker_id]
+        all_detections.class_id = all_detections.class_id.astype(int)
+
+        annotated_frame = analysis.frame.copy()
+        annotated_frame = self.ellipse_annotator.annotate(scene=annotated_frame, detections=all_detections)
+        annotated_frame = self.label_annotator.annotate(scene=annotated_frame, detections=all_detections, labels=labels)
+        annotated_frame = self.triangle_annotator.annotate(scene=annotated_frame, detections=analysis.ball_detections)
+        return annotated_frame
+
+
+class PitchSink(VideoOutputSink):
+    """
+    Base des vues terrain. `pitch_style` est passé à `draw_pitch`
+    (couleurs, épaisseur, `padding`, `scale`...).
+    """
+    requires_homography = True
+    requires_frame = False
+    default_pitch_style = {}
+
+    def __init__(self, target_video_path, config=CONFIG, team_colors=TEAM_COLORS, pitch_style=None, encoder=None):
+        super().__init__(target_video_path, encoder)
+        self.config = config
+        self.team_colors = [sv.Color.from_hex(color) for color in team_colors]
+        self.pitch_style = dict(self.default_pitch_style if pitch_style is None else pitch_style)
+        # Les points doivent être placés avec la même marge et la même échelle que le terrain
+        self.layout = {key: self.pitch_style[key] for key in ('padding', 'scale') if key in self.pitch_style}
+        self.background = pitch_background(config, **self.pitch_style)
+
+    def open(self, video_info):
+        # Vidéo à la taille du terrain dessiné, pas à celle de la caméra
+        height, width = self.background.shape[:2]
+        pitch_info = sv.VideoInfo(width=width, height=height, fps=video_info.fps, total_frames=video_info.total_frames)
+        return super().open(pitch_info)
+
+    def new_pitch(self) -> np.ndarray:
+        # Une copie par frame : l'encodage peut encore lire la frame précédente
+        return self.background.copy()
+
+    def draw_points(self, xy, face_color, edge_color, radius, pitch, **kwargs):
+        return draw_points_on_pitch(
+            config=self.config, xy=xy,
+            face_color=face_color, edge_color=edge_color,
+            radius=radius, pitch=pitch, **kwargs, **self.layout
+        )
+
+
+class RadarSink(PitchSink):
+    """
+    Vidéo vue radar avec projection des joueurs sur le terrain.
+    """
 
-            filter_pts = key_points.confidence[0] > 0.5
-            frame_reference_points = key_points.xy[0][filter_pts]
-            pitch_reference_points = np.array(config.vertices)[filter_pts]
+    def __init__(
+        self,
+        target_video_path,
+        config=CONFIG,
+        team_colors=TEAM_COLORS,
+        referee_color=REFEREE_COLOR,
+        player_radius=16,
+        ball_radius=10,
+        pitch_style=None,
+        encoder=None
+    ):
+        super().__init__(target_video_path, config, team_colors, pitch_style, encoder)
+        self.referee_color = sv.Color.from_hex(referee_color)
+        self.player_radius = player_radius
+        self.ball_radius = ball_radius
+
+    def render(self, analysis):
+        team_id = analysis.all_players.class_id
+        pitch_players_xy = analysis.pitch_players_xy
+
+        annotated_frame = self.new_pitch()
+        annotated_frame = self.draw_points(
+            analysis.pitch_ball_xy, sv.Color.WHITE, sv.Color.BLACK,
+            self.ball_radius, annotated_frame
+        )
+        for team, color in enumerate(self.team_colors):
+            annotated_frame = self.draw_points(
+                pitch_players_xy[team_id == team], color, sv.Color.BLACK,
+                self.player_radius, annotated_frame
+            )
+        annotated_frame = self.draw_points(
+            analysis.pitch_referees_xy, self.referee_color, sv.Color.BLACK,
+            self.player_radius, annotated_frame
+        )
+        return annotated_frame
 
-            transformer = ViewTransformer(source=frame_reference_points, target=pitch_reference_points)
 
-            frame_ball_xy = ball_detections.get_anchors_coordinates(sv.Position.BOTTOM_CENTER)
-            pitch_ball_xy = transformer.transform_points(points=frame_ball_xy)
+class VoronoiSink(PitchSink):
+    """
+    Vidéo avec diagramme de Voronoï (zones de contrôle), calculé par
+    `SpatialControlEngine` sur une grille de `cell_size` unités terrain.
+    La part de terrain contrôlée par chaque équipe est écrite frame par
+    frame dans `control_path`.
+    """
+    default_pitch_style = {'background_color': sv.Color.WHITE, 'line_color': sv.Color.BLACK}
+
+    def __init__(
+        self,
+        target_video_path,
+        config=CONFIG,
+        team_colors=TEAM_COLORS,
+        player_radius=16,
+        ball_radius=8,
+        pitch_style=None,
+        cell_size=50,
+        lookahead=0.0,
+        opacity=0.5,
+        encoder=None
+    ):
+        super().__init__(target_video_path, config, team_colors, pitch_style, encoder)
+        self.player_radius = player_radius
+        self.ball_radius = ball_radius
+        self.opacity = opacity
+        self.engine = SpatialControlEngine(config, cell_size=cell_size, lookahead=lookahead, **self.layout)
+        self.control_series = []
+        self.resume_state = None
+
+    @property
+    def control_path(self) -> str:
+        """CSV de la part de terrain contrôlée par chaque équipe, frame par frame."""
+        return os.path.splitext(self.target_video_path)[0] + '_control.csv'
+
+    @property
+    def side_outputs(self):
+        return [self.control_path]
+
+    def state(self):
+        return self.engine.state()
+
+    def restore(self, state):
+        self.resume_state = state
+
+    def open(self, video_info):
+        self.engine.reset(fps=video_info.fps)
+        if self.resume_state is not None:
+            self.engine.restore(self.resume_state)
+            self.resume_state = None
+        self.control_series = []
+        return super().open(video_info)
+
+    def finish(self):
+        with open(self.control_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['frame', 'team_1', 'team_2'])
+            for frame_index, team_1, team_2 in self.control_series:
+                writer.writerow([frame_index, f"{team_1:.4f}", f"{team_2:.4f}"])
+
+    def render(self, analysis):
+        all_players = analysis.all_players
+        team_id = all_players.class_id
+        pitch_players_xy = analysis.pitch_players_xy
+
+        advantage = self.engine.compute(
+            pitch_players_xy, team_id,
+            tracker_id=all_players.tracker_id, frame_index=analysis.index
+        )
+        self.control_series.append((analysis.index, *self.engine.percentages(advantage)))
+
+        annotated_frame = self.engine.draw(
+            self.background, advantage,
+            team_1_color=self.team_colors[0],
+            team_2_color=self.team_colors[1],
+            opacity=self.opacity
+        )
+
+        annotated_frame = self.draw_points(
+            analysis.pitch_ball_xy, sv.Color.WHITE, sv.Color.WHITE,
+            self.ball_radius, annotated_frame, thickness=1
+        )
+        for team, color in enumerate(self.team_colors):
+            annotated_frame = self.draw_points(
+                pitch_players_xy[team_id == team], color, sv.Color.WHITE,
+                self.player_radius, annotated_frame, thickness=1
+            )
+        return annotated_frame
 
-            players_xy = all_detections.get_anchors_coordinates(sv.Position.BOTTOM_CENTER)
-            pitch_players_xy = transformer.transform_points(points=players_xy)
 
-            referees_xy = referees_detections.get_anchors_coordinates(sv.Position.BOTTOM_CENTER)
-            pitch_referees_xy = transformer.transform_points(points=referees_xy)
+def generate_tracking_video(
+    source_video_path, 
+    target_video_path, 
+    detection_model, 
+    team_classifier,
+    confidence=0.3,
+    batch_size=1,
+    cache=None,
+    team_refresh_interval=None,
+    keyframe_max_interval=None
+):
+    """
+    Génère une vidéo avec détection, tracking et annotation des joueurs/ballon.
+    """
+    run_analysis(
+        source_video_path,
+        [TrackingSink(target_video_path)],
+        detection_model,
+        team_classifier,
+        confidence=confidence,
+        batch_size=batch_size,
+        cache=cache,
+        team_refresh_interval=team_refresh_interval,
+        keyframe_max_interval=keyframe_max_interval
+    )
 
-            annotated_frame = draw_pitch(config)
-            annotated_frame = draw_points_on_pitch(
-                config=config, xy=pitch_ball_xy,
-                face_color=sv.Color.WHITE, edge_color=sv.Color.BLACK,
-                radius=10, pitch=annotated_frame
-            )
-            annotated_frame = draw_points_on_pitch(
-                config=config, xy=pitch_players_xy[all_detections.class_id == 0],
-                face_color=sv.Color.from_hex('00BFFF'), edge_color=sv.Color.BLACK,
-                radius=16, pitch=annotated_frame
-            )
-            annotated_frame = draw_points_on_pitch(
-                config=config, xy=pitch_players_xy[all_detections.class_id == 1],
-                face_color=sv.Color.from_hex('FF1493'), edge_color=sv.Color.BLACK,
-                radius=16, pitch=annotated_frame
-            )
-            annotated_frame = draw_points_on_pitch(
-                config=config, xy=pitch_referees_xy,
-                face_color=sv.Color.from_hex('FFD700'), edge_color=sv.Color.BLACK,
-                radius=16, pitch=annotated_frame
-            )
 
-            video_sink.write_frame(annotated_frame)
+def generate_radar_video(
+    source_video_path,
+    target_video_path,
+    detection_model,
+    keypoint_model,
+    team_classifier,
+    config,
+    confidence=0.3,
+    batch_size=1,
+    cache=None,
+    team_refresh_interval=None,
+    keyframe_max_interval=None
+):
+    """
+    Génère une vidéo vue radar avec projection des joueurs sur le terrain.
+    """
+    run_analysis(
+        source_video_path,
+        [RadarSink(target_video_path, config)],
+        detection_model,
+        team_classifier,
+        keypoint_model=keypoint_model,
+        config=config,
+        confidence=confidence,
+        batch_size=batch_size,
+        cache=cache,
+        team_refresh_interval=team_refresh_interval,
+        keyframe_max_interval=keyframe_max_interval
+    )
 
 
 def generate_voronoi_video(
@@ -177,85 +370,67 @@ def generate_voronoi_video(
     keypoint_model,
     team_classifier,
     config,
-    confidence=0.3
+    confidence=0.3,
+    batch_size=1,
+    cache=None,
+    team_refresh_interval=None,
+    keyframe_max_interval=None
 ):
     """
     Génère une vidéo avec diagramme de Voronoï (zones de contrôle).
     """
-    from sports.annotators.soccer import draw_pitch_voronoi_diagram
-    
-    BALL_ID = 0
-    GOALKEEPER_ID = 1
-    PLAYER_ID = 2
-    REFEREE_ID = 3
-
-    tracker = sv.ByteTrack()
-    tracker.reset()
-
-    video_info = sv.VideoInfo.from_video_path(source_video_path)
-    video_sink = sv.VideoSink(target_video_path, video_info=video_info)
-    frame_generator = sv.get_video_frames_generator(source_video_path)
-
-    with video_sink:
-        for frame in tqdm(frame_generator, total=video_info.total_frames, desc="Generating Voronoi video"):
-            result = detection_model.predict(frame, conf=confidence)[0]
-            detections = sv.Detections.from_ultralytics(result)
-
-            ball_detections = detections[detections.class_id == BALL_ID]
-            ball_detections.xyxy = sv.pad_boxes(xyxy=ball_detections.xyxy, px=10)
-
-            all_detections = detections[detections.class_id != BALL_ID]
-            all_detections = all_detections.with_nms(threshold=0.5, class_agnostic=True)
-            all_detections = tracker.update_with_detections(all_detections)
-
-            goalkeepers_detections = all_detections[all_detections.class_id == GOALKEEPER_ID]
-            players_detections = all_detections[all_detections.class_id == PLAYER_ID]
+    run_analysis(
+        source_video_path,
+        [VoronoiSink(target_video_path, config)],
+        detection_model,
+        team_classifier,
+        keypoint_model=keypoint_model,
+        config=config,
+        confidence=confidence,
+        batch_size=batch_size,
+        cache=cache,
+        team_refresh_interval=team_refresh_interval,
+        keyframe_max_interval=keyframe_max_interval
+    )
 
-            players_crops = [sv.crop_image(frame, xyxy) for xyxy in players_detections.xyxy]
-            players_detections.class_id = team_classifier.predict(players_crops)
-            goalkeepers_detections.class_id = resolve_goalkeepers_team_id(players_detections, goalkeepers_detections)
 
-            all_players = sv.Detections.merge([players_detections, goalkeepers_detections])
+def _render_from_file(analysis_path, sinks, source_video_path=None):
+    records, metadata = load_records(analysis_path)
+    if any(sink.requires_homography for sink in sinks) and records and 'pitch_xy' not in records[0]:
+        raise ValueError("Ce fichier ne contient pas de coordonnées terrain")
 
-            result_kp = keypoint_model.infer(frame, confidence=confidence)[0]
-            key_points = sv.KeyPoints.from_inference(result_kp)
+    if 'fps' in metadata:
+        video_info = sv.VideoInfo(
+            width=metadata['width'],
+            height=metadata['height'],
+            fps=int(round(metadata['fps'])),
+            total_frames=len(records)
+        )
+    else:
+        video_info = sv.VideoInfo.from_video_path(source_video_path)
 
-            filter_pts = key_points.confidence[0] > 0.5
-            frame_reference_points = key_points.xy[0][filter_pts]
-            pitch_reference_points = np.array(config.vertices)[filter_pts]
+    render_records(records, sinks, video_info, source_video_path, start=metadata['start'])
 
-            transformer = ViewTransformer(source=frame_reference_points, target=pitch_reference_points)
 
-            frame_ball_xy = ball_detections.get_anchors_coordinates(sv.Position.BOTTOM_CENTER)
-            pitch_ball_xy = transformer.transform_points(points=frame_ball_xy)
+def render_tracking_video(analysis_path, source_video_path, target_video_path, **style):
+    """
+    Regénère la vidéo de tracking à partir d'une analyse exportée
+    (`AnalysisExporter`) et de la vidéo source, sans aucun modèle.
+    """
+    _render_from_file(analysis_path, [TrackingSink(target_video_path, **style)], source_video_path)
 
-            players_xy = all_players.get_anchors_coordinates(sv.Position.BOTTOM_CENTER)
-            pitch_players_xy = transformer.transform_points(points=players_xy)
 
-            annotated_frame = draw_pitch(config, background_color=sv.Color.WHITE, line_color=sv.Color.BLACK)
-            annotated_frame = draw_pitch_voronoi_diagram(
-                config=config,
-                team_1_xy=pitch_players_xy[all_players.class_id == 0],
-                team_2_xy=pitch_players_xy[all_players.class_id == 1],
-                team_1_color=sv.Color.from_hex('00BFFF'),
-                team_2_color=sv.Color.from_hex('FF1493'),
-                pitch=annotated_frame
-            )
+def render_radar_video(analysis_path, target_video_path, config=CONFIG, **style):
+    """
+    Regénère la vue radar à partir d'une analyse exportée, sans vidéo source
+    ni modèle. `style` est passé à `RadarSink` (couleurs, rayons, terrain).
+    """
+    _render_from_file(analysis_path, [RadarSink(target_video_path, config, **style)])
 
-            annotated_frame = draw_points_on_pitch(
-                config=config, xy=pitch_ball_xy,
-                face_color=sv.Color.WHITE, edge_color=sv.Color.WHITE,
-                radius=8, thickness=1, pitch=annotated_frame
-            )
-            annotated_frame = draw_points_on_pitch(
-                config=config, xy=pitch_players_xy[all_players.class_id == 0],
-                face_color=sv.Color.from_hex('00BFFF'), edge_color=sv.Color.WHITE,
-                radius=16, thickness=1, pitch=annotated_frame
-            )
-            annotated_frame = draw_points_on_pitch(
-                config=config, xy=pitch_players_xy[all_players.class_id == 1],
-                face_color=sv.Color.from_hex('FF1493'), edge_color=sv.Color.WHITE,
-                radius=16, thickness=1, pitch=annotated_frame
-            )
 
-            video_sink.write_frame(annotated_frame)
\ No newline at end of file
+def render_voronoi_video(analysis_path, target_video_path, config=CONFIG, **style):
+    """
+    Regénère le diagramme de Voronoï à partir d'une analyse exportée, sans
+    vidéo source ni modèle. `style` est passé à `VoronoiSink`.
+    """
+    _render_from_file(analysis_path, [VoronoiSink(target_video_path, config, **style)])